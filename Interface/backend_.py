@@ -1,6 +1,10 @@
 # backend_alerts.py
 
-import json  # Importation du module JSON pour la gestion de la sérialisation et désérialisation des données
+import threading  # Verrou : les alertes sont lues par les threads du service de données
+import journal_alertes  # Journal append-only des alertes (alerts.jsonl) et instantanés
+import index_alertes  # Index en mémoire : les requêtes ne relisent plus le fichier
+import cache_json  # Empreinte des fichiers des alertes (modifiés par un autre processus)
+import instrumentation  # Comptage et durées des appels (optionnel, SERRE_INSTRUMENTATION=1)
 
 # --------------------------- INITIALISATION DE LA BASE DE DONNÉES DES ALERTES ---------------------------
 
@@ -15,8 +19,32 @@ alerts_database = {
     "alerts_by_time": {}   # Initialisation d'un dictionnaire vide pour les alertes par heure
 }
 
+# Index des alertes de alerts_by_time (non lues, par paramètre, par plage horaire)
+index = index_alertes.IndexAlertes(alerts_database["alerts_by_time"])
+
+# Fichier actuellement chargé en mémoire (les requêtes sur un autre fichier le rechargent)
+_fichier_charge = None
+
+# Empreinte (stat) de l'instantané et du journal lors du dernier chargement
+_empreinte = None
+
+# Protège alerts_database et index : lus par les threads de lecture, modifiés par le thread Tkinter
+_verrou = threading.RLock()
+
+
+def _remplacer(data, filename):
+    """
+    Remplace la base de données en mémoire et reconstruit l'index.
+    """
+    global alerts_database, _fichier_charge
+    with _verrou:
+        alerts_database = data
+        index.reconstruire(data["alerts_by_time"])
+        _fichier_charge = filename
+
 # --------------------------- FONCTION : AJOUTER UNE ALERTE PAR HEURE ---------------------------
 
+@instrumentation.mesure
 def add_alert_by_time(hour, parameter, value, message, filename="alerts.json"):
     """
     Ajoute une alerte à une heure spécifique dans la base de données des alertes.
@@ -27,60 +55,115 @@ def add_alert_by_time(hour, parameter, value, message, filename="alerts.json"):
     :param message: Message prédéfini décrivant l'alerte.
     :param filename: Nom du fichier JSON où les alertes sont sauvegardées (par défaut "alerts.json").
     """
-    # Charger les alertes existantes depuis le fichier JSON
-    load_alerts_from_file(filename)
-
     # Définir ou mettre à jour l'alerte pour l'heure spécifiée
-    alerts_database["alerts_by_time"][hour] = {
+    alerte = {
         "Parameter": parameter,  # Le paramètre concerné par l'alerte
         "Value": value,          # La valeur seuil qui déclenche l'alerte
         "Message": message,      # Message explicatif de l'alerte
         "read": False            # Indique que l'alerte est nouvelle et non encore lue
     }
+    with _verrou:
+        _charger_si_necessaire(filename)
+        index.definir(hour, alerte)  # Met aussi à jour alerts_database["alerts_by_time"]
 
-    # Sauvegarder les alertes mises à jour dans le fichier JSON
-    save_alerts_to_file(filename)
+        # Ajouter une seule ligne au journal au lieu de réécrire tout le fichier JSON
+        journal_alertes.ajouter_entree(filename, hour, alerte)
+        _compacter_si_necessaire(filename)
+
+
+def _compacter_si_necessaire(filename):
+    """
+    Compaction périodique : le journal est fusionné dans l'instantané alerts.json.
+    """
+    if journal_alertes.doit_compacter(filename):
+        _remplacer(journal_alertes.compacter(filename), filename)
+
+# --------------------------- FONCTION : MARQUER UNE ALERTE COMME LUE ---------------------------
+
+@instrumentation.mesure
+def mark_alert_as_read(hour, filename="alerts.json"):
+    """
+    Marque l'alerte de l'heure spécifiée comme lue (annule sa notification).
+
+    :param hour: Heure de l'alerte (format "HH:MM").
+    :param filename: Nom du fichier JSON où les alertes sont sauvegardées (par défaut "alerts.json").
+    :return: True si l'alerte existe.
+    """
+    with _verrou:
+        _charger_si_necessaire(filename)
+        if not index.marquer_lue(hour):
+            return False
+        journal_alertes.ajouter_entrees(filename, [{"op": "read", "hour": hour}])
+        _compacter_si_necessaire(filename)
+        return True
+
+# --------------------------- FONCTION : SUPPRIMER UNE ALERTE ---------------------------
+
+@instrumentation.mesure
+def delete_alert(hour, filename="alerts.json"):
+    """
+    Supprime l'alerte de l'heure spécifiée.
+
+    :param hour: Heure de l'alerte (format "HH:MM").
+    :param filename: Nom du fichier JSON où les alertes sont sauvegardées (par défaut "alerts.json").
+    :return: True si l'alerte existait.
+    """
+    with _verrou:
+        _charger_si_necessaire(filename)
+        if not index.supprimer(hour):
+            return False
+        journal_alertes.ajouter_entrees(filename, [{"op": "delete", "hour": hour}])
+        _compacter_si_necessaire(filename)
+        return True
+
+# --------------------------- FONCTION : ENREGISTRER LES ALERTES DÉCLENCHÉES ---------------------------
+
+@instrumentation.mesure
+def add_fired_alerts(alerts, filename="alerts.json"):
+    """
+    Ajoute à "active_alerts" les alertes déclenchées par le moteur de règles (moteur_regles).
+
+    :param alerts: Liste de dictionnaires produits par ReglesCompilees.alertes_declenchees().
+    :param filename: Nom du fichier JSON où les alertes sont sauvegardées (par défaut "alerts.json").
+    """
+    with _verrou:
+        _charger_si_necessaire(filename)
+        alerts_database["active_alerts"].extend(alerts)
+        journal_alertes.ajouter_entrees(filename, [{"op": "fire", "alert": alert} for alert in alerts])
+        _compacter_si_necessaire(filename)
+
+
+@instrumentation.mesure
+def get_active_alerts(filename="alerts.json"):
+    """
+    Renvoie une copie de la liste des alertes déclenchées par le moteur de règles, dans
+    l'ordre de déclenchement (les nouvelles alertes sont ajoutées à la fin).
+    """
+    with _verrou:
+        _charger_si_necessaire(filename)
+        return list(alerts_database["active_alerts"])
 
 # --------------------------- FONCTION : SAUVEGARDER LES ALERTES DANS LE FICHIER JSON ---------------------------
 
+@instrumentation.mesure
 def save_alerts_to_file(filename="alerts.json"):
     """
-    Sauvegarde la base de données des alertes dans un fichier JSON.
-    Cette fonction fusionne les données existantes avec les nouvelles données avant de sauvegarder.
+    Sauvegarde les alertes dans l'instantané JSON (compaction du journal).
+    Toutes les modifications passent déjà par le journal : l'instantané est reconstruit à partir
+    de l'état sur disque seulement (instantané + journal), jamais à partir de la mémoire, qui
+    peut ignorer les écritures d'un autre processus (alertes déclenchées, suppressions).
 
     :param filename: Nom du fichier JSON où les alertes sont sauvegardées (par défaut "alerts.json").
     """
+    global _empreinte
     try:
-        # Tenter de charger les données existantes du fichier JSON
-        try:
-            with open(filename, "r") as file:
-                existing_data = json.load(file)  # Charger les données existantes
-        except (FileNotFoundError, json.JSONDecodeError):
-            # Si le fichier n'existe pas ou est corrompu, initialiser une structure vide
-            existing_data = {
-                "active_alerts": [],
-                "read_alerts": [],
-                "alerts_by_time": {}
-            }
-
-        # Fusionner les données actuelles avec celles de alerts_database
-
-        # 1. Copier les listes "active_alerts" et "read_alerts" depuis alerts_database
-        existing_data["active_alerts"] = alerts_database.get("active_alerts", [])
-        existing_data["read_alerts"] = alerts_database.get("read_alerts", [])
-
-        # 2. Fusionner le dictionnaire "alerts_by_time"
-        if "alerts_by_time" not in existing_data:
-            existing_data["alerts_by_time"] = {}  # Initialiser si absent
-        for hour, alert_info in alerts_database["alerts_by_time"].items():
-            existing_data["alerts_by_time"][hour] = alert_info  # Ajouter ou mettre à jour l'alerte pour chaque heure
-
-        # Sauvegarder les données fusionnées dans le fichier JSON avec une indentation pour la lisibilité
-        with open(filename, "w") as file:
-            json.dump(existing_data, file, indent=4)
-
-        # Mettre à jour alerts_database avec les données fusionnées pour assurer la cohérence en mémoire
-        alerts_database.update(existing_data)
+        # Verrou entre processus : personne n'écrit entre la lecture et la réécriture
+        with _verrou, journal_alertes.verrou(filename):
+            data = journal_alertes.compacter(filename)
+
+            # La mémoire reprend l'état sur disque : rien à recharger tant qu'il ne change pas
+            _remplacer(data, filename)
+            _empreinte = _empreinte_fichiers(filename)
 
     except IOError as e:
         # En cas d'erreur lors de la sauvegarde, afficher un message d'erreur
@@ -88,67 +171,131 @@ def save_alerts_to_file(filename="alerts.json"):
 
 # --------------------------- FONCTION : CHARGER LES ALERTES DU FICHIER JSON ---------------------------
 
+@instrumentation.mesure
 def load_alerts_from_file(filename="alerts.json"):
     """
-    Charge les alertes depuis un fichier JSON dans la variable globale alerts_database.
+    Charge les alertes dans la variable globale alerts_database et reconstruit l'index.
+    L'état est reconstruit à partir de l'instantané JSON puis des entrées du journal (alerts.jsonl).
     Si le fichier n'existe pas ou est mal formé, initialise une structure vide.
 
     :param filename: Nom du fichier JSON à charger (par défaut "alerts.json").
     """
-    global alerts_database  # Indique que nous modifions la variable globale alerts_database
-    try:
-        with open(filename, "r") as file:
-            data = json.load(file)  # Charger les données depuis le fichier JSON
-        alerts_database = data  # Mettre à jour la base de données des alertes avec les données chargées
-
-        # Vérifier et assurer que la structure minimale existe
-        if "alerts_by_time" not in alerts_database:
-            alerts_database["alerts_by_time"] = {}
-        if "active_alerts" not in alerts_database:
-            alerts_database["active_alerts"] = []
-        if "read_alerts" not in alerts_database:
-            alerts_database["read_alerts"] = []
-
-    except (FileNotFoundError, json.JSONDecodeError):
-        # Si le fichier n'existe pas ou est corrompu, réinitialiser la base de données des alertes
-        alerts_database = {
-            "active_alerts": [],
-            "read_alerts": [],
-            "alerts_by_time": {}
-        }
+    global _empreinte
+    with _verrou:
+        empreinte = _empreinte_fichiers(filename)  # Avant la lecture : une écriture pendant la lecture sera revue
+        _remplacer(journal_alertes.charger(filename), filename)
+        _empreinte = empreinte
+
+
+@instrumentation.mesure
+def recharger_si_modifie(filename="alerts.json"):
+    """
+    Recharge les alertes si l'instantané ou le journal a changé depuis le dernier chargement
+    (ex. alertes déclenchées par le processus d'ingestion). Seuls deux appels à stat sont
+    faits quand rien n'a changé.
+
+    :param filename: Nom du fichier JSON des alertes (par défaut "alerts.json").
+    :return: True si les alertes ont été rechargées.
+    """
+    with _verrou:
+        if filename == _fichier_charge and _empreinte_fichiers(filename) == _empreinte:
+            return False
+        load_alerts_from_file(filename)
+        return True
+
+
+def _empreinte_fichiers(filename):
+    return cache_json.empreinte(filename), cache_json.empreinte(journal_alertes.chemin_journal(filename))
+
+
+def _charger_si_necessaire(filename):
+    """
+    Le fichier n'est lu que si un autre fichier que celui en mémoire est demandé :
+    toutes les modifications passent par ce module, la mémoire est donc à jour.
+    """
+    if filename != _fichier_charge:
+        load_alerts_from_file(filename)
 
 # --------------------------- FONCTION : RÉCUPÉRER LES ALERTES PAR HEURE ---------------------------
 
+@instrumentation.mesure
 def get_alerts_by_time(filename="alerts.json"):
     """
-    Charge les alertes depuis le fichier JSON et renvoie le dictionnaire des alertes classées par heure.
+    Renvoie le dictionnaire des alertes classées par heure (depuis la mémoire).
 
-    :param filename: Nom du fichier JSON à charger (par défaut "alerts.json").
+    :param filename: Nom du fichier JSON des alertes (par défaut "alerts.json").
     :return: Dictionnaire des alertes organisées par heure.
     """
-    load_alerts_from_file(filename)  # Charger les alertes depuis le fichier JSON
-    return alerts_database["alerts_by_time"]  # Retourner le dictionnaire des alertes par heure
+    with _verrou:
+        _charger_si_necessaire(filename)
+        return alerts_database["alerts_by_time"]  # Retourner le dictionnaire des alertes par heure
 
 # --------------------------- FONCTION : RÉCUPÉRER LES ALERTES NON LUES ---------------------------
 
+@instrumentation.mesure
 def get_unread_alerts(filename="alerts.json"):
     """
-    Charge les alertes depuis le fichier JSON et renvoie une liste des alertes non lues.
+    Renvoie une liste des alertes non lues (depuis l'index en mémoire).
 
-    :param filename: Nom du fichier JSON à charger (par défaut "alerts.json").
+    :param filename: Nom du fichier JSON des alertes (par défaut "alerts.json").
     :return: Liste des alertes dont le champ 'read' est False.
     """
-    load_alerts_from_file(filename)  # Charger les alertes depuis le fichier JSON
-    return [
-        alert
-        for alert in alerts_database["alerts_by_time"].values()
-        if not alert.get("read", False)  # Filtrer les alertes non lues
-    ]
+    with _verrou:
+        _charger_si_necessaire(filename)
+        return index.alertes_non_lues()
+
+
+@instrumentation.mesure
+def get_unread_count(filename="alerts.json"):
+    """
+    Renvoie le nombre d'alertes non lues en O(1).
+    """
+    with _verrou:
+        _charger_si_necessaire(filename)
+        return index.nombre_non_lues()
+
+# --------------------------- FONCTIONS : REQUÊTES PAR PARAMÈTRE ET PAR PLAGE HORAIRE ---------------------------
+
+@instrumentation.mesure
+def get_alerts_by_parameter(parameter, filename="alerts.json"):
+    """
+    :param parameter: Paramètre environnemental (ex. "Température").
+    :return: Dictionnaire {"HH:MM": alerte} des alertes de ce paramètre.
+    """
+    with _verrou:
+        _charger_si_necessaire(filename)
+        return index.alertes_par_parametre(parameter)
+
 
-# --------------------------- INITIALISATION AU DÉMARRAGE DU PROGRAMME ---------------------------
+@instrumentation.mesure
+def get_alerts_between(start, end, filename="alerts.json"):
+    """
+    :param start: Heure de début incluse (format "HH:MM").
+    :param end: Heure de fin incluse (format "HH:MM").
+    :return: Dictionnaire {"HH:MM": alerte} des alertes de cette plage horaire.
+    """
+    with _verrou:
+        _charger_si_necessaire(filename)
+        return index.alertes_entre(start, end)
 
-# Charger les alertes dès le démarrage du programme pour s'assurer que alerts_database est à jour
-load_alerts_from_file()
+
+@instrumentation.mesure
+def get_alert_rows(filename="alerts.json"):
+    """
+    Renvoie une copie des alertes sous forme de liste triée par heure, prise sous le verrou :
+    elle peut être parcourue par un autre thread pendant que les alertes sont modifiées.
+
+    :return: Liste de tuples ("HH:MM", alerte).
+    """
+    with _verrou:
+        _charger_si_necessaire(filename)
+        return [(hour, index.par_heure[hour]) for hour in index.heures_triees]
+
+# --------------------------- CHARGEMENT DIFFÉRÉ ---------------------------
+
+# Les alertes ne sont plus lues à l'importation du module : le fichier est chargé par la
+# première fonction qui en a besoin (_charger_si_necessaire), le plus souvent dans un thread
+# du service de données, après l'apparition de la fenêtre.
 
 
 #======================================================================================================================================================================================
@@ -158,30 +305,63 @@ load_alerts_from_file()
 #=============================================================================================================
 #  si tu veux cette parti pourais etre un autre fichier    backend_trend.py
 #=========================================================================================================
-import fake_database  # Importation du module back end pour accéder aux données
+# Stockage SQLite des lectures de capteurs (remplace fake_database) : stockage_capteurs est importé
+# par chaque fonction, NumPy n'est donc chargé qu'à la première lecture des tendances
 
+@instrumentation.mesure
 def get_trend_data(date):
     """
     Récupère les données de tendance pour une date spécifique.
 
-    :param date: Date au format "YYYY-MM-DD" pour laquelle les tendances sont récupérées.
+    :param date: Date au format "YYYY-MM-DD" (une journée) ou "YYYY-MM" (un mois).
     :return: Dictionnaire contenant les données de température, humidité et CO2 pour la date donnée.
              Si aucune donnée n'est trouvée, retourne un dictionnaire vide.
     """
-    data_list = fake_database.tendance_moyenne()  # Récupère la liste des tendances moyennes
-    data = next((item for item in data_list if item["Date"] == date), {})
-    return data
+    import stockage_capteurs
+    # Lecture des agrégats journaliers précalculés (quelques lignes par capteur)
+    if len(date) == 7:
+        return stockage_capteurs.moyenne_mois(date)
+    return stockage_capteurs.moyenne_journee(date)
 
+@instrumentation.mesure
 def get_detailed_trend_data(date):
     """
     Récupère les données détaillées pour une date spécifique.
 
     :param date: Date au format "YYYY-MM-DD" pour laquelle les données détaillées sont récupérées.
-    :return: Dictionnaire contenant les données détaillées par heure.
-             Si aucune donnée n'est trouvée, retourne un dictionnaire vide.
+    :return: Tableau NumPy structuré (colonnes "horodatage", "Température", "Humidité", "CO2",
+             "Lumière" ; NaN en l'absence de lecture). Pour une journée archivée, c'est une vue
+             projetée en mémoire, sans copie. Si aucune donnée n'est trouvée, le tableau est vide.
     """
-    detailed_data = fake_database.get_detailed_data()  # Récupère les données détaillées
-    return detailed_data.get(date, {})
+    import stockage_capteurs
+    return stockage_capteurs.tableau_journee(date)  # Seules les lectures de cette journée sont lues
+
+@instrumentation.mesure
+def get_trend_range(start, end, parameter, resolution=None):
+    """
+    Récupère l'évolution d'un paramètre sur plusieurs jours.
+
+    :param start: Date de début au format "YYYY-MM-DD" (incluse).
+    :param end: Date de fin au format "YYYY-MM-DD" (incluse).
+    :param parameter: Paramètre environnemental (ex. "Température").
+    :param resolution: Durée d'un point en secondes (stockage_capteurs.BRUT, MINUTE, HEURE ou JOUR).
+                       Par défaut, la plus fine qui garde la série sous quelques milliers de points.
+    :return: Dictionnaire {"resolution", "moments", "valeurs", "minimums", "maximums"} ;
+             les listes sont vides si aucune donnée n'est trouvée.
+    """
+    import stockage_capteurs
+    debut = stockage_capteurs.bornes_journee(start)[0]
+    fin = stockage_capteurs.bornes_journee(end)[1]
+    if resolution is None:
+        resolution = stockage_capteurs.choisir_resolution(parameter, debut, fin)
+
+    data = {"resolution": resolution, "moments": [], "valeurs": [], "minimums": [], "maximums": []}
+    for horodatage, moyenne, minimum, maximum in stockage_capteurs.serie(parameter, debut, fin, resolution):
+        data["moments"].append(stockage_capteurs.depuis_horodatage(horodatage))
+        data["valeurs"].append(moyenne)
+        data["minimums"].append(minimum)
+        data["maximums"].append(maximum)
+    return data
 
 
 
@@ -0,0 +1,264 @@
+# banc_essai_backend.py
+
+import os          # Dossiers des données synthétiques
+import sys         # Interpréteur des processus de mesure
+import json        # Résultats, références enregistrées
+import time        # Mesure des latences (perf_counter)
+import random      # Données synthétiques reproductibles (graine fixe)
+import shutil      # Copie du fichier des alertes pour les opérations qui le modifient
+import argparse    # Options de la ligne de commande
+import subprocess  # Un processus par mesure : pic de mémoire propre à l'opération
+from datetime import datetime
+
+# --------------------------- PRINCIPE DU BANC D'ESSAI ---------------------------
+
+# Mesure le coût des fonctions de backend_ (donc de stockage_capteurs, qui a remplacé
+# fake_database) quand les données grossissent :
+#   - trois tailles de données synthétiques (lectures de capteurs et alertes), générées une
+#     seule fois avec une graine fixe puis gardées dans DOSSIER_DONNEES ;
+#   - chaque opération est mesurée dans un processus neuf qui travaille sur ces données :
+#     le pic de mémoire résidente (ru_maxrss) est celui de l'opération et non du banc entier ;
+#   - une opération est répétée pendant au moins DUREE_MIN secondes (latences p50 et p99,
+#     débit en opérations par seconde) ;
+#   - les résultats peuvent être enregistrés comme référence, puis comparés à une exécution
+#     ultérieure : toute latence p50 plus lente que la référence au-delà du seuil (et d'une
+#     petite marge absolue, pour les opérations de quelques µs) est une régression (code de sortie 1).
+#
+# Exemple : python banc_essai_backend.py --tailles petit moyen --enregistrer reference.json
+#           python banc_essai_backend.py --tailles petit moyen --comparer reference.json
+
+DOSSIER_DONNEES = "banc_essai.donnees"
+DUREE_MIN = 1.0          # s de répétitions par mesure
+REPETITIONS_MIN = 5
+REPETITIONS_MAX = 2000
+SEUIL_REGRESSION = 0.20  # +20 % sur la latence p50
+MARGE_ABSOLUE = 0.02     # ms : en dessous, un écart de p50 est du bruit de mesure
+
+# Nom -> (nombre de lectures de capteurs, nombre d'alertes)
+TAILLES = {
+    "petit": (1_000, 10),
+    "moyen": (100_000, 10_000),
+    "grand": (10_000_000, 1_000_000),
+}
+
+CAPTEURS = {"Température": (22.0, 0.05), "Humidité": (55.0, 0.2), "CO2": (400.0, 1.0), "Lumière": (350.0, 2.0)}
+DEBUT = "2025-01-01"  # Première journée des lectures synthétiques
+TAILLE_LOT = 100_000  # Lectures par transaction lors de la génération
+
+# --------------------------- DONNÉES SYNTHÉTIQUES ---------------------------
+
+def heure_alerte(numero):
+    """
+    :return: Clé unique de l'alerte numéro 'numero'. Au-delà de 1440 alertes, les heures "HH:MM"
+             sont épuisées : un suffixe de jour les rend uniques (ordre de tri conservé).
+    """
+    heure, minute = divmod(numero % 1440, 60)
+    cle = f"{heure:02}:{minute:02}"
+    return cle if numero < 1440 else f"{cle}/{numero // 1440}"
+
+
+def generer(dossier, lectures, alertes):
+    """
+    Crée dans 'dossier' une base capteurs.db et un fichier alerts.json synthétiques
+    (rien n'est fait si les données existent déjà).
+
+    :param lectures: Nombre total de lectures (réparties entre les capteurs, une par seconde).
+    :param alertes: Nombre d'alertes (une sur deux non lue).
+    """
+    import stockage_capteurs  # Importés ici : le processus principal n'a pas besoin du backend
+    import journal_alertes
+
+    if os.path.exists(os.path.join(dossier, "pret")):
+        return
+    os.makedirs(dossier, exist_ok=True)
+    base = os.path.join(dossier, stockage_capteurs.CHEMIN_BASE)  # Chemin absolu : une connexion par taille
+
+    generateur = random.Random(0)
+    capteurs = list(CAPTEURS)
+    debut = stockage_capteurs.vers_horodatage(datetime.strptime(DEBUT, "%Y-%m-%d"))
+    valeurs = {capteur: depart for capteur, (depart, _) in CAPTEURS.items()}
+    lot = []
+    for numero in range(lectures):
+        capteur = capteurs[numero % len(capteurs)]
+        valeurs[capteur] += generateur.gauss(0, CAPTEURS[capteur][1])
+        lot.append((capteur, debut + numero // len(capteurs), round(valeurs[capteur], 3)))
+        if len(lot) >= TAILLE_LOT:
+            stockage_capteurs.ajouter_lectures(lot, base)
+            lot = []
+    if lot:
+        stockage_capteurs.ajouter_lectures(lot, base)
+    stockage_capteurs.connexion(base).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    parametres = ["Température", "Humidité", "CO2"]
+    data = {"active_alerts": [], "read_alerts": [], "alerts_by_time": {
+        heure_alerte(numero): {"Parameter": parametres[numero % 3], "Value": round(generateur.uniform(0, 1000), 1),
+                               "Message": "Seuil dépassé", "read": numero % 2 == 1}
+        for numero in range(alertes)
+    }}
+    journal_alertes.ecrire_instantane(os.path.join(dossier, "alerts.json"), data)
+    open(os.path.join(dossier, "pret"), "w").close()
+
+# --------------------------- OPÉRATIONS MESURÉES ---------------------------
+
+OPERATIONS = ("add_alert_by_time", "load_alerts_from_file", "get_unread_alerts",
+              "get_trend_data", "get_trend_data_mois", "get_detailed_trend_data")
+FICHIER_ESSAI = "alerts.essai.json"  # Copie modifiée par add_alert_by_time (l'original reste intact)
+
+
+def _operations():
+    """
+    :return: Dictionnaire nom -> fonction(numéro de répétition) ; importé dans le processus de mesure.
+    """
+    import backend_
+
+    return {
+        "add_alert_by_time": lambda numero: backend_.add_alert_by_time(
+            f"99:{numero:06}", "CO2", 900.0, "CO2 trop élevé", filename=FICHIER_ESSAI),
+        "load_alerts_from_file": lambda numero: backend_.load_alerts_from_file(),
+        "get_unread_alerts": lambda numero: backend_.get_unread_alerts(),
+        "get_trend_data": lambda numero: backend_.get_trend_data(DEBUT),
+        "get_trend_data_mois": lambda numero: backend_.get_trend_data(DEBUT[:7]),
+        "get_detailed_trend_data": lambda numero: backend_.get_detailed_trend_data(DEBUT),
+    }
+
+
+def rss_pic_mo():
+    """
+    :return: Pic de mémoire résidente du processus courant, en Mo (Linux, macOS et Windows).
+    """
+    if sys.platform == "win32":
+        import ctypes  # Importés ici : seulement sous Windows (pas de module resource)
+        from ctypes import wintypes
+
+        class CompteursMemoire(ctypes.Structure):  # PROCESS_MEMORY_COUNTERS
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (nom, ctypes.c_size_t) for nom in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        compteurs = CompteursMemoire()
+        compteurs.cb = ctypes.sizeof(compteurs)
+        processus = ctypes.windll.kernel32.GetCurrentProcess
+        processus.restype = wintypes.HANDLE
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(processus(), ctypes.byref(compteurs), compteurs.cb):
+            return 0.0
+        return compteurs.PeakWorkingSetSize / 2**20
+
+    import resource
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pic / 2**20 if sys.platform == "darwin" else pic / 1024  # Octets sous macOS, Ko sous Linux
+
+
+def mesurer(operation, duree_min=DUREE_MIN):
+    """
+    Mesure une opération sur les données du dossier courant (appelé dans le processus de mesure).
+
+    :return: Dictionnaire {"p50_ms", "p99_ms", "debit", "repetitions", "rss_pic_mo"}.
+    """
+    shutil.copy("alerts.json", FICHIER_ESSAI)
+    try:
+        fonction = _operations()[operation]
+        fonction(-1)  # Échauffement : premier chargement des fichiers, connexion SQLite
+        latences = []
+        debut = time.perf_counter()
+        while (len(latences) < REPETITIONS_MIN or time.perf_counter() - debut < duree_min) \
+                and len(latences) < REPETITIONS_MAX:
+            depart = time.perf_counter()
+            fonction(len(latences))
+            latences.append(time.perf_counter() - depart)
+        total = time.perf_counter() - debut
+    finally:
+        for nom in os.listdir("."):
+            if nom.startswith(FICHIER_ESSAI):
+                os.remove(nom)  # Instantané, journal, sauvegardes et verrou de la copie
+
+    latences.sort()
+    return {
+        "p50_ms": latences[len(latences) // 2] * 1000,
+        "p99_ms": latences[min(len(latences) - 1, int(len(latences) * 0.99))] * 1000,
+        "debit": len(latences) / total,
+        "repetitions": len(latences),
+        "rss_pic_mo": rss_pic_mo(),
+    }
+
+
+def executer(tailles, operations=OPERATIONS, dossier=DOSSIER_DONNEES, duree_min=DUREE_MIN):
+    """
+    Génère les données manquantes puis mesure chaque opération dans un processus neuf.
+
+    :return: Liste de résultats {"operation", "taille", "p50_ms", ...}.
+    """
+    module = os.path.abspath(__file__)
+    resultats = []
+    for taille in tailles:
+        dossier_taille = os.path.abspath(os.path.join(dossier, taille))
+        print(f"Données '{taille}' : {TAILLES[taille][0]} lectures, {TAILLES[taille][1]} alertes", flush=True)
+        generer(dossier_taille, *TAILLES[taille])
+        for operation in operations:
+            sortie = subprocess.run(
+                [sys.executable, module, "--mesurer", operation, "--duree", str(duree_min)],
+                cwd=dossier_taille, capture_output=True, text=True, check=True,
+                env=dict(os.environ, PYTHONPATH=os.path.dirname(module)),
+            ).stdout
+            resultat = dict(json.loads(sortie.splitlines()[-1]), operation=operation, taille=taille)
+            afficher(resultat)
+            resultats.append(resultat)
+    return resultats
+
+# --------------------------- AFFICHAGE ET RÉFÉRENCES ---------------------------
+
+def afficher(resultat, reference=None):
+    ligne = (f"  {resultat['operation']:<26} {resultat['p50_ms']:>10.3f} ms {resultat['p99_ms']:>10.3f} ms "
+             f"{resultat['debit']:>10.0f} op/s {resultat['rss_pic_mo']:>8.0f} Mo")
+    if reference is not None:
+        ligne += f"   p50 x{resultat['p50_ms'] / reference['p50_ms']:.2f}"
+    print(ligne, flush=True)
+
+
+def comparer(resultats, references, seuil=SEUIL_REGRESSION):
+    """
+    Compare des résultats à une référence enregistrée.
+
+    :return: Liste des (taille, opération) dont la latence p50 dépasse la référence de plus de 'seuil'.
+    """
+    index = {(r["taille"], r["operation"]): r for r in references}
+    regressions = []
+    print(f"\nComparaison (seuil +{seuil:.0%} sur p50) :")
+    for resultat in resultats:
+        reference = index.get((resultat["taille"], resultat["operation"]))
+        if reference is None:
+            continue
+        afficher(resultat, reference)
+        if resultat["p50_ms"] > reference["p50_ms"] * (1 + seuil) + MARGE_ABSOLUE:
+            regressions.append((resultat["taille"], resultat["operation"]))
+    return regressions
+
+# --------------------------- POINT D'ENTRÉE ---------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai des fonctions de backend_")
+    parser.add_argument("--tailles", nargs="+", choices=list(TAILLES), default=["petit", "moyen"])
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--dossier", default=DOSSIER_DONNEES, help="Dossier des données synthétiques (réutilisées)")
+    parser.add_argument("--duree", type=float, default=DUREE_MIN, help="Durée minimale de chaque mesure (s)")
+    parser.add_argument("--enregistrer", metavar="FICHIER", help="Enregistrer les résultats comme référence")
+    parser.add_argument("--comparer", metavar="FICHIER", help="Comparer à une référence enregistrée")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION, help="Ralentissement toléré (0.2 = +20 %%)")
+    parser.add_argument("--mesurer", metavar="OPERATION", help=argparse.SUPPRESS)  # Processus de mesure
+    args = parser.parse_args()
+
+    if args.mesurer:
+        print(json.dumps(mesurer(args.mesurer, args.duree)))
+        sys.exit(0)
+
+    print(f"  {'opération':<26} {'p50':>13} {'p99':>13} {'débit':>15} {'pic RSS':>11}")
+    resultats = executer(args.tailles, args.operations, args.dossier, args.duree)
+    if args.enregistrer:
+        with open(args.enregistrer, "w", encoding="utf-8") as f:
+            json.dump({"date": datetime.now().isoformat(timespec="seconds"), "resultats": resultats}, f, indent=4)
+    if args.comparer:
+        with open(args.comparer, "r", encoding="utf-8") as f:
+            regressions = comparer(resultats, json.load(f)["resultats"], args.seuil)
+        for taille, operation in regressions:
+            print(f"RÉGRESSION : {operation} ({taille})")
+        sys.exit(1 if regressions else 0)
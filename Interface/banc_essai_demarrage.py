@@ -0,0 +1,192 @@
+# banc_essai_demarrage.py
+
+import os          # Variables d'environnement des processus mesurés
+import sys         # Interpréteur des processus mesurés, code de sortie
+import json        # Jalons de main.py, résultats, références enregistrées
+import time        # Heure de lancement des processus mesurés
+import argparse    # Options de la ligne de commande
+import subprocess  # Un processus neuf par mesure : aucun module déjà importé
+import banc_essai_backend  # Affichage et comparaison des résultats (même format)
+
+# --------------------------- PRINCIPE DU BANC D'ESSAI DU DÉMARRAGE ---------------------------
+
+# Suit le temps de démarrage de l'interface (main.py), chaque mesure dans un processus neuf :
+#   - "importations" : python -X importtime -c "import main" ; le temps d'importation de main
+#     et le temps propre de chaque paquet (tkinter, backend_...) sont affichés, comme le
+#     rapport de -X importtime mais regroupés et triés. Les modules LOURDS (matplotlib, NumPy)
+#     ne doivent pas être importés avant l'apparition de la fenêtre : leur présence est une
+#     régression (code de sortie 1) ;
+#   - "fenetre" : si un serveur d'affichage est joignable, main.py est lancé avec
+#     SERRE_DEMARRAGE=quitter et les jalons qu'il écrit sont mesurés depuis le lancement du
+#     processus : "fenetre" (premier affichage), "ecran" (écran des conditions affiché) et
+#     "prechargement" (autres écrans importés en arrière-plan).
+#
+# Les résultats ont le format de banc_essai_backend : --enregistrer / --comparer s'utilisent de
+# la même façon pour suivre le démarrage d'une version à l'autre.
+#
+# Exemple : python banc_essai_demarrage.py --enregistrer demarrage.json
+#           python banc_essai_demarrage.py --comparer demarrage.json
+
+REPETITIONS = 5
+LOURDS = ("matplotlib", "numpy")  # Chargés en arrière-plan, après le premier affichage
+PAQUETS_AFFICHES = 15
+JALONS = ("fenetre", "ecran", "prechargement")
+PREFIXE_JALON = "SERRE_DEMARRAGE "  # Lignes écrites sur stderr par main.jalon
+DELAI_MAX = 60  # s : au-delà, le démarrage de main.py est considéré comme bloqué
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+
+
+def _environnement(**variables):
+    return dict(os.environ, PYTHONPATH=DOSSIER, **variables)
+
+
+def resultat(operation, durees, rss_mo=0.0):
+    """
+    :param durees: Durées en secondes, une par processus.
+    :return: Résultat au format de banc_essai_backend.
+    """
+    durees = sorted(durees)
+    return {
+        "operation": operation, "taille": "demarrage",
+        "p50_ms": durees[len(durees) // 2] * 1000,
+        "p99_ms": durees[min(len(durees) - 1, int(len(durees) * 0.99))] * 1000,
+        "debit": len(durees) / sum(durees),
+        "repetitions": len(durees),
+        "rss_pic_mo": rss_mo,
+    }
+
+# --------------------------- IMPORTATIONS ---------------------------
+
+def lire_importtime(texte):
+    """
+    Analyse la sortie de -X importtime.
+
+    :return: Liste de (module, profondeur, temps propre en s, temps cumulé en s), dans l'ordre
+             de la sortie (un module apparaît après les modules qu'il importe).
+    """
+    modules = []
+    for ligne in texte.splitlines():
+        if not ligne.startswith("import time:"):
+            continue
+        propre, cumule, nom = ligne[len("import time:"):].split("|")
+        if not propre.strip().isdigit():
+            continue  # En-tête "self [us] | cumulative | imported package"
+        nom = nom[1:]  # Une espace après le séparateur, puis deux par niveau d'importation
+        profondeur = (len(nom) - len(nom.lstrip())) // 2
+        modules.append((nom.strip(), profondeur, int(propre) / 1e6, int(cumule) / 1e6))
+    return modules
+
+
+def mesurer_importations(repetitions=REPETITIONS, module="main"):
+    """
+    Importe 'module' dans des processus neufs avec -X importtime.
+
+    :return: (durées d'importation de 'module' en s, {paquet: [temps propres en s]},
+              modules LOURDS importés, pic de mémoire résidente en Mo).
+    """
+    # banc_essai_backend est importé après 'module' : absent de la mesure (voir plus bas)
+    script = f"import {module}, banc_essai_backend; print(banc_essai_backend.rss_pic_mo())"
+    durees, paquets, lourds, rss = [], {}, set(), 0.0
+    for _ in range(repetitions):
+        sortie = subprocess.run([sys.executable, "-X", "importtime", "-c", script], cwd=DOSSIER,
+                                capture_output=True, text=True, check=True, env=_environnement())
+        rss = max(rss, float(sortie.stdout.split()[-1]))
+        modules = lire_importtime(sortie.stderr)
+        fin = next(numero for numero, (nom, _, _, _) in enumerate(modules) if nom == module)
+        modules = modules[:fin + 1]  # Les modules importés après 'module' ne font pas partie du démarrage
+        durees.append(modules[-1][3])
+        temps = {}
+        for nom, _, propre, _ in modules:
+            paquet = nom.split(".")[0]
+            temps[paquet] = temps.get(paquet, 0.0) + propre
+            if paquet in LOURDS:
+                lourds.add(paquet)
+        for paquet, total in temps.items():
+            paquets.setdefault(paquet, []).append(total)
+    return durees, paquets, sorted(lourds), rss
+
+
+def afficher_paquets(paquets, nombre=PAQUETS_AFFICHES):
+    """
+    Affiche les paquets les plus coûteux (temps propre médian de leurs modules).
+    """
+    medianes = {paquet: sorted(temps)[len(temps) // 2] for paquet, temps in paquets.items()}
+    print(f"\n  {'paquet':<26} {'temps propre':>13}")
+    for paquet, temps in sorted(medianes.items(), key=lambda item: -item[1])[:nombre]:
+        print(f"  {paquet:<26} {temps * 1000:>10.1f} ms")
+    print()
+
+# --------------------------- FENÊTRE ---------------------------
+
+def mesurer_fenetre(repetitions=REPETITIONS, dossier="."):
+    """
+    Lance main.py (SERRE_DEMARRAGE=quitter) dans des processus neufs.
+
+    :param dossier: Dossier de travail de l'interface (data.json, alerts.json, capteurs.db).
+    :return: Dictionnaire jalon -> durées en s depuis le lancement du processus.
+    """
+    durees = {nom: [] for nom in JALONS}
+    for _ in range(repetitions):
+        lancement = time.time()
+        sortie = subprocess.run([sys.executable, os.path.join(DOSSIER, "main.py")], cwd=dossier,
+                                capture_output=True, text=True, timeout=DELAI_MAX,
+                                env=_environnement(SERRE_DEMARRAGE="quitter"))
+        jalons = {}
+        for ligne in sortie.stderr.splitlines():
+            if ligne.startswith(PREFIXE_JALON):
+                jalon = json.loads(ligne[len(PREFIXE_JALON):])
+                jalons[jalon["jalon"]] = jalon["epoque"] - lancement
+        if set(jalons) != set(JALONS):
+            raise RuntimeError(f"main.py s'est arrêté avant la fin du démarrage :\n{sortie.stderr}")
+        for nom in JALONS:
+            durees[nom].append(jalons[nom])
+    return durees
+
+
+def affichage_disponible():
+    """
+    :return: True si un serveur d'affichage est joignable (fenêtre Tk créée dans un processus neuf).
+    """
+    essai = subprocess.run([sys.executable, "-c", "import tkinter; tkinter.Tk().destroy()"],
+                           capture_output=True)
+    return essai.returncode == 0
+
+# --------------------------- POINT D'ENTRÉE ---------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rapport du temps de démarrage de l'interface")
+    parser.add_argument("--mode", choices=["auto", "importations", "fenetre"], default="auto",
+                        help="importations : -X importtime seulement ; fenetre : aussi les jalons (affichage requis)")
+    parser.add_argument("--repetitions", type=int, default=REPETITIONS, help="Processus lancés par mesure")
+    parser.add_argument("--dossier", default=".", help="Dossier de travail de l'interface (mode fenetre)")
+    parser.add_argument("--enregistrer", metavar="FICHIER", help="Enregistrer les résultats comme référence")
+    parser.add_argument("--comparer", metavar="FICHIER", help="Comparer à une référence enregistrée")
+    parser.add_argument("--seuil", type=float, default=banc_essai_backend.SEUIL_REGRESSION)
+    args = parser.parse_args()
+
+    durees, paquets, lourds, rss = mesurer_importations(args.repetitions)
+    afficher_paquets(paquets)
+    print(f"  {'opération':<26} {'p50':>13} {'p99':>13} {'débit':>15} {'pic RSS':>11}")
+    resultats = [resultat("import_main", durees, rss)]
+    banc_essai_backend.afficher(resultats[0])
+
+    fenetre = args.mode == "fenetre" or (args.mode == "auto" and affichage_disponible())
+    if fenetre:
+        for nom, durees_jalon in mesurer_fenetre(args.repetitions, args.dossier).items():
+            resultats.append(resultat(nom, durees_jalon))
+            banc_essai_backend.afficher(resultats[-1])
+    elif args.mode == "auto":
+        print("Pas de serveur d'affichage : importations seulement")
+
+    if lourds:
+        print(f"\nRÉGRESSION : {', '.join(lourds)} importé(s) avant l'apparition de la fenêtre")
+    if args.enregistrer:
+        with open(args.enregistrer, "w", encoding="utf-8") as f:
+            json.dump({"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "resultats": resultats}, f, indent=4)
+    regressions = []
+    if args.comparer:
+        with open(args.comparer, "r", encoding="utf-8") as f:
+            regressions = banc_essai_backend.comparer(resultats, json.load(f)["resultats"], args.seuil)
+        for _, operation in regressions:
+            print(f"RÉGRESSION : {operation}")
+    sys.exit(1 if regressions or lourds else 0)
@@ -0,0 +1,234 @@
+# banc_essai_interface.py
+
+import gc          # Comptage des figures matplotlib encore vivantes
+import os          # Taille des pages mémoire (mémoire résidente)
+import sys         # Code de sortie de la comparaison
+import json        # Résultats, références enregistrées
+import time        # Mesure des durées (perf_counter)
+import argparse    # Options de la ligne de commande
+import tracemalloc # Mémoire allouée par Python entre deux changements d'écran
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import tableaux_journees  # Journée synthétique au format de get_detailed_trend_data
+import banc_essai_backend  # Affichage et comparaison des résultats (même format)
+
+# --------------------------- PRINCIPE DU BANC D'ESSAI DE L'INTERFACE ---------------------------
+
+# Mesure le coût de construction des écrans, sans affichage à l'écran ni Xvfb :
+#   - mode "tk"  : si un serveur d'affichage est joignable, une fenêtre Tk masquée (withdraw)
+#                  reçoit les vrais écrans : display_condition_screen, create_modern_gauge,
+#                  tracer_graphique (partie affichage) et des changements d'écran répétés ;
+#   - mode "agg" : sinon (serveur, intégration continue), seules les figures sont mesurées avec
+#                  le moteur de rendu Agg : jauges et graphique des tendances, construits et
+#                  dessinés comme à l'écran.
+# Le graphique est tracé à partir d'une journée synthétique (une lecture par seconde et par
+# capteur) : le coût des lectures est mesuré par banc_essai_backend.
+#
+# Après N changements d'écran (ou N cycles de rendu en mode agg), la croissance de la mémoire
+# Python (tracemalloc), de la mémoire résidente et du nombre de figures vivantes est affichée :
+# une figure recréée à chaque affichage sans être libérée apparaît immédiatement.
+#
+# Les résultats ont le format de banc_essai_backend : --enregistrer / --comparer s'utilisent de
+# la même façon pour suivre les performances de l'interface.
+
+REPETITIONS = 20
+CHANGEMENTS_ECRAN = 50
+DATE = "2025-01-01"
+COULEURS_JAUGE = ["#00FF00", "#FFFF00", "#FF0000"]
+
+
+def journee_synthetique(date=DATE, pas=1):
+    """
+    :return: Tableau structuré d'une journée (type tableaux_journees.TYPE), une lecture toutes
+             les 'pas' secondes pour chaque capteur.
+    """
+    import stockage_capteurs
+
+    debut = stockage_capteurs.bornes_journee(date)[0]
+    horodatages = np.arange(debut, debut + 86400, pas, dtype=np.int64)
+    generateur = np.random.default_rng(0)
+    series = {
+        capteur: (horodatages, depart + np.cumsum(generateur.normal(0, ecart, len(horodatages))))
+        for capteur, (depart, ecart) in banc_essai_backend.CAPTEURS.items()
+    }
+    return tableaux_journees.construire(series)
+
+
+def figures_vivantes():
+    gc.collect()
+    return sum(isinstance(objet, Figure) for objet in gc.get_objects())
+
+
+def memoire_residente_mo():
+    """
+    :return: Mémoire résidente actuelle (et non le pic) en Mo, ou 0 si /proc n'existe pas.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20  # Pages de 4, 16 ou 64 Ko
+    except (OSError, AttributeError):  # Pas de /proc ni de sysconf (Windows)
+        return 0.0
+
+
+def chronometrer(nom, mode, fonction, repetitions=REPETITIONS):
+    """
+    Appelle 'fonction' plusieurs fois et retourne un résultat au format de banc_essai_backend.
+    """
+    latences = []
+    for numero in range(repetitions):
+        depart = time.perf_counter()
+        fonction(numero)
+        latences.append(time.perf_counter() - depart)
+    latences.sort()
+    resultat = {
+        "operation": nom, "taille": mode,
+        "p50_ms": latences[len(latences) // 2] * 1000,
+        "p99_ms": latences[min(len(latences) - 1, int(len(latences) * 0.99))] * 1000,
+        "debit": len(latences) / sum(latences),
+        "repetitions": len(latences),
+        "rss_pic_mo": memoire_residente_mo(),
+    }
+    banc_essai_backend.afficher(resultat)
+    return resultat
+
+
+def croissance(nom, cycle, nombre):
+    """
+    Exécute 'cycle' 'nombre' fois et affiche la mémoire gagnée (après un premier cycle
+    d'échauffement, qui crée légitimement les objets persistants).
+    """
+    cycle(0)
+    gc.collect()
+    tracemalloc.start()
+    avant = tracemalloc.get_traced_memory()[0], memoire_residente_mo(), figures_vivantes()
+    for numero in range(1, nombre + 1):
+        cycle(numero)
+    gc.collect()
+    apres = tracemalloc.get_traced_memory()[0], memoire_residente_mo(), figures_vivantes()
+    tracemalloc.stop()
+    print(f"  {nom} x{nombre} : Python {(apres[0] - avant[0]) / 1024:+.0f} Ko, "
+          f"résident {apres[1] - avant[1]:+.1f} Mo, figures {avant[2]} -> {apres[2]}", flush=True)
+
+# --------------------------- MODE AGG (SANS AFFICHAGE) ---------------------------
+
+def executer_agg(changements=CHANGEMENTS_ECRAN):
+    import condition_et_gestion
+    import tendance
+
+    journee = journee_synthetique()
+    resultats = []
+
+    def jauge(numero):
+        # Nouvelle jauge construite et dessinée en entier (premier affichage de l'écran)
+        objet = condition_et_gestion.JaugeModerne("Température", 0, 50, COULEURS_JAUGE)
+        FigureCanvasAgg(objet.fig).draw()
+        objet.mettre_a_jour(f"{20 + numero % 10}°C")
+    resultats.append(chronometrer("construction_jauge", "agg", jauge))
+
+    graphique = tendance.GraphiqueTendance()
+    canvas = FigureCanvasAgg(graphique.fig)
+    heures = tendance.heures_de(journee["horodatage"])
+
+    def tracer(numero):
+        parametre = ("Température", "Humidité", "CO2")[numero % 3]
+        graphique.afficher(parametre, heures, journee[parametre], DATE)
+        canvas.draw()
+    resultats.append(chronometrer("tracer_graphique", "agg", tracer))
+
+    def cycle(numero):
+        jauge(numero)
+        tracer(numero)
+    croissance("cycles de rendu", cycle, changements)
+    return resultats
+
+# --------------------------- MODE TK (FENÊTRE MASQUÉE) ---------------------------
+
+def executer_tk(root, changements=CHANGEMENTS_ECRAN):
+    import tkinter as tk
+    import condition_et_gestion
+    import tendance
+    import service_donnees
+    import planificateur
+    import surveillance_fichiers
+
+    root.withdraw()
+    root.geometry("1200x800")
+    service_donnees.demarrer(root)
+    planificateur.demarrer(root)
+    surveillance_fichiers.demarrer(root)
+    main_frame = tk.Frame(root)
+    main_frame.pack(fill=tk.BOTH, expand=True)
+    journee = journee_synthetique()
+    resultats = []
+
+    def ecran_conditions(numero):
+        condition_et_gestion.display_condition_screen(main_frame)
+        root.update_idletasks()
+    resultats.append(chronometrer("display_condition_screen", "tk", ecran_conditions))
+
+    def jauge(numero):
+        cadre = tk.Frame(main_frame)
+        condition_et_gestion.create_modern_gauge(cadre, "Température", f"{20 + numero % 10}°C", 0, 50, COULEURS_JAUGE)
+        root.update_idletasks()
+        cadre.destroy()
+    resultats.append(chronometrer("create_modern_gauge", "tk", jauge))
+
+    cadre_graphique = tk.Frame(main_frame)
+    cadre_graphique.pack(fill=tk.BOTH, expand=True)
+
+    def tracer(numero):
+        parametre = ("Température", "Humidité", "CO2")[numero % 3]
+        tendance.afficher_graphique(parametre, cadre_graphique, DATE, journee)  # Rappel de tracer_graphique
+        tendance._graphique.canvas.draw()  # Rendu immédiat au lieu de draw_idle
+    resultats.append(chronometrer("tracer_graphique", "tk", tracer))
+
+    def changer_ecran(numero):
+        if numero % 2:
+            tendance.afficher_menu_tendances(main_frame)
+        else:
+            condition_et_gestion.display_condition_screen(main_frame)
+        root.update()
+    croissance("changements d'écran", changer_ecran, changements)
+
+    service_donnees.arreter()
+    return resultats
+
+# --------------------------- POINT D'ENTRÉE ---------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai du rendu des écrans de l'interface")
+    parser.add_argument("--mode", choices=["auto", "tk", "agg"], default="auto",
+                        help="tk : fenêtre masquée (affichage requis) ; agg : figures seules")
+    parser.add_argument("--changements", type=int, default=CHANGEMENTS_ECRAN, help="Changements d'écran mesurés")
+    parser.add_argument("--enregistrer", metavar="FICHIER", help="Enregistrer les résultats comme référence")
+    parser.add_argument("--comparer", metavar="FICHIER", help="Comparer à une référence enregistrée")
+    parser.add_argument("--seuil", type=float, default=banc_essai_backend.SEUIL_REGRESSION)
+    args = parser.parse_args()
+
+    racine = None
+    if args.mode != "agg":
+        import tkinter as tk
+        try:
+            racine = tk.Tk()
+        except tk.TclError:
+            if args.mode == "tk":
+                raise
+            print("Pas de serveur d'affichage : mode agg (figures seules)")
+
+    print(f"  {'opération':<26} {'p50':>13} {'p99':>13} {'débit':>15} {'résident':>11}")
+    if racine is not None:
+        resultats = executer_tk(racine, args.changements)
+        racine.destroy()
+    else:
+        resultats = executer_agg(args.changements)
+
+    if args.enregistrer:
+        with open(args.enregistrer, "w", encoding="utf-8") as f:
+            json.dump({"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "resultats": resultats}, f, indent=4)
+    if args.comparer:
+        with open(args.comparer, "r", encoding="utf-8") as f:
+            regressions = banc_essai_backend.comparer(resultats, json.load(f)["resultats"], args.seuil)
+        for mode, operation in regressions:
+            print(f"RÉGRESSION : {operation} ({mode})")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,81 @@
+# cache_json.py
+
+import os         # stat des fichiers (clé du cache)
+import json       # Analyse des fichiers
+import threading  # Le cache est partagé par les threads du service de données
+import time       # Durée des analyses (supervision)
+
+# --------------------------- PRINCIPE DU CACHE DES FICHIERS JSON ---------------------------
+
+# Chaque fichier JSON lu par l'application (data.json, instantané alerts.json) est gardé en
+# mémoire avec son empreinte (date de modification en ns, taille, inode). Une nouvelle lecture
+# ne coûte qu'un appel à stat tant que le fichier n'a pas changé ; sinon il est relu et analysé.
+# Les écrivains remplacent les fichiers par renommage (nouvel inode) ou changent leur date :
+# toute écriture, d'un autre processus comme du nôtre, invalide donc l'entrée. Nos propres
+# écritures appellent aussi invalider() pour libérer l'ancienne version tout de suite.
+#
+# L'objet retourné est partagé entre les appelants : il ne doit pas être modifié.
+
+_cache = {}  # Chemin absolu -> (empreinte, objet analysé)
+_compteurs = {"succes": 0, "echecs": 0, "secondes": 0.0}  # "secondes" : durée cumulée des vraies lectures
+_verrou = threading.Lock()
+
+
+def empreinte(chemin):
+    """
+    :return: Tuple (date de modification en ns, taille, inode), ou None si le fichier n'existe pas.
+    """
+    try:
+        etat = os.stat(chemin)
+    except FileNotFoundError:
+        return None
+    return etat.st_mtime_ns, etat.st_size, etat.st_ino
+
+
+def charger(chemin, verifier=None):
+    """
+    Retourne le contenu analysé d'un fichier JSON, depuis le cache s'il n'a pas changé.
+
+    :param chemin: Chemin du fichier.
+    :param verifier: Fonction appelée avec l'objet analysé lors d'une vraie lecture ; si elle
+                     lève une exception, l'objet n'est pas mis en cache.
+    :return: Objet JSON (à ne pas modifier).
+    :raises FileNotFoundError, json.JSONDecodeError: comme json.load.
+    """
+    chemin = os.path.abspath(chemin)
+    cle = empreinte(chemin)
+    if cle is None:
+        raise FileNotFoundError(chemin)
+
+    with _verrou:
+        entree = _cache.get(chemin)
+        if entree is not None and entree[0] == cle:
+            _compteurs["succes"] += 1
+            return entree[1]
+        _compteurs["echecs"] += 1
+
+    depart = time.perf_counter()
+    with open(chemin, "r", encoding="utf-8") as file:
+        objet = json.load(file)
+    if verifier is not None:
+        verifier(objet)
+    with _verrou:
+        _compteurs["secondes"] += time.perf_counter() - depart
+        _cache[chemin] = (cle, objet)  # Empreinte prise avant la lecture : une écriture pendant la lecture sera revue
+    return objet
+
+
+def invalider(chemin):
+    """
+    Oublie la version en cache d'un fichier (appelé après nos propres écritures).
+    """
+    with _verrou:
+        _cache.pop(os.path.abspath(chemin), None)
+
+
+def compteurs():
+    """
+    :return: Dictionnaire {"succes": ..., "echecs": ..., "secondes": ..., "entrees": ...} pour la supervision.
+    """
+    with _verrou:
+        return dict(_compteurs, entrees=len(_cache))
@@ -4,10 +4,16 @@ import tkinter as tk
 from tkinter import ttk
 
 # Bibliothèques nécessaires aux jauges circulaires
-import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.transforms import ScaledTranslation
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+import service_donnees  # Lecture de data.json hors du thread Tkinter
+import surveillance_fichiers  # Relecture de data.json seulement quand il change
+import cache_json  # data.json analysé une fois par version
+import instrumentation  # Comptage et durées des rafraîchissements (optionnel)
+
 #Importer le fichier de alex
 """exemple : from capteur import condition_actuel """
 # -----------------------------------------------------------------------------
@@ -115,9 +121,6 @@ def display_condition_screen(main_frame):
     tk.Label(graph_frame, text="Graphique simplifié en développement", font=("Arial", 12), bg="lightgrey").pack(pady=20)
 
 
-    # On appelle la mise à jour des conditions (réelles) depuis data.json
-    update_conditions(parameter_frame)
-
     # -------------------------- PARTIE 1.1 : AJOUT DES JAUGES CIRCULAIRES (dans graph_frame) ------------------------------
     gauges_frame = tk.Frame(graph_frame, bg="#1E1E1E")
     gauges_frame.pack(fill=tk.X, padx=20, pady=20)
@@ -154,96 +157,216 @@ def display_condition_screen(main_frame):
     create_modern_gauge(gauges_frame, "Humidité", parameters["Humidité"], 0, 100, humidity_colors)
     create_modern_gauge(gauges_frame, "CO2", parameters["CO2"], 300, 800, co2_colors)
 
+    # Mise à jour des conditions (réelles) depuis data.json : une lecture maintenant, puis une
+    # à chaque modification du fichier. L'abonnement "conditions" remplace celui d'un affichage
+    # précédent et s'arrête avec l'écran.
+    update_conditions(parameter_frame)
+    surveillance_fichiers.surveiller("conditions", FICHIER_CONDITIONS,
+                                     lambda: update_conditions(parameter_frame), proprietaire=parameter_frame)
+
 # ------------------------------------PARTIE 2 : MISE À JOUR DES CONDITIONS (lecture de data.json)------------------------------
 
+FICHIER_CONDITIONS = "data.json"  # Publié par ingestion_capteurs
+
+@instrumentation.mesure
 def update_conditions(parameter_frame): # Alex, si tu exportes des données dans un fichier JSON, sinon on peut les importer directement dans mon code en temps réel (ce qui est plus simple je pense). Dis-moi ce que tu préfères.
 
     """
-    Essaie de lire un fichier data.json pour mettre à jour les paramètres
-    (Température, Humidité, CO2, etc.). En cas d'erreur (fichier introuvable,
-    JSON invalide), on ignore simplement l'update.
+    Demande la lecture de data.json en arrière-plan pour mettre à jour les paramètres
+    (Température, Humidité, CO2, etc.). L'affichage est fait par afficher_conditions
+    sur le thread Tkinter quand la lecture est terminée.
+
+    Appelée à chaque modification de data.json (abonnement "conditions").
     """
-    try:
-        with open("data.json", "r", encoding="utf-8") as file:
-            real_data = json.load(file)
+    service_donnees.demander("conditions", lire_conditions,
+                             rappel=lambda real_data: afficher_conditions(parameter_frame, real_data))
 
-        # Mettre à jour les labels existants (colonne 1) avec les nouvelles valeurs
-        for i, (param, value) in enumerate(real_data.items()):
-            parameter_frame.grid_slaves(row=i, column=1)[0].config(text=value)
 
+@instrumentation.mesure
+def lire_conditions():
+    """
+    Lit data.json (exécuté dans un thread de travail, sans toucher aux widgets).
+    Le fichier n'est analysé que s'il a changé depuis la lecture précédente.
+    En cas d'erreur (fichier introuvable, JSON invalide), retourne None.
+    """
+    try:
+        return cache_json.charger(FICHIER_CONDITIONS)  # Partagé avec le cache : lu seulement
     except FileNotFoundError:
         print("Fichier de données non trouvé. Les données ne peuvent pas être mises à jour.")
     except json.JSONDecodeError:
         print("Erreur de décodage du fichier JSON. Assurez-vous que le fichier est valide.")
+    return None
 
-    # On rappelle cette fonction toutes les 10 secondes
-    parameter_frame.after(10000, update_conditions, parameter_frame)
 
-# -----------------------------------------------------------------------------
-# Fonction de création d'une jauge circulaire "moderne"
-# -----------------------------------------------------------------------------
-def create_modern_gauge(frame, title, value, min_val, max_val, colors):
+@instrumentation.mesure
+def afficher_conditions(parameter_frame, real_data):
     """
-    Crée une jauge circulaire de style "futuriste/dark theme" dans 'frame'.
-      - title : nom de la jauge (ex: "Température")
-      - value : valeur actuelle (peut être un string "28°C" ou un float)
-      - min_val, max_val : limites min et max de la jauge
-      - colors : liste de couleurs pour dégrader le remplissage
+    Met à jour les labels et les jauges avec les valeurs lues (thread Tkinter).
     """
+    if real_data is None or not parameter_frame.winfo_exists():
+        return  # Lecture impossible, ou l'écran a été fermé pendant la lecture
 
-    # On crée un petit Frame pour loger la jauge
-    gauge_frame = tk.Frame(frame, bg="#1E1E1E")
-    gauge_frame.pack(pady=10, padx=10, side=tk.LEFT)
-
-    # Création d'une figure matplotlib "en polar" (jauge circulaire)
-    fig, ax = plt.subplots(figsize=(3.5, 3.5), subplot_kw={'projection': 'polar'})
-    fig.patch.set_facecolor('#1E1E1E')  # Couleur de fond de la figure
-    ax.set_facecolor('#1E1E1E')         # Couleur de fond de la zone de tracé
-
-    # Conversion de la valeur en nombre, même si c'est "28°C"
-    if isinstance(value, str):
-        value_num = extract_number(value)
-    else:
-        value_num = float(value)
-
-    # On crée une série d'angles pour tracer des arcs colorés
-    angles = np.linspace(0, 270, len(colors))
-    angles = np.deg2rad(angles)  # Conversion degrés -> radians
-
-    # On remplit des sections entre 0.7 et 0.9 (pour dessiner un anneau)
-    for i in range(len(colors) - 1):
-        ax.fill_between([angles[i], angles[i+1]], 0.7, 0.9,
-                        color=colors[i], alpha=0.6)
+    # Mettre à jour les labels existants (colonne 1) avec les nouvelles valeurs
+    for i, (param, value) in enumerate(real_data.items()):
+        parameter_frame.grid_slaves(row=i, column=1)[0].config(text=value)
 
-    # Placement des "ticks" (graduations) de 0 à 270°, ici on en met 6
-    tick_angles = np.linspace(0, 270, 6)  # angles en degrés
-    tick_values = np.linspace(min_val, max_val, 6)
-    ax.set_xticks(np.deg2rad(tick_angles))
-    ax.set_xticklabels([f'{int(v)}' for v in tick_values], color='white')
+        # Seule l'aiguille de la jauge correspondante est redessinée
+        if param in _jauges:
+            _jauges[param].mettre_a_jour(value)
 
-    # Calcul de l'angle de l'aiguille selon la proportion
-    needle_angle = 270 * (value_num - min_val) / (max_val - min_val)
-    needle_angle = np.deg2rad(needle_angle)
-
-    # Tracé de l'aiguille (de l'origine vers 0.8)
-    ax.plot([0, needle_angle], [0, 0.8], color='white', linewidth=2)
+# -----------------------------------------------------------------------------
+# Jauge circulaire "moderne" persistante
+# -----------------------------------------------------------------------------
 
-    # Configuration du rayon
-    ax.set_ylim(0, 1)
+# Jauges déjà construites, par titre : la figure et son fond statique sont réutilisés
+# chaque fois que l'écran des conditions est réaffiché.
+_jauges = {}
 
-    # Titre de la jauge
-    ax.set_title(f"{title}\n{value}", color='white', pad=20)
 
-    # Suppression du quadrillage et des ticks radiaux
-    ax.grid(False)
-    ax.set_rticks([])
+class JaugeModerne:
+    """
+    Jauge circulaire de style "futuriste/dark theme".
+    Le fond (anneau coloré, graduations) est dessiné une seule fois puis mis en cache ;
+    une nouvelle valeur ne redessine que l'aiguille et le texte de la valeur (blitting).
+    """
 
-    # On intègre la figure matplotlib dans Tkinter
-    canvas = FigureCanvasTkAgg(fig, master=gauge_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack()
+    def __init__(self, title, min_val, max_val, colors):
+        """
+          - title : nom de la jauge (ex: "Température")
+          - min_val, max_val : limites min et max de la jauge
+          - colors : liste de couleurs pour dégrader le remplissage
+        """
+        self.title = title
+        self.min_val = min_val
+        self.max_val = max_val
+        self.canvas = None
+        self._fond = None  # Image du fond statique (copy_from_bbox)
+        self._derniere_valeur = None
+
+        # Figure créée sans pyplot : elle n'est pas gardée dans le registre global
+        self.fig = Figure(figsize=(3.5, 3.5))
+        self.fig.patch.set_facecolor('#1E1E1E')  # Couleur de fond de la figure
+        self.ax = self.fig.add_subplot(projection='polar')
+        self.ax.set_facecolor('#1E1E1E')         # Couleur de fond de la zone de tracé
+
+        # On crée une série d'angles pour tracer des arcs colorés
+        angles = np.linspace(0, 270, len(colors))
+        angles = np.deg2rad(angles)  # Conversion degrés -> radians
+
+        # On remplit des sections entre 0.7 et 0.9 (pour dessiner un anneau)
+        for i in range(len(colors) - 1):
+            self.ax.fill_between([angles[i], angles[i+1]], 0.7, 0.9,
+                                 color=colors[i], alpha=0.6)
+
+        # Placement des "ticks" (graduations) de 0 à 270°, ici on en met 6
+        tick_angles = np.linspace(0, 270, 6)  # angles en degrés
+        tick_values = np.linspace(min_val, max_val, 6)
+        self.ax.set_xticks(np.deg2rad(tick_angles))
+        self.ax.set_xticklabels([f'{int(v)}' for v in tick_values], color='white')
+
+        # Configuration du rayon
+        self.ax.set_ylim(0, 1)
+
+        # Suppression du quadrillage et des ticks radiaux
+        self.ax.grid(False)
+        self.ax.set_rticks([])
+
+        # Titre fixe (dessiné avec le fond) ; la valeur s'affiche sur la ligne en dessous
+        self.ax.set_title(title, color='white', pad=35)
+        decalage = ScaledTranslation(0, 20 / 72, self.fig.dpi_scale_trans)  # 20 points au-dessus de l'axe
+
+        # Artistes "animés" : exclus du dessin du fond, redessinés seuls à chaque valeur
+        self.needle, = self.ax.plot([0, 0], [0, 0.8], color='white', linewidth=2, animated=True)
+        self.value_text = self.ax.text(0.5, 1.0, "", transform=self.ax.transAxes + decalage,
+                                       ha='center', va='bottom', fontsize='large', color='white',
+                                       animated=True)
+
+        # Les callbacks sont portés par la figure : une seule connexion suffit pour tous les canvas
+        self.fig.canvas.mpl_connect('draw_event', self._sur_dessin)
+
+    def attacher(self, frame):
+        """
+        Place la jauge dans 'frame'. Seul le canvas Tk est recréé (l'ancien a été détruit
+        avec l'écran précédent) ; la figure et ses artistes sont conservés.
+        """
+        gauge_frame = tk.Frame(frame, bg="#1E1E1E")
+        gauge_frame.pack(pady=10, padx=10, side=tk.LEFT)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=gauge_frame)
+        self._fond = None
+        self.canvas.draw()
+        self.canvas.get_tk_widget().pack()
+        return gauge_frame
+
+    def _sur_dessin(self, event):
+        """
+        Après un dessin complet (affichage, redimensionnement) : mise en cache du fond
+        puis dessin des artistes animés par-dessus.
+        """
+        if event.canvas is not self.canvas:
+            return  # Dessin pour un autre canvas (ex. savefig) : rien à mettre en cache
+        self._fond = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._dessiner_animes()
+
+    def _dessiner_animes(self):
+        self.ax.draw_artist(self.needle)
+        self.ax.draw_artist(self.value_text)
+
+    def est_affichee(self):
+        """
+        Indique si le canvas Tk de la jauge existe encore (l'écran n'a pas été détruit).
+        """
+        return self.canvas is not None and bool(self.canvas.get_tk_widget().winfo_exists())
+
+    def mettre_a_jour(self, value):
+        """
+        Déplace l'aiguille et change le texte de la valeur (rien n'est redessiné si la valeur
+        affichée n'a pas changé).
+          - value : valeur actuelle (peut être un string "28°C" ou un float)
+        """
+        if value == self._derniere_valeur and self._fond is not None and self.est_affichee():
+            return
+        self._derniere_valeur = value
+
+        # Conversion de la valeur en nombre, même si c'est "28°C"
+        if isinstance(value, str):
+            value_num = extract_number(value)
+        else:
+            value_num = float(value)
+
+        # Calcul de l'angle de l'aiguille selon la proportion
+        needle_angle = 270 * (value_num - self.min_val) / (self.max_val - self.min_val)
+        needle_angle = np.deg2rad(needle_angle)
+        self.needle.set_xdata([0, needle_angle])
+        self.value_text.set_text(str(value))
+
+        if not self.est_affichee():
+            return
+        if self._fond is None:
+            self.canvas.draw_idle()  # Le fond sera mis en cache par _sur_dessin
+            return
+
+        # Blitting : fond en cache + aiguille + valeur, sans redessiner le reste de la figure
+        self.canvas.restore_region(self._fond)
+        self._dessiner_animes()
+        self.canvas.blit(self.fig.bbox)
+
+
+@instrumentation.mesure
+def create_modern_gauge(frame, title, value, min_val, max_val, colors):
+    """
+    Affiche dans 'frame' la jauge circulaire 'title', construite une seule fois puis réutilisée.
+      - title : nom de la jauge (ex: "Température")
+      - value : valeur actuelle (peut être un string "28°C" ou un float)
+      - min_val, max_val : limites min et max de la jauge
+      - colors : liste de couleurs pour dégrader le remplissage
+    """
+    jauge = _jauges.get(title)
+    if jauge is None or (jauge.min_val, jauge.max_val) != (min_val, max_val):
+        jauge = _jauges[title] = JaugeModerne(title, min_val, max_val, colors)
 
-    return gauge_frame
+    jauge.mettre_a_jour(value)
+    return jauge.attacher(frame)
 
 
 #------------------ TEST LOCAL : si on exécute ce fichier directement-----------------------
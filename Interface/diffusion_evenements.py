@@ -0,0 +1,121 @@
+# diffusion_evenements.py
+
+import json       # Données des événements
+import threading  # Abonnés servis par des threads différents de celui qui publie
+from collections import deque
+
+# --------------------------- PRINCIPE DE LA DIFFUSION ---------------------------
+
+# Un seul producteur (le thread qui surveille data.json et les alertes) publie des événements ;
+# chaque spectateur connecté (flux Server-Sent Events) possède sa propre file bornée.
+#   - Le message est encodé une seule fois au format SSE, puis le même objet bytes est déposé
+#     dans toutes les files : le coût d'une publication ne dépend presque pas du nombre de
+#     spectateurs, et aucun d'eux n'accède au stockage.
+#   - Un spectateur trop lent (file pleine) est abandonné : sa connexion est fermée et le
+#     navigateur se reconnecte de lui-même (EventSource). Le producteur n'attend jamais.
+#   - Le dernier message de chaque type est gardé pour être envoyé dès l'abonnement
+#     (ex. les conditions actuelles, sans attendre le prochain changement).
+
+TAILLE_FILE = 64  # Messages en attente par spectateur avant abandon
+
+
+def encoder(evenement, donnees, numero):
+    """
+    :return: Message SSE encodé (bytes) : lignes "id", "event" et "data".
+    """
+    texte = json.dumps(donnees, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {numero}\nevent: {evenement}\ndata: {texte}\n\n".encode("utf-8")
+
+
+class Abonnement:
+    """
+    File bornée des messages d'un spectateur.
+    """
+
+    def __init__(self, taille_max):
+        self.taille_max = taille_max
+        self.abandonne = False
+        self._messages = deque()
+        self._condition = threading.Condition()
+
+    def deposer(self, message):
+        """
+        Ajoute un message (appelé par le producteur, ne bloque jamais).
+
+        :return: False si la file était pleine : l'abonnement est alors abandonné.
+        """
+        with self._condition:
+            if len(self._messages) >= self.taille_max:
+                self.abandonne = True
+                self._messages.clear()
+                self._condition.notify()
+                return False
+            self._messages.append(message)
+            self._condition.notify()
+            return True
+
+    def attendre(self, delai):
+        """
+        Attend au plus 'delai' secondes et retire tous les messages en attente.
+
+        :return: Liste de messages (vide si le délai a expiré), ou None si l'abonnement est abandonné.
+        """
+        with self._condition:
+            if not self._messages and not self.abandonne:
+                self._condition.wait(delai)
+            if self.abandonne:
+                return None
+            messages = list(self._messages)
+            self._messages.clear()
+            return messages
+
+
+class Diffuseur:
+    """
+    Diffusion d'événements vers des abonnés à files bornées.
+    """
+
+    def __init__(self, taille_file=TAILLE_FILE):
+        self.taille_file = taille_file
+        self._abonnes = set()
+        self._derniers = {}  # Type d'événement -> dernier message encodé
+        self._numero = 0
+        self._verrou = threading.Lock()
+        self.compteurs = {"publies": 0, "abandonnes": 0}
+
+    def abonner(self, rejouer=()):
+        """
+        Crée un abonnement.
+
+        :param rejouer: Types d'événements dont le dernier message est déposé immédiatement.
+        :return: Abonnement (à passer à desabonner() à la fin de la connexion).
+        """
+        abonnement = Abonnement(self.taille_file)
+        with self._verrou:
+            for evenement in rejouer:
+                if evenement in self._derniers:
+                    abonnement.deposer(self._derniers[evenement])
+            self._abonnes.add(abonnement)
+        return abonnement
+
+    def desabonner(self, abonnement):
+        with self._verrou:
+            self._abonnes.discard(abonnement)
+
+    def publier(self, evenement, donnees):
+        """
+        Encode un événement une fois et le dépose dans la file de chaque abonné.
+        """
+        with self._verrou:
+            self._numero += 1
+            message = encoder(evenement, donnees, self._numero)
+            self._derniers[evenement] = message
+            self.compteurs["publies"] += 1
+            for abonnement in list(self._abonnes):
+                if not abonnement.deposer(message):
+                    self._abonnes.discard(abonnement)  # Spectateur trop lent
+                    self.compteurs["abandonnes"] += 1
+
+    def nombre_abonnes(self):
+        with self._verrou:
+            return len(self._abonnes)
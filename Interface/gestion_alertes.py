@@ -2,7 +2,11 @@
 
 import tkinter as tk
 from tkinter import ttk
-from backend_ import add_alert_by_time, get_alerts_by_time, save_alerts_to_file, get_unread_alerts
+from backend_ import add_alert_by_time, get_alert_rows, save_alerts_to_file, get_unread_alerts, recharger_si_modifie
+import service_donnees  # Lecture des alertes hors du thread Tkinter
+import surveillance_fichiers  # Rafraîchissement quand un autre processus modifie les alertes
+import journal_alertes  # Chemin du journal des alertes
+import instrumentation  # Comptage et durées des rafraîchissements (optionnel)
 
 # --------------------------- PARTIE 1 : FONCTIONS POUR LA GESTION DES ALERTES ---------------------------
 
@@ -17,41 +21,159 @@ def creer_fenetre_alertes():        #backend_alerts
 
     frame_alertes = tk.Frame(fenetre_alertes, bg="#8B8B7A")
     frame_alertes.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    liste_alertes = ListeVirtuelle(frame_alertes, formater_alerte, vide="Aucune alerte enregistrée.")
+    liste_alertes.pack(fill=tk.BOTH, expand=True)
 
     # Création d'un menu local pour ajouter des alertes
     menu_local = tk.Menu(fenetre_alertes)
     fenetre_alertes.config(menu=menu_local)
-    menu_local.add_command(label="Ajouter une alerte", command=lambda: ajouter_alerte(fenetre_alertes, frame_alertes))
+    menu_local.add_command(label="Ajouter une alerte", command=lambda: ajouter_alerte(fenetre_alertes, liste_alertes))
 
-    # Affichage initial des alertes
-    rafraichir_alertes(frame_alertes)
+    # Affichage initial des alertes, puis à chaque modification des fichiers des alertes
+    rafraichir_alertes(liste_alertes)
+    surveillance_fichiers.surveiller("fenetre_alertes", ["alerts.json", journal_alertes.chemin_journal("alerts.json")],
+                                     lambda: rafraichir_alertes(liste_alertes, recharger=True), proprietaire=liste_alertes)
 
-def rafraichir_alertes(frame_alertes):
+def formater_alerte(ligne):
     """
-    Met à jour dynamiquement l'affichage des alertes dans un cadre spécifique.
+    :param ligne: Tuple ("HH:MM", alerte).
+    :return: Texte affiché pour l'alerte.
     """
-    count = 0
-    # Supprimer les widgets existants
-    for widget in frame_alertes.winfo_children():
-        widget.destroy()
-    alertes = get_alerts_by_time()
-
-    if alertes:
-        for heure, alerte in alertes.items():
-            count += 1
-            tk.Label(
-                frame_alertes, 
-                text=f"{heure} - {alerte['Parameter']}: {alerte['Value']} ({alerte['Message']})", 
-                wraplength=350, 
-                bg="#CDCDB4", 
-                relief=tk.GROOVE, 
-                padx=5, 
-                pady=5
-            ).pack(fill=tk.X, pady=2)
-    else:
-        tk.Label(frame_alertes, text="Aucune alerte enregistrée.", bg="#CDCDB4", pady=20).pack()
-
-def ajouter_alerte(fenetre_parent, frame_alertes):
+    heure, alerte = ligne
+    return f"{heure} - {alerte['Parameter']}: {alerte['Value']} ({alerte['Message']})"
+
+@instrumentation.mesure
+def rafraichir_alertes(liste_alertes, recharger=False):
+    """
+    Met à jour dynamiquement l'affichage des alertes dans la liste.
+    La copie des alertes est faite en arrière-plan ; l'affichage suit dans
+    afficher_alertes, sur le thread Tkinter.
+
+    :param recharger: Relire d'abord les fichiers s'ils ont été modifiés par un autre processus.
+    """
+    def lire():
+        if recharger:
+            recharger_si_modifie()
+        return get_alert_rows()
+
+    service_donnees.demander("alertes", lire, rappel=lambda lignes: afficher_alertes(liste_alertes, lignes))
+
+@instrumentation.mesure
+def afficher_alertes(liste_alertes, lignes):
+    """
+    Affiche les alertes lues dans la liste (appelé sur le thread Tkinter). Seules les lignes
+    visibles sont redessinées : le coût ne dépend pas du nombre d'alertes.
+    """
+    if not liste_alertes.winfo_exists():
+        return  # La fenêtre des alertes a été fermée pendant la lecture
+    liste_alertes.definir(lignes)
+
+# --------------------------- PARTIE 2 : LISTE VIRTUELLE ---------------------------
+
+# Une étiquette par alerte devient inutilisable avec des milliers d'alertes (création lente,
+# mémoire de la fenêtre). La liste virtuelle ne crée que les étiquettes visibles (quelques
+# dizaines) et les réutilise pendant le défilement : seul leur texte et leur position changent.
+# Toutes les lignes ont la même hauteur, ce qui permet de calculer directement la première
+# ligne visible à partir du décalage de défilement, sans parcourir la liste.
+
+class ListeVirtuelle(tk.Frame):
+    """
+    Liste défilante de hauteur de ligne fixe dont seules les lignes visibles existent en widgets.
+    """
+
+    HAUTEUR_LIGNE = 32  # px, espacement compris
+
+    def __init__(self, parent, formater, vide="", **options):
+        """
+        :param parent: Widget parent.
+        :param formater: Fonction qui retourne le texte d'une ligne.
+        :param vide: Texte affiché quand la liste est vide.
+        """
+        options.setdefault("bg", parent.cget("bg"))
+        super().__init__(parent, **options)
+        self.formater = formater
+        self.lignes = []
+        self.decalage = 0        # Décalage de défilement, en pixels
+        self._etiquettes = []    # Étiquettes réutilisées (une par ligne visible)
+        self._textes = []        # Texte actuellement affiché par chaque étiquette
+
+        self.barre = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._defiler)
+        self.barre.pack(side=tk.RIGHT, fill=tk.Y)
+        self.zone = tk.Frame(self, bg=options["bg"])
+        self.zone.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.message_vide = tk.Label(self.zone, text=vide, bg="#CDCDB4", pady=20)
+
+        self.zone.bind("<Configure>", lambda event: self._afficher())
+        self._lier_molette(self.zone)
+
+    def definir(self, lignes):
+        """
+        Remplace le contenu de la liste en gardant la position de défilement.
+
+        :param lignes: Liste des éléments (passés à 'formater' quand ils deviennent visibles).
+        """
+        self.lignes = lignes
+        self._afficher()
+
+    def _lier_molette(self, widget):
+        widget.bind("<MouseWheel>", lambda event: self._defiler("scroll", -3 if event.delta > 0 else 3, "units"))
+        widget.bind("<Button-4>", lambda event: self._defiler("scroll", -3, "units"))  # X11
+        widget.bind("<Button-5>", lambda event: self._defiler("scroll", 3, "units"))
+
+    def _defiler(self, action, quantite, unite=None):
+        """
+        Commande de la barre de défilement ("moveto", fraction) ou ("scroll", n, "units"/"pages").
+        """
+        hauteur_totale = len(self.lignes) * self.HAUTEUR_LIGNE
+        if action == "moveto":
+            self.decalage = int(float(quantite) * hauteur_totale)
+        elif unite == "pages":
+            self.decalage += int(quantite) * self.zone.winfo_height()
+        else:
+            self.decalage += int(quantite) * self.HAUTEUR_LIGNE
+        self._afficher()
+
+    def _afficher(self):
+        """
+        Positionne les étiquettes sur les lignes visibles (création au besoin, jamais de destruction).
+        """
+        hauteur = max(self.zone.winfo_height(), 1)
+        hauteur_totale = len(self.lignes) * self.HAUTEUR_LIGNE
+        self.decalage = max(0, min(self.decalage, hauteur_totale - hauteur))
+
+        if self.lignes:
+            self.message_vide.place_forget()
+        else:
+            self.message_vide.place(x=0, y=0, relwidth=1)
+
+        visibles = hauteur // self.HAUTEUR_LIGNE + 2
+        while len(self._etiquettes) < visibles:
+            etiquette = tk.Label(self.zone, bg="#CDCDB4", relief=tk.GROOVE, padx=5, anchor=tk.W)
+            self._lier_molette(etiquette)
+            self._etiquettes.append(etiquette)
+            self._textes.append(None)
+
+        premiere = self.decalage // self.HAUTEUR_LIGNE
+        for position, etiquette in enumerate(self._etiquettes):
+            numero = premiere + position
+            if position >= visibles or numero >= len(self.lignes):
+                etiquette.place_forget()
+                continue
+            texte = self.formater(self.lignes[numero])
+            if texte != self._textes[position]:
+                etiquette.config(text=texte)
+                self._textes[position] = texte
+            etiquette.place(x=0, y=numero * self.HAUTEUR_LIGNE - self.decalage + 2,
+                            relwidth=1, height=self.HAUTEUR_LIGNE - 4)
+
+        if hauteur_totale > 0:
+            self.barre.set(self.decalage / hauteur_totale, min(1.0, (self.decalage + hauteur) / hauteur_totale))
+        else:
+            self.barre.set(0.0, 1.0)
+
+# --------------------------- PARTIE 3 : AJOUT D'UNE ALERTE ---------------------------
+
+def ajouter_alerte(fenetre_parent, liste_alertes):
     """
     Ouvre une nouvelle fenêtre pour ajouter une alerte.
     """
@@ -113,7 +235,7 @@ def ajouter_alerte(fenetre_parent, frame_alertes):
             try:
                 valeur_flottante = float(valeur)
                 add_alert_by_time(f"{heure}:{minute}", parametre, valeur_flottante, message_predefini)
-                rafraichir_alertes(frame_alertes)
+                rafraichir_alertes(liste_alertes)
                 fenetre_ajout.destroy()  # Fermer la fenêtre après ajout
             except ValueError:
                 error_label = tk.Label(fenetre_ajout, text="La valeur doit être un nombre valide.", fg="red", bg="#8B8B7A")
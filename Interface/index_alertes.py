@@ -0,0 +1,134 @@
+# index_alertes.py
+
+import bisect  # Liste triée des heures pour les requêtes par plage horaire
+
+# --------------------------- PRINCIPE DE L'INDEX DES ALERTES ---------------------------
+
+# Index en mémoire des alertes de "alerts_by_time", mis à jour à chaque ajout, lecture ou
+# suppression. Les requêtes de l'interface ne relisent plus le fichier JSON :
+#   - nombre d'alertes non lues          : O(1)
+#   - alertes d'un paramètre / d'un statut : O(1) pour trouver l'ensemble
+#   - alertes entre deux heures          : O(log n) (recherche dichotomique)
+
+
+class IndexAlertes:
+    """
+    Index des alertes par heure, par paramètre, par statut (lue / non lue) et par plage horaire.
+    """
+
+    def __init__(self, alerts_by_time=None):
+        """
+        :param alerts_by_time: Dictionnaire {"HH:MM": alerte} servant à construire l'index.
+        """
+        self.reconstruire(alerts_by_time or {})
+
+    def reconstruire(self, alerts_by_time):
+        """
+        Reconstruit entièrement l'index (chargement du fichier des alertes).
+
+        :param alerts_by_time: Dictionnaire {"HH:MM": alerte}.
+        """
+        self.par_heure = alerts_by_time  # Même dictionnaire que alerts_database["alerts_by_time"]
+        self.heures_triees = sorted(alerts_by_time)
+        self.par_parametre = {}
+        self.non_lues = set()
+        self.lues = set()
+        for hour, alert in alerts_by_time.items():
+            self._indexer(hour, alert)
+
+    def _indexer(self, hour, alert):
+        self.par_parametre.setdefault(alert.get("Parameter"), set()).add(hour)
+        (self.lues if alert.get("read", False) else self.non_lues).add(hour)
+
+    def _desindexer(self, hour, alert):
+        heures = self.par_parametre.get(alert.get("Parameter"))
+        if heures is not None:
+            heures.discard(hour)
+            if not heures:
+                del self.par_parametre[alert.get("Parameter")]
+        self.non_lues.discard(hour)
+        self.lues.discard(hour)
+
+    # --------------------------- MISES À JOUR ---------------------------
+
+    def definir(self, hour, alert):
+        """
+        Ajoute ou remplace l'alerte de l'heure 'hour'.
+        """
+        ancienne = self.par_heure.get(hour)
+        if ancienne is not None:
+            self._desindexer(hour, ancienne)
+        else:
+            bisect.insort(self.heures_triees, hour)
+        self.par_heure[hour] = alert
+        self._indexer(hour, alert)
+
+    def marquer_lue(self, hour):
+        """
+        Marque l'alerte de l'heure 'hour' comme lue.
+
+        :return: True si l'alerte existe.
+        """
+        alert = self.par_heure.get(hour)
+        if alert is None:
+            return False
+        alert["read"] = True
+        self.non_lues.discard(hour)
+        self.lues.add(hour)
+        return True
+
+    def supprimer(self, hour):
+        """
+        Supprime l'alerte de l'heure 'hour'.
+
+        :return: True si l'alerte existait.
+        """
+        alert = self.par_heure.pop(hour, None)
+        if alert is None:
+            return False
+        self._desindexer(hour, alert)
+        del self.heures_triees[bisect.bisect_left(self.heures_triees, hour)]
+        return True
+
+    # --------------------------- REQUÊTES ---------------------------
+
+    def __len__(self):
+        return len(self.par_heure)
+
+    def nombre_non_lues(self):
+        """
+        :return: Nombre d'alertes non lues.
+        """
+        return len(self.non_lues)
+
+    def alertes_non_lues(self):
+        """
+        :return: Liste des alertes non lues, triées par heure.
+        """
+        return [self.par_heure[hour] for hour in sorted(self.non_lues)]
+
+    def alertes_par_statut(self, lue):
+        """
+        :param lue: True pour les alertes lues, False pour les non lues.
+        :return: Dictionnaire {"HH:MM": alerte} trié par heure.
+        """
+        heures = self.lues if lue else self.non_lues
+        return {hour: self.par_heure[hour] for hour in sorted(heures)}
+
+    def alertes_par_parametre(self, parameter):
+        """
+        :param parameter: Paramètre environnemental (ex. "CO2").
+        :return: Dictionnaire {"HH:MM": alerte} trié par heure.
+        """
+        heures = self.par_parametre.get(parameter, ())
+        return {hour: self.par_heure[hour] for hour in sorted(heures)}
+
+    def alertes_entre(self, debut, fin):
+        """
+        Alertes dont l'heure est comprise dans [debut, fin] (format "HH:MM").
+
+        :return: Dictionnaire {"HH:MM": alerte} trié par heure.
+        """
+        gauche = bisect.bisect_left(self.heures_triees, debut)
+        droite = bisect.bisect_right(self.heures_triees, fin)
+        return {hour: self.par_heure[hour] for hour in self.heures_triees[gauche:droite]}
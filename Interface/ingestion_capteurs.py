@@ -0,0 +1,239 @@
+# ingestion_capteurs.py
+
+import os         # Remplacement atomique du fichier data.json
+import json       # Publication du dernier instantané pour l'interface
+import time       # Horodatage des lectures et déclenchement des lots
+import random     # Générateur de capteurs simulés
+import socket     # Réception des lectures par UDP
+import argparse   # Options de la ligne de commande
+from datetime import datetime, timedelta
+import stockage_capteurs  # Historique des lectures (SQLite)
+
+# --------------------------- PRINCIPE DE L'INGESTION ---------------------------
+
+# Processus indépendant de l'interface Tkinter :
+#   source (simulée, UDP ou port série) -> lot en mémoire -> un commit SQLite par lot
+#                                       -> data.json (dernières valeurs) pour l'écran des conditions
+#
+# Une lecture est un tuple (capteur, horodatage, valeur) où horodatage est en secondes entières
+# (heure murale, voir stockage_capteurs) : les lectures d'un capteur reçues dans la même
+# seconde (--frequence > 1, sources rapides) sont combinées par stockage_capteurs (moyenne
+# et nombre), aucune n'est perdue. Le format texte reçu par UDP ou port série est
+# une lecture par ligne : "capteur,valeur" ou "capteur,valeur,horodatage".
+
+TAILLE_LOT = 2000               # Nombre maximal de lectures par transaction
+DELAI_LOT = 0.5                 # Délai maximal (s) avant d'écrire un lot incomplet
+INTERVALLE_PUBLICATION = 1.0    # Délai minimal (s) entre deux écritures de data.json
+CHEMIN_INSTANTANE = "data.json"
+VALEUR_ABSENTE = "--"           # Capteur qui n'a encore rien envoyé
+
+# Ordre et format d'affichage attendus par condition_et_gestion.update_conditions
+# (les valeurs sont associées aux lignes de l'écran dans cet ordre)
+AFFICHAGE = {
+    "Température": ("Température", "{:.1f}°C"),
+    "Humidité": ("Humidité", "{:.0f}%"),
+    "CO2": ("CO2", "{:.0f} ppm"),
+    "Lumière": ("Luminosité", "{:.0f} lux"),
+}
+
+# Valeur de départ et amplitude de variation de chaque capteur simulé
+CAPTEURS_SIMULES = {
+    "Température": (22.0, 0.05),
+    "Humidité": (55.0, 0.2),
+    "CO2": (400.0, 1.0),
+    "Lumière": (350.0, 2.0),
+}
+
+# --------------------------- SOURCES DE LECTURES ---------------------------
+
+def heure_murale():
+    """
+    :return: Heure locale actuelle en secondes entières (convention de stockage_capteurs).
+    """
+    return stockage_capteurs.vers_horodatage(datetime.now())
+
+
+def source_simulee(frequence=None, debut=None):
+    """
+    Générateur de lectures simulées (marche aléatoire autour de valeurs réalistes).
+
+    :param frequence: Nombre de lectures par seconde et par capteur ; None = aussi vite que possible,
+                      avec des horodatages consécutifs à partir de 'debut' (utile pour les tests).
+    :param debut: Horodatage de la première lecture en mode rapide (par défaut : maintenant).
+    :return: Générateur de tuples (capteur, horodatage, valeur).
+    """
+    valeurs = {capteur: depart for capteur, (depart, _) in CAPTEURS_SIMULES.items()}
+    horodatage = heure_murale() if debut is None else debut
+    while True:
+        if frequence is not None:
+            time.sleep(1.0 / frequence)
+            horodatage = heure_murale()
+        for capteur, (depart, amplitude) in CAPTEURS_SIMULES.items():
+            # Petit rappel vers la valeur de départ pour rester dans une plage réaliste
+            valeurs[capteur] += random.uniform(-amplitude, amplitude) + 0.001 * (depart - valeurs[capteur])
+            yield capteur, horodatage, valeurs[capteur]
+        if frequence is None:
+            horodatage += 1
+
+
+def analyser_ligne(ligne):
+    """
+    Convertit une ligne texte "capteur,valeur[,horodatage]" en lecture.
+
+    :return: Tuple (capteur, horodatage, valeur) ou None si la ligne est invalide.
+    """
+    morceaux = ligne.strip().split(",")
+    try:
+        if len(morceaux) == 2:
+            return morceaux[0], heure_murale(), float(morceaux[1])
+        if len(morceaux) == 3:
+            return morceaux[0], int(morceaux[2]), float(morceaux[1])
+    except ValueError:
+        pass
+    return None
+
+
+def source_udp(hote="0.0.0.0", port=5005):
+    """
+    Générateur de lectures reçues par UDP (plusieurs lignes possibles par datagramme).
+    Produit None quand rien n'est reçu pendant DELAI_LOT, pour permettre l'écriture du lot en cours.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((hote, port))
+    sock.settimeout(DELAI_LOT)
+    while True:
+        try:
+            paquet, _ = sock.recvfrom(65535)
+        except socket.timeout:
+            yield None
+            continue
+        for ligne in paquet.decode("utf-8", errors="replace").splitlines():
+            lecture = analyser_ligne(ligne)
+            if lecture is not None:
+                yield lecture
+
+
+def source_serie(port, vitesse=9600):
+    """
+    Générateur de lectures reçues sur un port série (nécessite le paquet pyserial).
+    Produit None quand rien n'est reçu pendant DELAI_LOT.
+    """
+    import serial  # pyserial : dépendance optionnelle, seulement pour cette source
+
+    with serial.Serial(port, vitesse, timeout=DELAI_LOT) as liaison:
+        while True:
+            ligne = liaison.readline()
+            if not ligne:
+                yield None
+                continue
+            lecture = analyser_ligne(ligne.decode("utf-8", errors="replace"))
+            if lecture is not None:
+                yield lecture
+
+# --------------------------- PUBLICATION DE L'INSTANTANÉ ---------------------------
+
+def publier_instantane(dernieres_valeurs, chemin=CHEMIN_INSTANTANE):
+    """
+    Écrit les dernières valeurs dans data.json au format affiché par l'écran des conditions.
+    Le fichier est écrit à côté puis renommé : l'interface ne lit jamais un fichier à moitié écrit.
+    Toutes les clés de AFFICHAGE sont publiées, dans l'ordre des lignes de l'écran (VALEUR_ABSENTE
+    pour un capteur qui n'a encore rien envoyé) : sinon les valeurs suivantes se décaleraient d'une ligne.
+
+    :param dernieres_valeurs: Dictionnaire {capteur: valeur}.
+    :param chemin: Chemin du fichier publié (par défaut "data.json").
+    """
+    instantane = {
+        libelle: format_valeur.format(dernieres_valeurs[capteur]) if capteur in dernieres_valeurs else VALEUR_ABSENTE
+        for capteur, (libelle, format_valeur) in AFFICHAGE.items()
+    }
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as file:
+        json.dump(instantane, file, ensure_ascii=False)
+    os.replace(temporaire, chemin)
+
+# --------------------------- BOUCLE D'INGESTION ---------------------------
+
+def executer(source, chemin_base=stockage_capteurs.CHEMIN_BASE, chemin_instantane=CHEMIN_INSTANTANE,
+             taille_lot=TAILLE_LOT, delai_lot=DELAI_LOT, limite=None, surveillance=None):
+    """
+    Lit les lectures de 'source', les écrit par lots (un commit par lot) et publie l'instantané.
+
+    :param source: Générateur de lectures (ou de None quand la source est inactive).
+    :param chemin_base: Chemin du fichier SQLite de l'historique.
+    :param chemin_instantane: Chemin du fichier data.json publié pour l'interface.
+    :param taille_lot: Nombre de lectures qui déclenche l'écriture d'un lot.
+    :param delai_lot: Âge maximal (s) d'un lot avant son écriture.
+    :param limite: Nombre de lectures après lequel s'arrêter (None = sans fin).
+    :param surveillance: moteur_regles.SurveillanceAlertes évaluant chaque lot (None = pas d'alertes).
+    :return: Nombre total de lectures écrites.
+    """
+    lot = []
+    dernieres_valeurs = {}
+    total = 0
+    debut_lot = time.monotonic()
+    derniere_publication = 0.0
+
+    def ecrire_lot():
+        nonlocal lot, total, debut_lot, derniere_publication
+        if lot:
+            if surveillance is not None:
+                surveillance.traiter(lot)
+            stockage_capteurs.ajouter_lectures(lot, chemin_base)
+            total += len(lot)
+            lot = []
+        debut_lot = time.monotonic()
+        if dernieres_valeurs and debut_lot - derniere_publication >= INTERVALLE_PUBLICATION:
+            publier_instantane(dernieres_valeurs, chemin_instantane)
+            derniere_publication = debut_lot
+
+    try:
+        for lecture in source:
+            if lecture is not None:
+                lot.append(lecture)
+                dernieres_valeurs[lecture[0]] = lecture[2]
+                if limite is not None and total + len(lot) >= limite:
+                    break
+            if len(lot) >= taille_lot or time.monotonic() - debut_lot >= delai_lot:
+                ecrire_lot()
+    finally:
+        derniere_publication = 0.0  # Toujours publier les dernières valeurs en sortant
+        ecrire_lot()
+    return total
+
+# --------------------------- POINT D'ENTRÉE DU PROCESSUS ---------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestion des lectures des capteurs de la serre")
+    parser.add_argument("--source", choices=["simulee", "udp", "serie"], default="simulee")
+    parser.add_argument("--base", default=stockage_capteurs.CHEMIN_BASE, help="Fichier SQLite de l'historique")
+    parser.add_argument("--instantane", default=CHEMIN_INSTANTANE, help="Fichier des dernières valeurs")
+    parser.add_argument("--port", default="5005", help="Port UDP ou périphérique série (ex. /dev/ttyUSB0)")
+    parser.add_argument("--alertes", default="alerts.json", help="Fichier des alertes à évaluer")
+    parser.add_argument("--frequence", type=float, default=1.0, help="Lectures/s par capteur simulé")
+    parser.add_argument("--bench", type=int, metavar="N", help="Ingérer N lectures simulées au plus vite et afficher le débit")
+    parser.add_argument("--archiver", type=int, metavar="JOURS",
+                        help="Archiver en segments compressés les lectures brutes de plus de JOURS jours, puis quitter")
+    args = parser.parse_args()
+
+    if args.archiver is not None:
+        limite = (datetime.now() - timedelta(days=args.archiver)).strftime("%Y-%m-%d")
+        nombre = stockage_capteurs.archiver(limite, args.base)
+        conn = stockage_capteurs.connexion(args.base)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")  # Rend au disque l'espace libéré par les lectures archivées
+        print(f"{nombre} lectures archivées avant le {limite} dans {stockage_capteurs.dossier_archives(args.base)}")
+    elif args.bench:
+        depart = time.perf_counter()
+        nombre = executer(source_simulee(), args.base, args.instantane, limite=args.bench)
+        duree = time.perf_counter() - depart
+        print(f"{nombre} lectures en {duree:.2f} s ({nombre / duree:.0f} lectures/s)")
+    else:
+        import moteur_regles  # Le moteur de règles n'est chargé que lorsque les alertes sont évaluées
+
+        if args.source == "udp":
+            source = source_udp(port=int(args.port))
+        elif args.source == "serie":
+            source = source_serie(args.port)
+        else:
+            source = source_simulee(args.frequence)
+        executer(source, args.base, args.instantane, surveillance=moteur_regles.SurveillanceAlertes(args.alertes))
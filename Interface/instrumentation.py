@@ -0,0 +1,228 @@
+# instrumentation.py
+
+import os         # Variables d'environnement, dossier des captures
+import sys        # Sortie du rapport
+import time       # Mesure des durées (perf_counter) et noms des fichiers de capture
+import signal     # Captures déclenchées depuis l'extérieur (kill -USR1 / -USR2)
+import bisect     # Seau de l'histogramme d'une durée
+import threading  # Les fonctions mesurées sont appelées par plusieurs threads
+import functools  # Conservation du nom et de la documentation des fonctions mesurées
+import contextlib
+
+# --------------------------- PRINCIPE DE L'INSTRUMENTATION ---------------------------
+
+# Instrumentation optionnelle des chemins critiques, pour diagnostiquer un rafraîchissement lent
+# sur le PC de la serre sans modifier le code :
+#   - activée par la variable d'environnement SERRE_INSTRUMENTATION=1 (lue au démarrage) ;
+#     désactivée, le décorateur @mesure retourne la fonction d'origine : coût nul ;
+#   - activée, chaque appel est compté et sa durée rangée dans un histogramme à seaux fixes
+#     (quelques opérations par appel, aucune liste qui grossit) ;
+#   - captures à la demande, sans redémarrer (Unix) :
+#       kill -USR1 <pid> : démarre cProfile ; au signal suivant, l'arrête et écrit
+#                          profil-<date>.prof (lisible avec pstats ou snakeviz) et le rapport
+#                          des durées dans rapport-<date>.txt ;
+#       kill -USR2 <pid> : démarre tracemalloc ; au signal suivant, écrit memoire-<date>.txt
+#                          (20 plus gros emplacements d'allocation) et l'instantané complet.
+#   - sans ces signaux (Windows), l'interface Tkinter scrute chaque seconde deux fichiers
+#     déclencheurs dans le dossier des captures : créer "instrumentation.profil" (ex.
+#     type nul > instrumentation.profil) équivaut à kill -USR1, "instrumentation.memoire" à
+#     kill -USR2 ; le fichier est supprimé dès qu'il est pris en compte.
+# Les fichiers sont écrits dans SERRE_INSTRUMENTATION_DOSSIER (par défaut le dossier courant).
+
+ACTIVE = os.environ.get("SERRE_INSTRUMENTATION", "") not in ("", "0")
+DOSSIER = os.environ.get("SERRE_INSTRUMENTATION_DOSSIER", ".")
+DECLENCHEUR_PROFIL = "instrumentation.profil"
+DECLENCHEUR_MEMOIRE = "instrumentation.memoire"
+INTERVALLE_DECLENCHEURS = 1000  # ms entre deux recherches des fichiers déclencheurs
+
+# Bornes supérieures des seaux de l'histogramme, en secondes (le dernier seau est illimité)
+SEAUX = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_mesures = {}  # Nom -> [nombre d'appels, durée totale, durée maximale, compteurs par seau]
+_verrou = threading.Lock()
+
+
+def _enregistrer(nom, duree):
+    with _verrou:
+        mesure = _mesures.get(nom)
+        if mesure is None:
+            mesure = _mesures[nom] = [0, 0.0, 0.0, [0] * (len(SEAUX) + 1)]
+        mesure[0] += 1
+        mesure[1] += duree
+        if duree > mesure[2]:
+            mesure[2] = duree
+        mesure[3][bisect.bisect_left(SEAUX, duree)] += 1
+
+
+def mesure(fonction):
+    """
+    Décorateur : compte les appels de 'fonction' et l'histogramme de leurs durées
+    (seulement si l'instrumentation est active au démarrage).
+    """
+    if not ACTIVE:
+        return fonction
+    nom = f"{fonction.__module__}.{fonction.__qualname__}"
+
+    @functools.wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        depart = time.perf_counter()
+        try:
+            return fonction(*args, **kwargs)
+        finally:
+            _enregistrer(nom, time.perf_counter() - depart)
+    return enveloppe
+
+
+@contextlib.contextmanager
+def bloc(nom):
+    """
+    Gestionnaire de contexte : mesure un bloc de code sous le nom 'nom' (si l'instrumentation est active).
+    """
+    if not ACTIVE:
+        yield
+        return
+    depart = time.perf_counter()
+    try:
+        yield
+    finally:
+        _enregistrer(nom, time.perf_counter() - depart)
+
+# --------------------------- LECTURE DES MESURES ---------------------------
+
+def statistiques():
+    """
+    :return: Dictionnaire nom -> {"appels", "total", "max", "seaux"} (copie ; durées en secondes,
+             "seaux" : nombre d'appels par seau de SEAUX, plus un dernier seau illimité).
+    """
+    with _verrou:
+        return {nom: {"appels": appels, "total": total, "max": maximum, "seaux": list(seaux)}
+                for nom, (appels, total, maximum, seaux) in _mesures.items()}
+
+
+def _quantile(seaux, appels, q):
+    """
+    :return: Borne supérieure du seau contenant le quantile q (estimation de l'histogramme).
+    """
+    cumul = 0
+    for borne, nombre in zip(SEAUX + (float("inf"),), seaux):
+        cumul += nombre
+        if cumul >= q * appels:
+            return borne
+    return float("inf")
+
+
+def rapport():
+    """
+    :return: Tableau texte des mesures, trié par durée totale décroissante.
+    """
+    lignes = [f"{'fonction':<52} {'appels':>8} {'moyenne':>10} {'p50 <=':>9} {'p99 <=':>9} {'max':>10}"]
+    for nom, s in sorted(statistiques().items(), key=lambda item: -item[1]["total"]):
+        lignes.append(f"{nom:<52} {s['appels']:>8} {s['total'] / s['appels'] * 1000:>8.2f}ms "
+                      f"{_quantile(s['seaux'], s['appels'], 0.5) * 1000:>7g}ms "
+                      f"{_quantile(s['seaux'], s['appels'], 0.99) * 1000:>7g}ms {s['max'] * 1000:>8.2f}ms")
+    return "\n".join(lignes)
+
+# --------------------------- CAPTURES À LA DEMANDE ---------------------------
+
+_profil = None  # cProfile.Profile en cours, ou None
+
+
+def _chemin(prefixe, extension):
+    return os.path.join(DOSSIER, f"{prefixe}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+
+def basculer_profil():
+    """
+    Démarre cProfile (thread courant, normalement le thread Tkinter), ou l'arrête et écrit
+    le profil et le rapport des durées.
+
+    :return: Chemin du profil écrit, ou None si le profilage vient de démarrer.
+    """
+    global _profil
+    import cProfile  # Importé ici : seulement utile pendant un diagnostic
+
+    if _profil is None:
+        _profil = cProfile.Profile()
+        _profil.enable()
+        return None
+    _profil.disable()
+    chemin = _chemin("profil", "prof")
+    _profil.dump_stats(chemin)
+    _profil = None
+    with open(_chemin("rapport", "txt"), "w", encoding="utf-8") as f:
+        f.write(rapport() + "\n")
+    return chemin
+
+
+def basculer_memoire():
+    """
+    Démarre tracemalloc, ou écrit les plus gros emplacements d'allocation et l'instantané
+    complet (tracemalloc.Snapshot.load) puis arrête le suivi.
+
+    :return: Chemin du résumé écrit, ou None si le suivi vient de démarrer.
+    """
+    import tracemalloc  # Importé ici : seulement utile pendant un diagnostic
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(10)  # 10 cadres par allocation : pile d'appel lisible
+        return None
+    instantane = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    instantane.dump(_chemin("memoire", "snapshot"))
+    chemin = _chemin("memoire", "txt")
+    with open(chemin, "w", encoding="utf-8") as f:
+        for statistique in instantane.statistics("lineno")[:20]:
+            f.write(f"{statistique}\n")
+    return chemin
+
+
+def _capturer(fonction):
+    chemin = fonction()
+    print(f"Instrumentation : {chemin or 'capture démarrée'}", file=sys.stderr)
+
+
+def _sur_signal(fonction):
+    def gestionnaire(numero, cadre):
+        _capturer(fonction)
+    return gestionnaire
+
+
+def verifier_declencheurs():
+    """
+    Bascule chaque capture dont le fichier déclencheur existe, puis supprime ce fichier.
+    """
+    for nom, fonction in ((DECLENCHEUR_PROFIL, basculer_profil), (DECLENCHEUR_MEMOIRE, basculer_memoire)):
+        try:
+            os.remove(os.path.join(DOSSIER, nom))
+        except FileNotFoundError:
+            continue
+        _capturer(fonction)
+
+
+def installer_declencheurs():
+    """
+    Sans SIGUSR1 (Windows), scrute les fichiers déclencheurs avec le planificateur de l'interface :
+    les captures sont faites sur le thread Tkinter, comme avec les signaux. Sans effet si
+    l'instrumentation est inactive ou si les signaux sont disponibles.
+    """
+    if not ACTIVE or hasattr(signal, "SIGUSR1"):
+        return
+    import planificateur  # Importé ici : seulement dans le processus de l'interface
+
+    planificateur.ajouter("declencheurs_instrumentation", verifier_declencheurs, INTERVALLE_DECLENCHEURS,
+                          immediat=False)
+
+
+def installer_signaux():
+    """
+    Associe SIGUSR1 (cProfile) et SIGUSR2 (tracemalloc) aux captures. Sans effet hors du
+    thread principal ou sur les systèmes sans ces signaux (Windows).
+    """
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return
+    signal.signal(signal.SIGUSR1, _sur_signal(basculer_profil))
+    signal.signal(signal.SIGUSR2, _sur_signal(basculer_memoire))
+
+
+if ACTIVE:
+    installer_signaux()
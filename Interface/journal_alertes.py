@@ -0,0 +1,358 @@
+# journal_alertes.py
+
+import json     # Sérialisation des entrées du journal et de l'instantané
+import os       # Manipulation des chemins de fichiers, fsync et remplacement atomique
+import uuid     # Identifiant de chaque journal (voir ecrire_instantane)
+import hashlib  # Somme de contrôle de l'instantané
+import threading  # Verrou réentrant par thread
+import cache_json  # L'instantané n'est analysé que s'il a changé
+from contextlib import contextmanager
+
+try:
+    import fcntl  # Verrou entre processus (Linux, macOS)
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --------------------------- PRINCIPE DU JOURNAL DES ALERTES ---------------------------
+
+# Au lieu de réécrire tout alerts.json à chaque nouvelle alerte, on ajoute une seule ligne
+# JSON à la fin d'un journal (alerts.jsonl). Le fichier alerts.json devient un "instantané"
+# (snapshot) qui n'est réécrit que lors d'une compaction périodique.
+#
+# Au démarrage, l'état complet = instantané + rejeu des lignes du journal.
+#
+# Sûreté (l'interface et le processus d'ingestion écrivent dans les mêmes fichiers) :
+#   - toute lecture ou écriture se fait sous un verrou de fichier (alerts.json.lock) partagé
+#     par tous les processus ;
+#   - l'instantané est écrit dans un fichier temporaire, synchronisé (fsync) puis renommé :
+#     un arrêt brutal laisse l'ancien ou le nouvel instantané, jamais un fichier tronqué.
+#     L'instantané précédent est conservé (alerts.json.bak) ;
+#   - l'instantané contient une somme de contrôle SHA-256 : un fichier abîmé est mis de côté
+#     (alerts.json.corrompu) et l'état est reconstruit avec l'instantané précédent, le journal
+#     précédent (alerts.jsonl.bak) et le journal courant, au lieu de repartir à vide ;
+#   - chaque journal commence par l'identifiant que l'instantané attend : si un arrêt survient
+#     entre l'écriture de l'instantané et le remplacement du journal, l'ancien journal (déjà
+#     inclus dans l'instantané) n'est pas rejoué une seconde fois.
+# Les ajouts au journal restent une seule écriture en fin de fichier (pas de fsync).
+
+SEUIL_COMPACTION = 500  # Nombre d'entrées dans le journal avant de déclencher une compaction
+
+# Nombre d'entrées présentes dans le journal de chaque fichier (clé = chemin de l'instantané)
+_entrees_journal = {}
+
+# Verrous de fichier déjà tenus par le thread courant (clé = chemin, valeur = profondeur)
+_verrous_tenus = threading.local()
+
+
+def structure_vide():
+    """
+    Retourne une base de données d'alertes vide.
+
+    :return: Dictionnaire avec les clés "active_alerts", "read_alerts" et "alerts_by_time".
+    """
+    return {
+        "active_alerts": [],
+        "read_alerts": [],
+        "alerts_by_time": {}
+    }
+
+
+def chemin_journal(filename):
+    """
+    Calcule le chemin du journal associé à un instantané ("alerts.json" -> "alerts.jsonl").
+
+    :param filename: Chemin du fichier instantané JSON.
+    :return: Chemin du fichier journal (une entrée JSON par ligne).
+    """
+    base, _ = os.path.splitext(filename)
+    return base + ".jsonl"
+
+# --------------------------- VERROU ENTRE PROCESSUS ---------------------------
+
+@contextmanager
+def verrou(filename="alerts.json"):
+    """
+    Verrou exclusif sur les fichiers des alertes, partagé par tous les processus.
+    Réentrant pour un même thread : un cycle lecture-modification-écriture peut appeler
+    charger() puis ecrire_instantane() sous le même verrou.
+
+    :param filename: Chemin du fichier instantané JSON.
+    """
+    tenus = getattr(_verrous_tenus, "profondeurs", None)
+    if tenus is None:
+        tenus = _verrous_tenus.profondeurs = {}
+    if tenus.get(filename):
+        tenus[filename] += 1
+        try:
+            yield
+        finally:
+            tenus[filename] -= 1
+        return
+
+    with open(filename + ".lock", "a+b") as fichier_verrou:
+        _verrouiller(fichier_verrou)
+        tenus[filename] = 1
+        try:
+            yield
+        finally:
+            tenus[filename] = 0
+            _deverrouiller(fichier_verrou)
+
+
+def _verrouiller(fichier):
+    if fcntl is not None:
+        fcntl.flock(fichier.fileno(), fcntl.LOCK_EX)
+        return
+    fichier.seek(0)
+    while True:
+        try:
+            msvcrt.locking(fichier.fileno(), msvcrt.LK_LOCK, 1)  # Réessaie pendant 10 s puis lève OSError
+            return
+        except OSError:
+            continue
+
+
+def _deverrouiller(fichier):
+    if fcntl is not None:
+        fcntl.flock(fichier.fileno(), fcntl.LOCK_UN)
+    else:
+        fichier.seek(0)
+        msvcrt.locking(fichier.fileno(), msvcrt.LK_UNLCK, 1)
+
+# --------------------------- FONCTION : LIRE L'INSTANTANÉ ET REJOUER LE JOURNAL ---------------------------
+
+def charger(filename="alerts.json"):
+    """
+    Reconstruit la base de données des alertes à partir de l'instantané puis du journal.
+
+    :param filename: Chemin du fichier instantané JSON (par défaut "alerts.json").
+    :return: Dictionnaire complet des alertes.
+    """
+    with verrou(filename):
+        data, journal, secours = _lire_instantane(filename)
+        if secours:
+            # Instantané précédent : rejouer aussi le journal précédent, puis le journal courant
+            _rejouer_journal(chemin_journal(filename) + ".bak", data, journal)
+            journal = _TOUT_JOURNAL
+        _entrees_journal[filename] = _rejouer_journal(chemin_journal(filename), data, journal)
+    return data
+
+
+def _somme_controle(data):
+    return hashlib.sha256(json.dumps(data, indent=4).encode("utf-8")).hexdigest()
+
+
+def _verifier_somme(data):
+    """
+    Vérifie la somme de contrôle d'un instantané (absente des fichiers écrits avant son ajout).
+    """
+    somme = data.get("checksum")
+    if somme is not None and somme != _somme_controle({cle: v for cle, v in data.items() if cle != "checksum"}):
+        raise ValueError("somme de contrôle incorrecte")
+
+
+def _copier(data):
+    """
+    Copie d'un instantané du cache, modifiable sans toucher au cache : les listes et
+    dictionnaires de premier niveau et chaque alerte qu'ils contiennent sont copiés
+    (bien plus rapide qu'une nouvelle analyse du fichier).
+    """
+    copie = {}
+    for cle, valeur in data.items():
+        if isinstance(valeur, dict):
+            valeur = {k: dict(v) if isinstance(v, dict) else v for k, v in valeur.items()}
+        elif isinstance(valeur, list):
+            valeur = [dict(v) if isinstance(v, dict) else v for v in valeur]
+        copie[cle] = valeur
+    return copie
+
+
+def _lire_instantane(filename):
+    """
+    Lit l'instantané (ou, s'il est absent ou abîmé, l'instantané précédent).
+    Un instantané inchangé depuis la dernière lecture vient du cache (somme déjà vérifiée).
+
+    :return: Tuple (data, identifiant du journal attendu ou None, True si l'instantané
+             précédent a été utilisé).
+    """
+    for chemin in (filename, filename + ".bak"):
+        try:
+            data = _copier(cache_json.charger(chemin, verifier=_verifier_somme))
+            data.pop("checksum", None)
+        except FileNotFoundError:
+            continue
+        except ValueError as e:  # Inclut json.JSONDecodeError
+            print(f"Instantané des alertes illisible ({chemin}) : {e}")
+            if chemin == filename:
+                os.replace(chemin, chemin + ".corrompu")  # Conservé pour analyse, jamais écrasé par une compaction
+            continue
+
+        journal = data.pop("journal", None)
+        # Vérifier et assurer que la structure minimale existe
+        for cle, valeur in structure_vide().items():
+            data.setdefault(cle, valeur)
+        return data, journal, chemin != filename
+    return structure_vide(), None, False
+
+
+_TOUT_JOURNAL = object()  # Rejouer le journal quel que soit son identifiant
+
+
+def _rejouer_journal(chemin, data, journal):
+    """
+    Applique dans l'ordre chaque entrée d'un journal sur 'data'.
+    Une ligne tronquée (arrêt brutal pendant l'écriture) est ignorée.
+
+    :param chemin: Chemin du journal.
+    :param journal: Identifiant du journal attendu par l'instantané (ou _TOUT_JOURNAL).
+    :return: Nombre d'entrées rejouées.
+    """
+    nombre = 0
+    try:
+        with open(chemin, "r") as fichier:
+            for ligne in fichier:
+                try:
+                    entree = json.loads(ligne)
+                except json.JSONDecodeError:
+                    continue  # Ligne incomplète : on l'ignore
+                if entree.get("op") == "debut":
+                    if journal is not _TOUT_JOURNAL and entree.get("journal") != journal:
+                        return 0  # Ancien journal, déjà inclus dans l'instantané
+                    continue
+                appliquer_entree(data, entree)
+                nombre += 1
+    except FileNotFoundError:
+        pass
+    return nombre
+
+
+def appliquer_entree(data, entree):
+    """
+    Applique une entrée du journal sur la base de données en mémoire.
+
+    :param data: Base de données des alertes à modifier.
+    :param entree: Dictionnaire {"op": ..., "hour": ..., "alert": ...} ; "op" vaut "set" (ajout),
+                   "fire" (alerte déclenchée), "read" (alerte lue) ou "delete" (suppression).
+    """
+    if entree.get("op") == "set":
+        data["alerts_by_time"][entree["hour"]] = entree["alert"]
+    elif entree.get("op") == "fire":
+        data["active_alerts"].append(entree["alert"])  # Alerte déclenchée par le moteur de règles
+    elif entree.get("op") == "read":
+        if entree["hour"] in data["alerts_by_time"]:
+            data["alerts_by_time"][entree["hour"]]["read"] = True
+    elif entree.get("op") == "delete":
+        data["alerts_by_time"].pop(entree["hour"], None)
+
+# --------------------------- FONCTION : AJOUTER UNE ENTRÉE AU JOURNAL ---------------------------
+
+def ajouter_entree(filename, hour, alert):
+    """
+    Ajoute une seule ligne à la fin du journal : le coût ne dépend pas du nombre d'alertes.
+
+    :param filename: Chemin du fichier instantané JSON.
+    :param hour: Heure de l'alerte (format "HH:MM").
+    :param alert: Dictionnaire décrivant l'alerte.
+    """
+    ajouter_entrees(filename, [{"op": "set", "hour": hour, "alert": alert}])
+
+
+def ajouter_entrees(filename, entrees):
+    """
+    Ajoute plusieurs entrées au journal en une seule écriture.
+
+    :param filename: Chemin du fichier instantané JSON.
+    :param entrees: Liste de dictionnaires {"op": ..., ...} (voir appliquer_entree).
+    """
+    if not entrees:
+        return
+    texte = "".join(json.dumps(entree) + "\n" for entree in entrees).encode("utf-8")
+    with verrou(filename):
+        with open(chemin_journal(filename), "a+b") as journal:
+            # Après un arrêt pendant une écriture, la dernière ligne est incomplète :
+            # on commence une nouvelle ligne pour ne pas abîmer la première entrée ajoutée
+            if journal.seek(0, os.SEEK_END) > 0:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b"\n":
+                    texte = b"\n" + texte
+            journal.write(texte)
+    _entrees_journal[filename] = _entrees_journal.get(filename, 0) + len(entrees)
+
+
+def doit_compacter(filename):
+    """
+    Indique si le journal a dépassé le seuil de compaction.
+    """
+    return _entrees_journal.get(filename, 0) >= SEUIL_COMPACTION
+
+# --------------------------- FONCTION : COMPACTION (NOUVEL INSTANTANÉ) ---------------------------
+
+def ecrire_instantane(filename, data):
+    """
+    Écrit un nouvel instantané complet puis remplace le journal par un journal vide.
+
+    :param filename: Chemin du fichier instantané JSON.
+    :param data: Base de données complète des alertes à sauvegarder.
+    """
+    journal = uuid.uuid4().hex  # Identifiant du nouveau journal, attendu par le nouvel instantané
+    contenu = dict(data, journal=journal)
+    texte = json.dumps(contenu, indent=4)
+    # La somme de contrôle est placée en première clé : le reste du texte est inchangé
+    texte = '{\n    "checksum": "%s",\n' % _somme_controle(contenu) + texte[2:]
+
+    with verrou(filename):
+        _ecrire_atomique(filename, texte, sauvegarde=True)
+        cache_json.invalider(filename)
+        # Les entrées du journal sont maintenant incluses dans l'instantané
+        _ecrire_atomique(chemin_journal(filename), json.dumps({"op": "debut", "journal": journal}) + "\n",
+                         sauvegarde=True)
+        _entrees_journal[filename] = 0
+
+
+def _ecrire_atomique(chemin, texte, sauvegarde=False):
+    """
+    Écrit 'texte' dans un fichier temporaire synchronisé sur disque puis le renomme.
+
+    :param sauvegarde: Conserver l'ancien fichier sous chemin + ".bak".
+    """
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w") as file:
+        file.write(texte)
+        file.flush()
+        os.fsync(file.fileno())
+    if sauvegarde and os.path.exists(chemin):
+        os.replace(chemin, chemin + ".bak")
+    os.replace(temporaire, chemin)
+    _synchroniser_dossier(chemin)
+
+
+def _synchroniser_dossier(chemin):
+    """
+    Rend durable le renommage (fsync du dossier ; sans effet sous Windows).
+    """
+    try:
+        descripteur = os.open(os.path.dirname(os.path.abspath(chemin)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descripteur)
+    except OSError:
+        pass
+    finally:
+        os.close(descripteur)
+
+
+def compacter(filename="alerts.json"):
+    """
+    Fusionne le journal dans l'instantané à partir de l'état sur disque uniquement.
+    Toutes les modifications passant par le journal, aucune donnée en mémoire n'est nécessaire
+    (un autre processus peut avoir ajouté des entrées).
+
+    :param filename: Chemin du fichier instantané JSON.
+    :return: Base de données complète après compaction.
+    """
+    with verrou(filename):
+        data = charger(filename)
+        ecrire_instantane(filename, data)
+    return data
@@ -1,6 +1,5 @@
-import json
+import backend_
 
 def get_json(f):
-    with open(f,"r") as file:
-        data = json.load(file)
-        return len(data["alerts_by_time"])
\ No newline at end of file
+    # Nombre d'alertes lu dans l'index en mémoire de backend_ (le fichier n'est pas relu)
+    return len(backend_.get_alerts_by_time(f))
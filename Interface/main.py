@@ -1,13 +1,101 @@
 # main.py
 
 # --------------------------- IMPORTATIONS ---------------------------
+import time  # Mesure du temps de démarrage (avant toute autre importation)
+DEPART = time.perf_counter()
+
+import os  # Variable d'environnement du rapport de démarrage
+import sys  # Modules déjà importés, sortie du rapport de démarrage
+import json  # Jalons du rapport de démarrage (une ligne JSON par jalon)
+import importlib  # Importation des écrans en arrière-plan
 import tkinter as tk  # Module principal de Tkinter pour créer des interfaces graphiques
 from tkinter import ttk  # Module Tkinter pour des widgets thématiques
-from condition_et_gestion import display_condition_screen  # Fonction pour afficher les conditions actuelles
-from tendance import afficher_menu_tendances  
 from gestion_alertes import creer_fenetre_alertes  # Appel des fonctions de gestion des alertes
-from json_reader import get_json  
-from backend_ import get_unread_alerts  # Import si nécessaire
+from json_reader import get_json
+from backend_ import get_unread_alerts, recharger_si_modifie  # Import si nécessaire
+import service_donnees  # Lectures de fichiers hors du thread de l'interface
+import planificateur  # Tâches périodiques de l'interface (une seule instance)
+import surveillance_fichiers  # Notifications de modification de data.json et des alertes
+import journal_alertes  # Chemin du journal des alertes
+import instrumentation  # Captures de profil et de mémoire (si SERRE_INSTRUMENTATION=1)
+
+# --------------------------- PRINCIPE DU DÉMARRAGE ---------------------------
+
+# La fenêtre apparaît avant le chargement de matplotlib et de NumPy (plusieurs secondes sur
+# les PC de la serre) :
+#   - les modules des écrans (condition_et_gestion, tendance) ne sont pas importés ici ;
+#     ouvrir_ecran les importe dans un thread du service de données, puis affiche l'écran
+#     sur le thread Tkinter (un texte "Chargement..." est affiché en attendant) ;
+#   - backend_ ne lit plus les alertes à l'importation : le compteur du menu est calculé en
+#     arrière-plan après le premier affichage ;
+#   - une fois le premier écran affiché, les modules des autres écrans et de
+#     l'exportateur de métriques sont préchargés en arrière-plan : le premier clic sur
+#     "Tendance" n'attend plus.
+#
+# Rapport de démarrage : SERRE_DEMARRAGE=1 écrit sur stderr une ligne par jalon
+# ("fenetre", "ecran", "prechargement") avec le temps écoulé depuis le début de main.py ;
+# SERRE_DEMARRAGE=quitter ferme ensuite la fenêtre (mesures répétées, voir banc_essai_demarrage).
+# Le détail des importations s'obtient avec python -X importtime main.py.
+
+RAPPORT_DEMARRAGE = os.environ.get("SERRE_DEMARRAGE", "")
+PRECHARGEMENT = ("condition_et_gestion", "tendance", "metriques")  # Dans l'ordre d'utilisation probable
+
+# Modules entièrement importés (un module en cours d'importation par un autre thread est déjà
+# dans sys.modules, mais incomplet)
+_charges = set()
+
+
+def jalon(nom):
+    """
+    Écrit un jalon du rapport de démarrage (si SERRE_DEMARRAGE est défini).
+    """
+    if RAPPORT_DEMARRAGE:
+        print("SERRE_DEMARRAGE " + json.dumps({"jalon": nom, "ms": (time.perf_counter() - DEPART) * 1000,
+                                                "epoque": time.time()}), file=sys.stderr, flush=True)
+
+
+def ouvrir_ecran(main_frame, module, fonction, rappel=None):
+    """
+    Affiche un écran dont le module est importé à la demande.
+
+    :param module: Nom du module de l'écran (ex. "tendance").
+    :param fonction: Nom de la fonction d'affichage du module, appelée avec main_frame.
+    :param rappel: Appelé sans argument une fois l'écran affiché.
+    """
+    def afficher(charge):
+        getattr(charge, fonction)(main_frame)
+        if rappel is not None:
+            rappel()
+
+    if module in _charges:
+        afficher(sys.modules[module])  # Déjà chargé : affichage immédiat
+        return
+    for widget in main_frame.winfo_children():
+        widget.destroy()
+    tk.Label(main_frame, text="Chargement...", font=("Arial", 16), fg="white", bg="#303030").pack(expand=True)
+    # Clé commune à tous les écrans : seul le dernier écran demandé est affiché
+    service_donnees.demander("ecran", importer, args=(module,), rappel=afficher,
+                             erreur=lambda exc: print(f"Écran '{module}' indisponible : {exc!r}"))
+
+
+def importer(module):
+    """
+    Importe un module (exécuté dans un thread de travail).
+    """
+    charge = importlib.import_module(module)
+    _charges.add(module)
+    return charge
+
+
+def precharger():
+    """
+    Importe les modules de PRECHARGEMENT (exécuté dans un thread de travail).
+
+    :return: Module metriques.
+    """
+    for module in PRECHARGEMENT:
+        importer(module)
+    return sys.modules["metriques"]
 
 # --------------------------- INTERFACE PRINCIPALE ---------------------------
 def main_interface():
@@ -15,29 +103,71 @@ def main_interface():
     root.title("Serre Intelligente - SMAG")  # Titre de la fenêtre
     root.geometry("1200x800")  # Taille de la fenêtre (largeur x hauteur)
     root.config(bg="#1E1E1E")  # Couleur de fond de la fenêtre principale
-    
+    service_donnees.demarrer(root)  # Pool de threads pour les lectures (data.json, alertes, tendances)
+    planificateur.demarrer(root)  # Planificateur central des rafraîchissements
+    surveillance_fichiers.demarrer(root)  # inotify (ou sondage léger) des fichiers partagés
+    instrumentation.installer_declencheurs()  # Captures à la demande sans signaux (Windows)
+
     json_f = "alerts.json"  # Nom du fichier JSON contenant les alertes
-    a = get_json(json_f)  # Récupération du nombre d'alertes
-    
+
     # Création de la barre de menu avec différentes options
     menu_bar = tk.Menu(root)
-    menu_bar.add_command(label="Condition Actuelle", command=lambda: display_condition_screen(main_frame))
-    menu_bar.add_command(label="Tendance", command=lambda: afficher_menu_tendances(main_frame))
-    menu_bar.add_command(label=f"Afficher les alertes ({a})", command=creer_fenetre_alertes)  # Affiche le nombre d'alertes
-    
+    menu_bar.add_command(label="Condition Actuelle",
+                         command=lambda: ouvrir_ecran(main_frame, "condition_et_gestion", "display_condition_screen",
+                                                      rappel=premier_ecran))
+    menu_bar.add_command(label="Tendance",
+                         command=lambda: ouvrir_ecran(main_frame, "tendance", "afficher_menu_tendances", rappel=premier_ecran))
+    menu_bar.add_command(label="Afficher les alertes (...)", command=creer_fenetre_alertes)  # Nombre calculé en arrière-plan
+    entree_alertes = menu_bar.index(tk.END)  # Position de l'entrée des alertes dans le menu
+
+    # Le compteur n'est recalculé que lorsque les fichiers des alertes changent (ex. alertes
+    # déclenchées par le processus d'ingestion) : relecture éventuelle en arrière-plan, puis
+    # comptage dans l'index en mémoire (O(1))
+    def compter_alertes():
+        recharger_si_modifie(json_f)
+        return get_json(json_f)
+
+    def rafraichir_compteur_alertes():
+        service_donnees.demander("compteur_alertes", compter_alertes,
+                                 rappel=lambda nombre: menu_bar.entryconfig(entree_alertes, label=f"Afficher les alertes ({nombre})"))
+
+    surveillance_fichiers.surveiller("compteur_alertes", [json_f, journal_alertes.chemin_journal(json_f)],
+                                     rafraichir_compteur_alertes)
+
     root.config(menu=menu_bar)  # Ajout de la barre de menu à la fenêtre principale
-    
+
     # Création du cadre principal pour afficher le contenu dynamique
     main_frame = tk.Frame(root, bg="#303030", relief=tk.SUNKEN, borderwidth=2)
     main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-    
-    display_condition_screen(main_frame)  # Affichage par défaut des conditions actuelles
-    
+
+    prechargement_demande = False
+
+    def fin_prechargement(metriques):
+        metriques.demarrer_si_demande()  # /metrics sur 127.0.0.1 et retard de la boucle Tk
+        jalon("prechargement")
+        if RAPPORT_DEMARRAGE == "quitter":
+            root.destroy()
+
+    def premier_ecran():
+        # Un clic sur un autre écran pendant le chargement remplace l'écran des conditions :
+        # le préchargement part du premier écran réellement affiché
+        nonlocal prechargement_demande
+        if prechargement_demande:
+            return
+        prechargement_demande = True
+        jalon("ecran")
+        service_donnees.demander("prechargement", precharger, rappel=fin_prechargement,
+                                 erreur=lambda exc: print(f"Préchargement interrompu : {exc!r}"))
+
+    root.update()  # Premier affichage de la fenêtre, avant tout chargement lourd
+    jalon("fenetre")
+    rafraichir_compteur_alertes()
+    # Affichage par défaut des conditions actuelles
+    ouvrir_ecran(main_frame, "condition_et_gestion", "display_condition_screen", rappel=premier_ecran)
+
     root.mainloop()  # Démarrage de la boucle principale de l'interface graphique
+    service_donnees.arreter()  # Arrêt des threads de lecture à la fermeture
 
 # --------------------------- POINT D'ENTRÉE DU PROGRAMME ---------------------------
 if __name__ == "__main__":
     main_interface()  # Lancement de l'interface principale
-
-
-
@@ -0,0 +1,285 @@
+# metriques.py
+
+import os         # Taille des fichiers, mémoire résidente, variables d'environnement
+import gc         # Comptage des figures matplotlib vivantes
+import sys        # matplotlib n'est compté que s'il est chargé
+import time       # Âge des fichiers et retard de la boucle Tk
+import threading  # Serveur HTTP dans un thread, collecte protégée
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import backend_  # Alertes (en mémoire)
+import cache_json  # Compteurs et durée des lectures JSON
+import journal_alertes  # Chemin du journal des alertes
+import stockage_capteurs  # Débit d'ingestion et âge des lectures
+import instrumentation  # Histogrammes des fonctions instrumentées (si actif)
+
+# --------------------------- PRINCIPE DES MÉTRIQUES ---------------------------
+
+# Exportateur local au format texte de Prometheus (version 0.0.4), lu à la demande :
+# chaque requête GET /metrics appelle les collecteurs enregistrés, qui lisent l'état
+# existant (index des alertes en mémoire, agrégats SQLite, stat des fichiers, compteurs de
+# cache_json et d'instrumentation). Rien n'est calculé entre deux lectures, hormis le retard
+# de la boucle Tk, mesuré par une tâche du planificateur.
+#
+# Activation :
+#   - interface Tkinter : SERRE_METRIQUES_PORT=9108 (écoute sur 127.0.0.1 seulement) ;
+#   - service HTTP (serveur_api) : route /metrics, toujours disponible.
+# Un collecteur qui échoue (base verrouillée, fichier absent...) est ignoré pour cette lecture
+# et compté dans serre_metriques_erreurs_total.
+
+PORT = 9108
+INTERVALLE_RETARD = 500  # ms entre deux mesures du retard de la boucle Tk
+FENETRE_DEBIT = 300      # s de lectures (minutes complètes) pour le débit d'ingestion
+FICHIERS = ("data.json", "alerts.json", journal_alertes.chemin_journal("alerts.json"),
+            stockage_capteurs.CHEMIN_BASE, stockage_capteurs.CHEMIN_BASE + "-wal")
+
+_collecteurs = []
+_erreurs = 0
+_verrou = threading.Lock()
+
+
+def ajouter_collecteur(fonction):
+    """
+    Enregistre un collecteur (utilisable comme décorateur).
+
+    :param fonction: Fonction sans argument qui retourne une liste de familles
+                     (nom, type, aide, [(étiquettes, valeur)]) ; type = "gauge", "counter"
+                     ou "histogram" (les échantillons portent alors leur suffixe dans les étiquettes).
+    """
+    _collecteurs.append(fonction)
+    return fonction
+
+# --------------------------- FORMAT D'EXPOSITION ---------------------------
+
+def _echapper(valeur):
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquettes(etiquettes):
+    if not etiquettes:
+        return ""
+    return "{" + ",".join(f'{cle}="{_echapper(valeur)}"' for cle, valeur in etiquettes.items()) + "}"
+
+
+def _nombre(valeur):
+    if valeur == float("inf"):
+        return "+Inf"
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+
+def exposition():
+    """
+    :return: Texte de toutes les métriques au format d'exposition Prometheus.
+    """
+    global _erreurs
+    lignes = []
+    for collecteur in list(_collecteurs):
+        try:
+            familles = collecteur()
+        except Exception:  # Une source indisponible ne doit pas masquer les autres métriques
+            with _verrou:
+                _erreurs += 1
+            continue
+        for nom, type_metrique, aide, echantillons in familles:
+            lignes.append(f"# HELP {nom} {aide}")
+            lignes.append(f"# TYPE {nom} {type_metrique}")
+            for etiquettes, valeur in echantillons:
+                etiquettes = dict(etiquettes)
+                suffixe = etiquettes.pop("__suffixe__", "")
+                lignes.append(f"{nom}{suffixe}{_etiquettes(etiquettes)} {_nombre(valeur)}")
+    lignes.append("# HELP serre_metriques_erreurs_total Collectes de métriques en échec.")
+    lignes.append("# TYPE serre_metriques_erreurs_total counter")
+    lignes.append(f"serre_metriques_erreurs_total {_erreurs}")
+    return "\n".join(lignes) + "\n"
+
+# --------------------------- COLLECTEURS ---------------------------
+
+@ajouter_collecteur
+def _processus():
+    familles = []
+    try:
+        with open("/proc/self/statm") as f:
+            residente = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        familles.append(("process_resident_memory_bytes", "gauge", "Mémoire résidente du processus.", [({}, residente)]))
+    except (OSError, ValueError, AttributeError):
+        pass  # Pas de /proc (Windows)
+    if "matplotlib.figure" in sys.modules:
+        Figure = sys.modules["matplotlib.figure"].Figure
+        figures = sum(isinstance(objet, Figure) for objet in gc.get_objects())
+        familles.append(("serre_figures_matplotlib", "gauge", "Figures matplotlib vivantes (fuite si croissant).",
+                         [({}, figures)]))
+    return familles
+
+
+@ajouter_collecteur
+def _fichiers():
+    tailles, ages = [], []
+    maintenant = time.time()
+    for chemin in FICHIERS:
+        try:
+            etat = os.stat(chemin)
+        except FileNotFoundError:
+            continue
+        tailles.append(({"fichier": chemin}, etat.st_size))
+        ages.append(({"fichier": chemin}, maintenant - etat.st_mtime))
+    return [
+        ("serre_fichier_taille_octets", "gauge", "Taille des fichiers de données.", tailles),
+        ("serre_fichier_age_secondes", "gauge",
+         "Temps depuis la dernière modification (data.json : fraîcheur de l'écran des conditions).", ages),
+    ]
+
+
+@ajouter_collecteur
+def _alertes():
+    # Le service HTTP n'a pas de surveillance de fichiers : une alerte ajoutée par un autre
+    # processus serait ignorée jusqu'à la prochaine requête /alerts (deux stat si rien n'a changé)
+    backend_.recharger_si_modifie()
+    return [
+        ("serre_alertes", "gauge", "Alertes programmées par heure.", [({}, len(backend_.get_alerts_by_time()))]),
+        ("serre_alertes_non_lues", "gauge", "Alertes non lues.", [({}, backend_.get_unread_count())]),
+        ("serre_alertes_declenchees_total", "counter", "Alertes déclenchées par le moteur de règles.",
+         [({}, len(backend_.get_active_alerts()))]),
+    ]
+
+
+@ajouter_collecteur
+def _ingestion():
+    maintenant = stockage_capteurs.vers_horodatage(datetime.now())
+    fin = maintenant - maintenant % stockage_capteurs.MINUTE  # Minutes complètes seulement
+    recentes = stockage_capteurs.nombre_lectures(fin - FENETRE_DEBIT, fin)
+    ages = []
+    for capteur in stockage_capteurs.liste_capteurs():
+        derniere = stockage_capteurs.derniere_lecture(capteur)
+        if derniere is not None:
+            ages.append(({"capteur": capteur}, maintenant - derniere))
+    return [
+        ("serre_lectures_total", "counter", "Lectures de capteurs enregistrées.",
+         [({}, stockage_capteurs.nombre_lectures())]),
+        ("serre_lectures_par_seconde", "gauge", f"Débit d'ingestion sur les {FENETRE_DEBIT} dernières secondes.",
+         [({}, recentes / FENETRE_DEBIT)]),
+        ("serre_derniere_lecture_age_secondes", "gauge", "Âge de la lecture la plus récente de chaque capteur.", ages),
+    ]
+
+
+@ajouter_collecteur
+def _cache_json():
+    compteurs = cache_json.compteurs()
+    return [
+        ("serre_json_lectures_total", "counter", "Lectures de fichiers JSON par résultat du cache.",
+         [({"resultat": "cache"}, compteurs["succes"]), ({"resultat": "analyse"}, compteurs["echecs"])]),
+        ("serre_json_analyse_secondes_total", "counter", "Durée cumulée des analyses de fichiers JSON.",
+         [({}, compteurs["secondes"])]),
+        ("serre_json_cache_entrees", "gauge", "Fichiers JSON gardés en cache.", [({}, compteurs["entrees"])]),
+    ]
+
+
+@ajouter_collecteur
+def _fonctions():
+    echantillons = []
+    for nom, s in instrumentation.statistiques().items():
+        cumul = 0
+        for borne, nombre in zip(instrumentation.SEAUX + (float("inf"),), s["seaux"]):
+            cumul += nombre
+            echantillons.append(({"__suffixe__": "_bucket", "fonction": nom, "le": _nombre(borne)}, cumul))
+        echantillons.append(({"__suffixe__": "_sum", "fonction": nom}, s["total"]))
+        echantillons.append(({"__suffixe__": "_count", "fonction": nom}, s["appels"]))
+    if not echantillons:
+        return []  # Instrumentation inactive (SERRE_INSTRUMENTATION)
+    return [("serre_appel_duree_secondes", "histogram", "Durée des fonctions instrumentées.", echantillons)]
+
+# --------------------------- RETARD DE LA BOUCLE TK ---------------------------
+
+_retard = {"dernier": 0.0, "max": 0.0, "mesures": 0}
+_echeance = None
+
+
+def _mesurer_retard():
+    """
+    Tâche du planificateur : l'écart entre l'échéance prévue et l'exécution réelle est le
+    temps pendant lequel la boucle Tk était occupée (rendu, calcul sur le thread Tkinter).
+    """
+    global _echeance
+    maintenant = time.perf_counter()
+    if _echeance is not None:
+        retard = max(0.0, maintenant - _echeance)
+        _retard["dernier"] = retard
+        _retard["max"] = max(_retard["max"], retard)
+        _retard["mesures"] += 1
+    _echeance = maintenant + INTERVALLE_RETARD / 1000
+
+
+def _boucle_tk():
+    if not _retard["mesures"]:
+        return []
+    maximum, _retard["max"] = _retard["max"], 0.0  # Maximum depuis la lecture précédente
+    return [
+        ("serre_boucle_tk_retard_secondes", "gauge", "Retard de la dernière échéance de la boucle Tk.",
+         [({}, _retard["dernier"])]),
+        ("serre_boucle_tk_retard_max_secondes", "gauge", "Plus grand retard depuis la lecture précédente.",
+         [({}, maximum)]),
+    ]
+
+
+def surveiller_boucle_tk():
+    """
+    Mesure le retard de la boucle Tk (planificateur de main_interface, déjà démarré).
+    """
+    import planificateur  # Importé ici : seulement dans le processus de l'interface
+
+    planificateur.ajouter("retard_boucle_tk", _mesurer_retard, INTERVALLE_RETARD, immediat=False)
+    if _boucle_tk not in _collecteurs:
+        ajouter_collecteur(_boucle_tk)
+
+# --------------------------- SERVEUR HTTP ---------------------------
+
+TYPE_CONTENU = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class GestionnaireMetriques(BaseHTTPRequestHandler):
+    """
+    Répond à GET /metrics.
+    """
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        corps = exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", TYPE_CONTENU)
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, format, *args):
+        pass  # Une lecture toutes les 15 s : inutile de la journaliser
+
+
+def demarrer(port=PORT, hote="127.0.0.1"):
+    """
+    Lance l'exportateur dans un thread (démon).
+
+    :return: Instance du serveur HTTP.
+    """
+    serveur = ThreadingHTTPServer((hote, port), GestionnaireMetriques)
+    serveur.daemon_threads = True
+    threading.Thread(target=serveur.serve_forever, name="metriques", daemon=True).start()
+    return serveur
+
+
+def demarrer_si_demande():
+    """
+    Lance l'exportateur et la mesure de la boucle Tk si SERRE_METRIQUES_PORT est défini.
+
+    :return: Serveur HTTP, ou None.
+    """
+    port = os.environ.get("SERRE_METRIQUES_PORT")
+    if not port:
+        return None
+    try:
+        serveur = demarrer(int(port))
+    except (OSError, ValueError) as erreur:  # Port occupé (deuxième instance) ou invalide
+        print(f"Exportateur de métriques non démarré : {erreur}")
+        return None
+    surveiller_boucle_tk()
+    return serveur
@@ -0,0 +1,202 @@
+# moteur_regles.py
+
+import time  # Rechargement périodique des règles
+from datetime import date  # Oubli des alertes des jours passés
+import numpy as np  # Évaluation vectorisée des règles
+import backend_  # Enregistrement des alertes déclenchées
+import journal_alertes  # Lecture des règles (instantané + journal)
+import stockage_capteurs  # Conversion des horodatages
+import cache_json  # Empreinte des fichiers des règles
+
+# --------------------------- PRINCIPE DU MOTEUR DE RÈGLES ---------------------------
+
+# Chaque alerte de alerts_by_time devient une règle :
+#   à l'heure "HH:MM", si la lecture du paramètre dépasse le seuil (vers le haut pour un message
+#   "trop élevé(e)", vers le bas pour "trop bas(se)"), l'alerte est déclenchée.
+#
+# Les règles sont compilées en tableaux NumPy triés par clé (paramètre, minute de la journée).
+# Pour un lot de lectures, np.searchsorted trouve d'un coup les règles concernées par chaque
+# lecture : aucune boucle Python par règle ni par lecture.
+
+MINUTES_PAR_JOUR = 24 * 60
+
+
+def sens_regle(message):
+    """
+    Déduit le sens de comparaison à partir du message prédéfini.
+
+    :param message: Message de l'alerte (ex. "Température trop basse").
+    :return: -1 si l'alerte porte sur une valeur trop basse, +1 sinon (valeur trop élevée).
+    """
+    return -1 if " bas" in message.lower() else 1
+
+
+class ReglesCompilees:
+    """
+    Règles d'alerte compilées en tableaux NumPy, triées par clé (paramètre, minute).
+    """
+
+    def __init__(self, alerts_by_time):
+        """
+        :param alerts_by_time: Dictionnaire {"HH:MM": {"Parameter", "Value", "Message", ...}}.
+        """
+        self.parametres = sorted({alerte["Parameter"] for alerte in alerts_by_time.values()})
+        self._codes = {parametre: code for code, parametre in enumerate(self.parametres)}
+
+        heures = list(alerts_by_time)
+        alertes = [alerts_by_time[heure] for heure in heures]
+        minutes = np.array([int(h[:2]) * 60 + int(h[3:5]) for h in heures], dtype=np.int64)
+        codes = np.array([self._codes[a["Parameter"]] for a in alertes], dtype=np.int64)
+        cles = codes * MINUTES_PAR_JOUR + minutes
+
+        ordre = np.argsort(cles, kind="stable")
+        self.cles = cles[ordre]
+        self.seuils = np.array([float(a["Value"]) for a in alertes], dtype=np.float64)[ordre]
+        self.sens = np.array([sens_regle(a["Message"]) for a in alertes], dtype=np.int8)[ordre]
+        self.heures = [heures[i] for i in ordre]
+        self.alertes = [alertes[i] for i in ordre]
+
+    def __len__(self):
+        return len(self.heures)
+
+    def codes_capteurs(self, capteurs):
+        """
+        Convertit des noms de capteurs en codes de paramètre (-1 si aucune règle ne les concerne).
+        """
+        return np.array([self._codes.get(capteur, -1) for capteur in capteurs], dtype=np.int64)
+
+    def evaluer(self, capteurs, horodatages, valeurs):
+        """
+        Évalue un lot de lectures contre toutes les règles en une seule passe vectorisée.
+
+        :param capteurs: Tableau (ou liste) de codes de paramètre, voir codes_capteurs().
+        :param horodatages: Tableau des horodatages des lectures (secondes entières).
+        :param valeurs: Tableau des valeurs lues.
+        :return: Tuple (indices_lectures, indices_regles) des couples qui déclenchent une alerte.
+        """
+        capteurs = np.asarray(capteurs, dtype=np.int64)
+        horodatages = np.asarray(horodatages, dtype=np.int64)
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        vide = np.empty(0, dtype=np.int64)
+        if len(self) == 0 or len(capteurs) == 0:
+            return vide, vide
+
+        # Clé de chaque lecture ; les lectures sans règle reçoivent une clé négative
+        minutes = (horodatages // 60) % MINUTES_PAR_JOUR
+        cles = np.where(capteurs >= 0, capteurs * MINUTES_PAR_JOUR + minutes, -1)
+
+        # Plage [debut, fin[ des règles ayant la même clé que chaque lecture
+        debut = np.searchsorted(self.cles, cles, side="left")
+        fin = np.searchsorted(self.cles, cles, side="right")
+        nombres = fin - debut
+        total = int(nombres.sum())
+        if total == 0:
+            return vide, vide
+
+        # Développement des couples (lecture, règle) sans boucle Python
+        indices_lectures = np.repeat(np.arange(len(cles)), nombres)
+        decalages = np.arange(total) - np.repeat(np.cumsum(nombres) - nombres, nombres)
+        indices_regles = np.repeat(debut, nombres) + decalages
+
+        # Comparaison au seuil dans le sens de chaque règle
+        ecarts = (valeurs[indices_lectures] - self.seuils[indices_regles]) * self.sens[indices_regles]
+        declenchees = ecarts > 0
+        return indices_lectures[declenchees], indices_regles[declenchees]
+
+    def alertes_declenchees(self, lectures):
+        """
+        Évalue une liste de lectures et retourne les alertes déclenchées.
+
+        :param lectures: Liste de tuples (capteur, horodatage, valeur) comme dans ingestion_capteurs.
+        :return: Liste de dictionnaires décrivant chaque alerte déclenchée, horodatage compris.
+        """
+        if not lectures or len(self) == 0:
+            return []
+        capteurs, horodatages, valeurs = zip(*lectures)
+        indices_lectures, indices_regles = self.evaluer(self.codes_capteurs(capteurs), horodatages, valeurs)
+
+        return [
+            {
+                "Hour": self.heures[r],
+                "Parameter": self.alertes[r]["Parameter"],
+                "Value": self.alertes[r]["Value"],
+                "Message": self.alertes[r]["Message"],
+                "Reading": float(valeurs[l]),
+                "Timestamp": stockage_capteurs.depuis_horodatage(int(horodatages[l])).isoformat(sep=" "),
+            }
+            for l, r in zip(indices_lectures.tolist(), indices_regles.tolist())
+        ]
+
+# --------------------------- SURVEILLANCE CONTINUE (PROCESSUS D'INGESTION) ---------------------------
+
+INTERVALLE_RECHARGEMENT = 5.0  # Délai (s) entre deux recompilations des règles depuis alerts.json
+
+
+def cle_alerte(alerte):
+    """
+    :return: Clé (heure de la règle, paramètre, date) d'une alerte déclenchée.
+    """
+    return alerte["Hour"], alerte["Parameter"], alerte.get("Timestamp", "")[:10]
+
+
+class SurveillanceAlertes:
+    """
+    Évalue chaque lot de lectures contre les règles de alerts.json et enregistre les alertes
+    déclenchées dans "active_alerts". Une règle ne se déclenche qu'une fois par jour, même après
+    un redémarrage du processus : les alertes du jour déjà enregistrées sont relues au premier
+    chargement, et les clés des jours passés sont oubliées au changement de date.
+    """
+
+    def __init__(self, filename="alerts.json", intervalle=INTERVALLE_RECHARGEMENT):
+        """
+        :param filename: Fichier des alertes dont les règles sont lues.
+        :param intervalle: Délai (s) entre deux rechargements des règles.
+        """
+        self.filename = filename
+        self.intervalle = intervalle
+        self.regles = ReglesCompilees({})
+        self._dernier_chargement = None
+        self._empreinte = None  # Fichiers des règles lors de la dernière compilation
+        self._deja_declenchees = set()  # Clés (heure, paramètre, date) déjà enregistrées
+        self._jour = None  # Date "YYYY-MM-DD" des clés les plus anciennes gardées
+
+    def _recharger_si_necessaire(self):
+        maintenant = time.monotonic()
+        if self._dernier_chargement is None or maintenant - self._dernier_chargement >= self.intervalle:
+            self._dernier_chargement = maintenant
+            # Recompilation seulement si l'instantané ou le journal a changé
+            empreinte = (cache_json.empreinte(self.filename),
+                         cache_json.empreinte(journal_alertes.chemin_journal(self.filename)))
+            if empreinte != self._empreinte:
+                data = journal_alertes.charger(self.filename)
+                self.regles = ReglesCompilees(data["alerts_by_time"])
+                if self._empreinte is None:  # Premier chargement : alertes du jour enregistrées avant un redémarrage
+                    aujourd_hui = date.today().isoformat()
+                    self._deja_declenchees = {
+                        cle_alerte(alerte) for alerte in data["active_alerts"]
+                        if alerte.get("Timestamp", "")[:10] >= aujourd_hui
+                    }
+                self._empreinte = empreinte
+
+    def _oublier_jours_passes(self):
+        aujourd_hui = date.today().isoformat()
+        if aujourd_hui != self._jour:
+            self._jour = aujourd_hui
+            self._deja_declenchees = {cle for cle in self._deja_declenchees if cle[2] >= aujourd_hui}
+
+    def traiter(self, lectures):
+        """
+        :param lectures: Liste de tuples (capteur, horodatage, valeur).
+        :return: Liste des nouvelles alertes déclenchées (déjà enregistrées).
+        """
+        self._recharger_si_necessaire()
+        self._oublier_jours_passes()
+        nouvelles = []
+        for alerte in self.regles.alertes_declenchees(lectures):
+            cle = cle_alerte(alerte)
+            if cle not in self._deja_declenchees:
+                self._deja_declenchees.add(cle)
+                nouvelles.append(alerte)
+        if nouvelles:
+            backend_.add_fired_alerts(nouvelles, self.filename)
+        return nouvelles
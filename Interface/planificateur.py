@@ -0,0 +1,146 @@
+# planificateur.py
+
+# --------------------------- PRINCIPE DU PLANIFICATEUR ---------------------------
+
+# Un seul objet, créé par main_interface, gère toutes les tâches périodiques de l'interface
+# (ex. rafraîchissement des conditions). Chaque tâche a un nom :
+#   - enregistrer une tâche sous un nom déjà utilisé remplace l'ancienne (pas de chaînes
+#     after() parallèles quand on revient plusieurs fois sur le même écran) ;
+#   - une tâche liée à un widget "propriétaire" est annulée quand ce widget est détruit ;
+#   - une tâche adaptative ralentit (jusqu'à intervalle_max) tant qu'elle signale que rien
+#     n'a changé, et revient à son intervalle de base dès qu'une modification est vue.
+
+
+class Tache:
+    """
+    Tâche périodique nommée.
+    """
+
+    def __init__(self, nom, fonction, intervalle, intervalle_max, proprietaire):
+        self.nom = nom
+        self.fonction = fonction
+        self.intervalle = intervalle          # Intervalle de base (ms)
+        self.intervalle_max = intervalle_max  # None = intervalle fixe
+        self.intervalle_courant = intervalle
+        self.proprietaire = proprietaire
+        self.id_after = None
+
+
+class Planificateur:
+    """
+    Gère les tâches périodiques nommées de l'interface avec after().
+    """
+
+    def __init__(self, root):
+        """
+        :param root: Fenêtre Tk principale.
+        """
+        self.root = root
+        self.taches = {}
+
+    def ajouter(self, nom, fonction, intervalle, intervalle_max=None, proprietaire=None, immediat=True):
+        """
+        Enregistre (ou remplace) une tâche périodique.
+
+        :param nom: Nom unique de la tâche (ex. "conditions").
+        :param fonction: Fonction sans argument exécutée à chaque échéance. Pour une tâche
+                         adaptative, elle retourne False quand rien n'a changé.
+        :param intervalle: Intervalle de base en millisecondes.
+        :param intervalle_max: Intervalle maximal (ms) d'une tâche adaptative ; None = fixe.
+        :param proprietaire: Widget dont la destruction annule la tâche.
+        :param immediat: Exécuter la tâche tout de suite (sinon après le premier intervalle).
+        """
+        self.annuler(nom)
+        tache = Tache(nom, fonction, intervalle, intervalle_max, proprietaire)
+        self.taches[nom] = tache
+
+        if proprietaire is not None:
+            proprietaire.bind("<Destroy>", lambda event: self._sur_destruction(tache, event), add="+")
+
+        if immediat:
+            self._executer(tache)
+        else:
+            tache.id_after = self.root.after(intervalle, self._executer, tache)
+
+    def annuler(self, nom):
+        """
+        Annule la tâche 'nom' si elle existe.
+        """
+        tache = self.taches.pop(nom, None)
+        if tache is not None and tache.id_after is not None:
+            self.root.after_cancel(tache.id_after)
+            tache.id_after = None
+
+    def ajuster(self, nom, intervalle):
+        """
+        Change l'intervalle de base d'une tâche (pris en compte à la prochaine échéance).
+        """
+        tache = self.taches.get(nom)
+        if tache is not None:
+            tache.intervalle = tache.intervalle_courant = intervalle
+
+    def _sur_destruction(self, tache, event):
+        if event.widget is tache.proprietaire and self.taches.get(tache.nom) is tache:
+            self.annuler(tache.nom)
+
+    def _executer(self, tache):
+        """
+        Exécute une tâche puis planifie la suivante (sauf si elle a été annulée ou remplacée).
+        """
+        tache.id_after = None
+        if self.taches.get(tache.nom) is not tache:
+            return
+        if tache.proprietaire is not None and not tache.proprietaire.winfo_exists():
+            self.annuler(tache.nom)
+            return
+
+        resultat = None
+        try:
+            resultat = tache.fonction()
+        finally:
+            # Toujours replanifier, même si la tâche a levé une exception
+            if self.taches.get(tache.nom) is tache:
+                self._replanifier(tache, resultat)
+
+    def _replanifier(self, tache, resultat):
+        if tache.intervalle_max is not None:
+            if resultat is False:  # Rien n'a changé : on ralentit
+                tache.intervalle_courant = min(tache.intervalle_courant * 2, tache.intervalle_max)
+            else:
+                tache.intervalle_courant = tache.intervalle
+        tache.id_after = self.root.after(tache.intervalle_courant, self._executer, tache)
+
+# --------------------------- ACCÈS GLOBAL ---------------------------
+
+_planificateur = None  # Planificateur créé par main_interface
+
+
+def demarrer(root):
+    """
+    Crée le planificateur de la fenêtre principale.
+
+    :param root: Fenêtre Tk principale.
+    :return: Instance de Planificateur.
+    """
+    global _planificateur
+    _planificateur = Planificateur(root)
+    return _planificateur
+
+
+def ajouter(nom, fonction, intervalle, intervalle_max=None, proprietaire=None, immediat=True):
+    """
+    Enregistre une tâche auprès du planificateur de main_interface. Si aucun n'a été démarré
+    (module testé seul), un planificateur est créé pour la fenêtre du propriétaire.
+    """
+    global _planificateur
+    if _planificateur is None:
+        _planificateur = Planificateur(proprietaire.winfo_toplevel())
+    _planificateur.ajouter(nom, fonction, intervalle, intervalle_max, proprietaire, immediat)
+
+
+def annuler(nom):
+    """
+    Annule une tâche du planificateur (s'il existe).
+    """
+    if _planificateur is not None:
+        _planificateur.annuler(nom)
@@ -0,0 +1,176 @@
+# reduction_series.py
+
+import time      # Mesure des temps de réduction et de rendu (banc d'essai)
+import argparse  # Options de la ligne de commande
+import numpy as np  # Réduction vectorisée des séries
+
+# --------------------------- PRINCIPE DE LA RÉDUCTION DES SÉRIES ---------------------------
+
+# Un graphique ne peut pas afficher plus de points qu'il n'a de pixels en largeur : une journée
+# de lectures à 1 Hz (86 400 points) est réduite à environ un point par pixel avant d'être
+# passée à matplotlib. Deux méthodes :
+#   - "lttb"    : Largest-Triangle-Three-Buckets. La série est découpée en seaux ; dans chaque
+#                 seau on garde le point qui forme le plus grand triangle avec le point retenu
+#                 dans le seau précédent et la moyenne du seau suivant. La forme de la courbe
+#                 et les pics sont conservés.
+#   - "min_max" : dans chaque seau on garde le minimum et le maximum (dans l'ordre du temps).
+#                 Aucun pic n'est perdu ; entièrement vectorisé.
+#
+# Les premiers et derniers points sont toujours conservés.
+
+MODES = ("lttb", "min_max")
+
+
+def _bornes_seaux(nombre, nombre_seaux):
+    """
+    Découpe les indices [1, nombre - 1[ (premier et dernier points exclus) en seaux contigus.
+
+    :return: Tableau de nombre_seaux + 1 bornes.
+    """
+    return np.linspace(1, nombre - 1, nombre_seaux + 1).astype(np.int64)
+
+
+def lttb(x, y, nombre_points):
+    """
+    Réduit une série avec l'algorithme Largest-Triangle-Three-Buckets.
+    Les aires des triangles d'un seau sont calculées en une opération NumPy ; seul le parcours
+    des seaux (un par point conservé) est une boucle, car chaque choix dépend du précédent.
+
+    :param x: Tableau des abscisses (croissantes).
+    :param y: Tableau des valeurs.
+    :param nombre_points: Nombre de points à conserver (au moins 3).
+    :return: Tableau des indices conservés, croissants.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    nombre = len(x)
+    if nombre_points >= nombre or nombre_points < 3:
+        return np.arange(nombre)
+
+    bornes = _bornes_seaux(nombre, nombre_points - 2)
+
+    # Moyenne de chaque seau (point "C" du triangle), calculée d'un coup
+    tailles = np.diff(bornes)
+    moyennes_x = np.add.reduceat(x[1:-1], bornes[:-1] - 1) / tailles
+    moyennes_y = np.add.reduceat(y[1:-1], bornes[:-1] - 1) / tailles
+    moyennes_x = np.append(moyennes_x[1:], x[-1])  # Le seau suivant du dernier seau est le dernier point
+    moyennes_y = np.append(moyennes_y[1:], y[-1])
+
+    indices = np.empty(nombre_points, dtype=np.int64)
+    indices[0], indices[-1] = 0, nombre - 1
+    retenu = 0
+    for seau in range(nombre_points - 2):
+        debut, fin = bornes[seau], bornes[seau + 1]
+        ax, ay = x[retenu], y[retenu]
+        cx, cy = moyennes_x[seau], moyennes_y[seau]
+        # Double aire du triangle (A, B, C) pour chaque point B du seau
+        aires = np.abs((ax - cx) * (y[debut:fin] - ay) - (ax - x[debut:fin]) * (cy - ay))
+        retenu = debut + int(aires.argmax())
+        indices[seau + 1] = retenu
+    return indices
+
+
+def min_max(x, y, nombre_points):
+    """
+    Réduit une série en gardant le minimum et le maximum de chaque seau.
+
+    :param x: Tableau des abscisses (croissantes).
+    :param y: Tableau des valeurs.
+    :param nombre_points: Nombre approximatif de points à conserver.
+    :return: Tableau des indices conservés, croissants.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    nombre = len(y)
+    if nombre_points >= nombre or nombre_points < 4:
+        return np.arange(nombre)
+
+    # Seaux de taille égale : la série est complétée par des NaN puis vue comme une matrice
+    taille = -(-(nombre - 2) // ((nombre_points - 2) // 2))
+    nombre_seaux = -(-(nombre - 2) // taille)
+    matrice = np.full(nombre_seaux * taille, np.nan)
+    matrice[:nombre - 2] = y[1:-1]
+    matrice = matrice.reshape(nombre_seaux, taille)
+
+    decalages = np.arange(nombre_seaux) * taille + 1
+    minimums = decalages + np.nanargmin(matrice, axis=1)
+    maximums = decalages + np.nanargmax(matrice, axis=1)
+    return np.unique(np.concatenate(([0], minimums, maximums, [nombre - 1])))
+
+
+def reduire(x, y, nombre_points, mode="lttb"):
+    """
+    Réduit une série à environ 'nombre_points' points.
+
+    :param x: Abscisses (liste ou tableau).
+    :param y: Valeurs (liste ou tableau).
+    :param nombre_points: Nombre de points visé (ex. largeur du graphique en pixels).
+    :param mode: "lttb" ou "min_max".
+    :return: Tuple (x, y) de tableaux NumPy réduits.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode de réduction inconnu : {mode}")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    indices = (lttb if mode == "lttb" else min_max)(x, y, nombre_points)
+    return x[indices], y[indices]
+
+
+def reduire_enveloppe(x, bas, haut, nombre_points):
+    """
+    Réduit une enveloppe (minimums, maximums) à environ 'nombre_points' points : chaque seau
+    garde le plus petit minimum et le plus grand maximum, placés au début du seau.
+
+    :return: Tuple (x, bas, haut) de tableaux NumPy réduits.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    bas = np.asarray(bas, dtype=np.float64)
+    haut = np.asarray(haut, dtype=np.float64)
+    if nombre_points >= len(x) or nombre_points < 2:
+        return x, bas, haut
+
+    debuts = np.linspace(0, len(x), nombre_points + 1).astype(np.int64)[:-1]
+    return x[debuts], np.minimum.reduceat(bas, debuts), np.maximum.reduceat(haut, debuts)
+
+# --------------------------- BANC D'ESSAI ---------------------------
+
+def banc_essai(tailles, largeur=800, mode="lttb"):
+    """
+    Compare le temps de rendu (Agg, hors écran) d'une courbe brute et d'une courbe réduite.
+
+    :param tailles: Nombres de points bruts à essayer.
+    :param largeur: Largeur du graphique en pixels (nombre de points après réduction).
+    :param mode: Méthode de réduction.
+    """
+    from matplotlib.figure import Figure  # Importé ici : seulement utile au banc d'essai
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    def rendu(x, y):
+        fig = Figure(figsize=(largeur / 100, 4), dpi=100)
+        FigureCanvasAgg(fig)
+        fig.add_subplot().plot(x, y, marker='o', color='blue')
+        depart = time.perf_counter()
+        fig.canvas.draw()
+        return time.perf_counter() - depart
+
+    generateur = np.random.default_rng(0)
+    print(f"{'points':>10} {'rendu brut':>12} {'réduction':>11} {'rendu réduit':>13}")
+    for taille in tailles:
+        x = np.arange(taille, dtype=np.float64)
+        y = 22 + np.cumsum(generateur.normal(0, 0.05, taille))
+        y[generateur.integers(0, taille, 5)] += 8  # Pics isolés qui doivent rester visibles
+
+        brut = rendu(x, y)
+        depart = time.perf_counter()
+        xr, yr = reduire(x, y, largeur, mode)
+        reduction = time.perf_counter() - depart
+        reduit = rendu(xr, yr)
+        print(f"{taille:>10} {brut * 1000:>10.1f} ms {reduction * 1000:>8.1f} ms {reduit * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai de la réduction des séries tracées")
+    parser.add_argument("--mode", choices=MODES, default="lttb")
+    parser.add_argument("--largeur", type=int, default=800, help="Largeur du graphique en pixels")
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1000, 10000, 86400, 1000000])
+    args = parser.parse_args()
+    banc_essai(args.tailles, args.largeur, args.mode)
@@ -0,0 +1,158 @@
+# segments_capteurs.py
+
+import os        # Dossiers des archives et remplacement atomique des fichiers
+import zlib      # Compression des colonnes encodées
+import struct    # En-tête binaire des segments
+import numpy as np  # Encodage et décodage vectorisés
+
+# --------------------------- PRINCIPE DES SEGMENTS ---------------------------
+
+# Les lectures brutes anciennes sont archivées hors de SQLite, dans un fichier par jour et par
+# capteur : <dossier>/<capteur>/<YYYY-MM-DD>.seg. Chaque segment stocke deux colonnes :
+#   - horodatages : premier horodatage, puis "delta de delta" (différence entre deux écarts
+#                   successifs). À fréquence fixe, presque toutes les valeurs valent 0 ;
+#   - valeurs     : quantifiées au 1/ECHELLE (entiers), puis différence avec la précédente.
+#                   Les capteurs varient peu d'une lecture à l'autre : petits entiers.
+# Chaque colonne est convertie dans le plus petit type entier suffisant puis compressée avec
+# zlib. La lecture décode directement en tableaux NumPy (np.frombuffer + np.cumsum) sans
+# boucle Python.
+
+EXTENSION = ".seg"
+ECHELLE = 1000  # Précision conservée des valeurs : arrondi au millième (1 / ECHELLE)
+
+_MAGIQUE = b"SEG1"
+_EN_TETE = struct.Struct("<4sIqqdBBII")  # magique, nombre, t0, v0 quantifiée, échelle, types, tailles des blocs
+_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def _plus_petit_type(entiers):
+    """
+    :return: Indice dans _TYPES du plus petit type entier contenant toutes les valeurs.
+    """
+    if len(entiers) == 0:
+        return 0
+    bas, haut = int(entiers.min()), int(entiers.max())
+    for code, type_entier in enumerate(_TYPES):
+        info = np.iinfo(type_entier)
+        if info.min <= bas and haut <= info.max:
+            return code
+    return len(_TYPES) - 1
+
+
+def _compresser(entiers):
+    code = _plus_petit_type(entiers)
+    return code, zlib.compress(entiers.astype(_TYPES[code]).tobytes(), 6)
+
+
+def _decompresser(code, bloc):
+    return np.frombuffer(zlib.decompress(bloc), dtype=_TYPES[code]).astype(np.int64)
+
+# --------------------------- ENCODAGE / DÉCODAGE ---------------------------
+
+def encoder(horodatages, valeurs, echelle=ECHELLE):
+    """
+    Encode une série triée par horodatage.
+
+    :param horodatages: Tableau d'entiers croissants (secondes).
+    :param valeurs: Tableau des valeurs correspondantes.
+    :param echelle: Nombre de pas de quantification par unité (1000 = millièmes).
+    :return: Contenu binaire du segment.
+    """
+    horodatages = np.asarray(horodatages, dtype=np.int64)
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    if len(horodatages) == 0:
+        raise ValueError("Un segment doit contenir au moins une lecture")
+
+    ecarts = np.diff(horodatages)
+    deltas_de_deltas = np.diff(ecarts, prepend=0)  # Le premier élément est le premier écart
+    quantifiees = np.rint(valeurs * echelle).astype(np.int64)
+    deltas_valeurs = np.diff(quantifiees)
+
+    type_t, bloc_t = _compresser(deltas_de_deltas)
+    type_v, bloc_v = _compresser(deltas_valeurs)
+    en_tete = _EN_TETE.pack(_MAGIQUE, len(horodatages), int(horodatages[0]), int(quantifiees[0]),
+                            echelle, type_t, type_v, len(bloc_t), len(bloc_v))
+    return en_tete + bloc_t + bloc_v
+
+
+def decoder(contenu):
+    """
+    Décode un segment.
+
+    :param contenu: Contenu binaire produit par encoder().
+    :return: Tuple (horodatages int64, valeurs float64) de tableaux NumPy.
+    """
+    magique, nombre, t0, v0, echelle, type_t, type_v, taille_t, taille_v = _EN_TETE.unpack_from(contenu)
+    if magique != _MAGIQUE:
+        raise ValueError("Fichier de segment invalide")
+    debut = _EN_TETE.size
+    deltas_de_deltas = _decompresser(type_t, contenu[debut:debut + taille_t])
+    deltas_valeurs = _decompresser(type_v, contenu[debut + taille_t:debut + taille_t + taille_v])
+
+    horodatages = np.empty(nombre, dtype=np.int64)
+    horodatages[0] = t0
+    np.cumsum(np.cumsum(deltas_de_deltas), out=horodatages[1:])
+    horodatages[1:] += t0
+
+    quantifiees = np.empty(nombre, dtype=np.int64)
+    quantifiees[0] = v0
+    np.cumsum(deltas_valeurs, out=quantifiees[1:])
+    quantifiees[1:] += v0
+    return horodatages, quantifiees / echelle  # Division (et non produit par 0.001) : 400040 -> 400.04 exact
+
+# --------------------------- FICHIERS ---------------------------
+
+def chemin_segment(dossier, capteur, date):
+    """
+    :return: Chemin du segment d'un capteur pour une date "YYYY-MM-DD".
+    """
+    return os.path.join(dossier, capteur, date + EXTENSION)
+
+
+def ecrire_journee(dossier, capteur, date, horodatages, valeurs):
+    """
+    Écrit (ou complète) le segment d'une journée. Les lectures déjà archivées sont fusionnées ;
+    à horodatage égal, la nouvelle valeur remplace l'ancienne.
+
+    :return: Nombre de lectures remplacées (même seconde qu'une autre lecture).
+    """
+    horodatages = np.asarray(horodatages, dtype=np.int64)
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    anciens_t, anciennes_v = lire_journee(dossier, capteur, date)
+    if len(anciens_t):
+        horodatages = np.concatenate((horodatages, anciens_t))
+        valeurs = np.concatenate((valeurs, anciennes_v))
+    # np.unique garde la première occurrence : les nouvelles lectures sont placées en premier
+    nombre = len(horodatages)
+    horodatages, premieres = np.unique(horodatages, return_index=True)
+    valeurs = valeurs[premieres]
+
+    chemin = chemin_segment(dossier, capteur, date)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as f:
+        f.write(encoder(horodatages, valeurs))
+    os.replace(temporaire, chemin)  # Un lecteur voit l'ancien ou le nouveau segment, jamais un mélange
+    return nombre - len(horodatages)
+
+
+def lire_journee(dossier, capteur, date):
+    """
+    :return: Tuple (horodatages, valeurs) du segment, ou deux tableaux vides s'il n'existe pas.
+    """
+    try:
+        with open(chemin_segment(dossier, capteur, date), "rb") as f:
+            return decoder(f.read())
+    except FileNotFoundError:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+
+def dates_archivees(dossier, capteur):
+    """
+    :return: Liste triée des dates archivées pour un capteur.
+    """
+    try:
+        noms = os.listdir(os.path.join(dossier, capteur))
+    except FileNotFoundError:
+        return []
+    return sorted(nom[:-len(EXTENSION)] for nom in noms if nom.endswith(EXTENSION))
@@ -0,0 +1,369 @@
+# serveur_api.py
+
+import json       # Corps des réponses
+import time       # Intervalle de surveillance des sources du flux d'événements
+import gzip       # Compression des réponses
+import hashlib    # ETag : empreinte du corps
+import argparse   # Options de la ligne de commande
+import threading  # Le cache des réponses est partagé par les threads de connexion
+from collections import OrderedDict
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import backend_  # Mêmes fonctions que l'interface Tkinter
+import cache_json  # Lecture de data.json et empreinte (stat) des fichiers sources
+import journal_alertes  # Chemin du journal des alertes
+import stockage_capteurs  # Chemin de la base de l'historique
+import diffusion_evenements  # Diffusion du flux d'événements aux spectateurs
+import metriques  # Métriques au format Prometheus (route /metrics)
+
+# --------------------------- PRINCIPE DU SERVICE HTTP ---------------------------
+
+# Processus sans interface graphique qui expose les fonctions de backend_ en JSON pour des
+# tableaux de bord sur d'autres machines :
+#   GET /conditions                    dernières valeurs des capteurs (data.json)
+#   GET /trends?date=YYYY-MM-DD|YYYY-MM moyennes d'une journée ou d'un mois
+#   GET /trends/detailed?date=YYYY-MM-DD lectures brutes d'une journée, en colonnes
+#   GET /alerts                        alertes par heure
+#   GET /alerts/unread                 alertes non lues
+#   GET /events                        flux Server-Sent Events (voir plus bas)
+#   GET /metrics                       métriques au format texte de Prometheus (non mises en cache)
+#
+# Chaque réponse est calculée une seule fois par version de ses fichiers sources : la clé du
+# cache est l'empreinte (stat) de ces fichiers, prise AVANT le calcul (une écriture pendant
+# le calcul donne une nouvelle clé à la requête suivante). Tant que rien ne change, une requête
+# ne coûte que quelques appels à stat et l'envoi d'octets déjà prêts (JSON, version gzip, ETag).
+#
+# HTTP/1.1 avec connexions persistantes : un thread par connexion (ThreadingHTTPServer), et
+# non par requête. If-None-Match reçoit 304 sans corps quand le client a déjà la version.
+
+PORT = 8080
+FICHIER_CONDITIONS = "data.json"
+FICHIER_ALERTES = "alerts.json"
+TAILLE_MIN_GZIP = 1024   # Octets : en dessous, la compression ne rapporte rien
+ENTREES_CACHE = 256      # Réponses gardées en mémoire (les dates demandées sont illimitées)
+INTERVALLE_SURVEILLANCE = 0.25  # s entre deux vérifications (stat) des sources du flux
+DELAI_PING = 15.0        # s sans événement avant un commentaire SSE (garde la connexion ouverte)
+DELAI_ECRITURE = 10.0    # s : un spectateur qui ne lit plus son flux est déconnecté
+
+
+class RequeteInvalide(ValueError):
+    """
+    Paramètre de requête absent ou mal formé (réponse 400).
+    """
+
+# --------------------------- SOURCES DES RÉPONSES ---------------------------
+
+def _date(requete, *formats):
+    """
+    :return: Paramètre "date" de la requête, validé selon l'un des formats strptime donnés.
+    :raises RequeteInvalide: si le paramètre est absent ou ne correspond à aucun format.
+    """
+    date = requete.get("date", [""])[0]
+    for format_date in formats:
+        try:
+            datetime.strptime(date, format_date)
+            return date
+        except ValueError:
+            pass
+    raise RequeteInvalide(f"Paramètre date invalide : {date!r}")
+
+
+def _version_historique():
+    # En mode WAL, chaque commit modifie capteurs.db-wal ; un checkpoint ou un archivage, capteurs.db
+    base = stockage_capteurs.CHEMIN_BASE
+    return cache_json.empreinte(base), cache_json.empreinte(base + "-wal")
+
+
+def _version_alertes():
+    return (cache_json.empreinte(FICHIER_ALERTES),
+            cache_json.empreinte(journal_alertes.chemin_journal(FICHIER_ALERTES)))
+
+
+def _conditions(requete):
+    return cache_json.empreinte(FICHIER_CONDITIONS), lambda: cache_json.charger(FICHIER_CONDITIONS)
+
+
+def _tendance(requete):
+    date = _date(requete, "%Y-%m-%d", "%Y-%m")
+    return _version_historique(), lambda: backend_.get_trend_data(date)
+
+
+def _tendance_detaillee(requete):
+    date = _date(requete, "%Y-%m-%d")
+
+    def produire():
+        tableau = backend_.get_detailed_trend_data(date)
+        colonnes = {"horodatage": tableau["horodatage"].tolist()}
+        for colonne in tableau.dtype.names[1:]:
+            colonnes[colonne] = [None if valeur != valeur else valeur for valeur in tableau[colonne].tolist()]  # NaN -> null
+        return colonnes
+
+    return _version_historique(), produire
+
+
+def _alertes(requete):
+    version = _version_alertes()
+
+    def produire():
+        backend_.recharger_si_modifie(FICHIER_ALERTES)
+        return dict(backend_.get_alert_rows(FICHIER_ALERTES))
+
+    return version, produire
+
+
+def _alertes_non_lues(requete):
+    version = _version_alertes()
+
+    def produire():
+        backend_.recharger_si_modifie(FICHIER_ALERTES)
+        return backend_.get_unread_alerts(FICHIER_ALERTES)
+
+    return version, produire
+
+
+# Chemin -> fonction(paramètres de la requête) -> (version des sources, fonction qui calcule le contenu)
+ROUTES = {
+    "/conditions": _conditions,
+    "/trends": _tendance,
+    "/trends/detailed": _tendance_detaillee,
+    "/alerts": _alertes,
+    "/alerts/unread": _alertes_non_lues,
+}
+
+# --------------------------- CACHE DES RÉPONSES ---------------------------
+
+class Reponse:
+    """
+    Corps JSON prêt à envoyer, avec sa version compressée et leurs ETag. Les deux
+    représentations ont des octets différents : chacune a son propre ETag fort (RFC 7232),
+    sinon un cache intermédiaire pourrait revalider l'une et servir les octets de l'autre.
+    """
+
+    def __init__(self, contenu):
+        self.corps = json.dumps(contenu, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        empreinte = hashlib.blake2b(self.corps, digest_size=16).hexdigest()
+        self.etag = f'"{empreinte}"'
+        self.etag_gzip = f'"{empreinte}-gz"'
+        self.corps_gzip = gzip.compress(self.corps, 6) if len(self.corps) >= TAILLE_MIN_GZIP else None
+
+
+_reponses = OrderedDict()  # (chemin, requête) -> (version des sources, Reponse)
+_verrou = threading.Lock()
+
+
+def reponse(chemin, requete):
+    """
+    Retourne la réponse d'une route, depuis le cache si ses sources n'ont pas changé.
+
+    :param chemin: Chemin de l'URL (ex. "/trends").
+    :param requete: Chaîne de requête brute (partie de la clé du cache).
+    :return: Reponse, ou None si la route n'existe pas.
+    :raises RequeteInvalide: paramètres invalides.
+    """
+    route = ROUTES.get(chemin.rstrip("/") or "/")
+    if route is None:
+        return None
+    version, produire = route(parse_qs(requete))
+
+    cle = (chemin, requete)
+    with _verrou:
+        entree = _reponses.get(cle)
+        if entree is not None and entree[0] == version:
+            _reponses.move_to_end(cle)
+            return entree[1]
+
+    resultat = Reponse(produire())  # Hors du verrou : les autres routes restent servies pendant le calcul
+    with _verrou:
+        _reponses[cle] = (version, resultat)
+        _reponses.move_to_end(cle)
+        while len(_reponses) > ENTREES_CACHE:
+            _reponses.popitem(last=False)
+    return resultat
+
+# --------------------------- FLUX D'ÉVÉNEMENTS ---------------------------
+
+# Un seul thread surveille les sources pour tous les spectateurs de /events :
+#   - "conditions" : nouvel instantané de data.json (valeurs de l'écran des conditions) ;
+#   - "alerte"     : chaque alerte déclenchée par le moteur de règles (ajoutée à la fin de
+#                    "active_alerts" par le processus d'ingestion).
+# Les spectateurs ne lisent que leur file (voir diffusion_evenements) : leur nombre ne change
+# pas la charge sur les fichiers ni sur la base.
+
+diffuseur = diffusion_evenements.Diffuseur()
+_surveillance_demarree = False
+
+
+def _surveiller_sources():
+    empreinte_conditions = None
+    version_alertes = _version_alertes()
+    nombre_alertes = len(backend_.get_active_alerts(FICHIER_ALERTES))  # L'historique n'est pas rediffusé
+    while True:
+        try:
+            empreinte = cache_json.empreinte(FICHIER_CONDITIONS)
+            if empreinte is not None and empreinte != empreinte_conditions:
+                diffuseur.publier("conditions", cache_json.charger(FICHIER_CONDITIONS))
+                empreinte_conditions = empreinte
+
+            version = _version_alertes()
+            if version != version_alertes:
+                version_alertes = version
+                backend_.recharger_si_modifie(FICHIER_ALERTES)
+                alertes = backend_.get_active_alerts(FICHIER_ALERTES)
+                if len(alertes) < nombre_alertes:
+                    nombre_alertes = 0  # Liste réinitialisée (nouveau fichier des alertes)
+                for alerte in alertes[nombre_alertes:]:
+                    diffuseur.publier("alerte", alerte)
+                nombre_alertes = len(alertes)
+        except (OSError, ValueError) as erreur:  # Fichier en cours de remplacement ou illisible : nouvel essai
+            print(f"Surveillance du flux d'événements : {erreur!r}")
+        time.sleep(INTERVALLE_SURVEILLANCE)
+
+
+def demarrer_surveillance():
+    """
+    Lance (une seule fois) le thread qui publie les événements du flux /events.
+    """
+    global _surveillance_demarree
+    with _verrou:
+        if _surveillance_demarree:
+            return
+        _surveillance_demarree = True
+    threading.Thread(target=_surveiller_sources, name="flux_evenements", daemon=True).start()
+
+# --------------------------- SERVEUR HTTP ---------------------------
+
+class GestionnaireAPI(BaseHTTPRequestHandler):
+    """
+    Traite les requêtes GET d'une connexion persistante.
+    """
+
+    protocol_version = "HTTP/1.1"    # Connexions persistantes (keep-alive) par défaut
+    disable_nagle_algorithm = True   # En-têtes et corps partent sans attendre l'accusé de réception
+    server_version = "SerreAPI/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/events":
+            return self._diffuser()
+        if url.path == "/metrics":
+            return self._envoyer_metriques()
+        try:
+            resultat = reponse(url.path, url.query)
+        except RequeteInvalide as erreur:
+            return self._envoyer_erreur(400, str(erreur))
+        except Exception as erreur:  # Base ou fichier illisible : la connexion reste utilisable
+            self.log_error("Erreur sur %s : %r", self.path, erreur)
+            return self._envoyer_erreur(500, "Erreur interne")
+        if resultat is None:
+            return self._envoyer_erreur(404, f"Route inconnue : {url.path}")
+
+        compresse = resultat.corps_gzip is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        corps, etag = (resultat.corps_gzip, resultat.etag_gzip) if compresse else (resultat.corps, resultat.etag)
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self._en_tetes_communs(etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self._en_tetes_communs(etag)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if compresse:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def _diffuser(self):
+        """
+        Flux SSE : la connexion reste ouverte et reçoit les messages de son abonnement.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("X-Accel-Buffering", "no")  # Pas de mise en tampon par un proxy nginx
+        self.send_header("Connection", "close")     # Corps sans longueur : il se termine à la fermeture
+        self.end_headers()
+        self.close_connection = True
+
+        # Délai d'écriture : sans lui, un spectateur qui garde la connexion ouverte sans lire
+        # bloquerait ce thread dans sendall, même après son abandon par le diffuseur
+        self.connection.settimeout(DELAI_ECRITURE)
+        abonnement = diffuseur.abonner(rejouer=("conditions",))
+        try:
+            self.wfile.write(b"retry: 2000\n\n")  # Délai de reconnexion du navigateur (ms)
+            while True:
+                messages = abonnement.attendre(DELAI_PING)
+                if messages is None:
+                    break  # Spectateur trop lent : abandonné par le diffuseur
+                self.wfile.write(b"".join(messages) if messages else b": ping\n\n")
+        except OSError:
+            pass  # Spectateur déconnecté (BrokenPipeError, ConnectionResetError) ou bloqué (délai dépassé)
+        finally:
+            diffuseur.desabonner(abonnement)
+
+    def _envoyer_metriques(self):
+        corps = metriques.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", metriques.TYPE_CONTENU)
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def _en_tetes_communs(self, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")  # Le client revalide à chaque fois (304 si inchangé)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")  # Tableaux de bord servis depuis d'autres origines
+
+    def _envoyer_erreur(self, code, message):
+        corps = json.dumps({"erreur": message}, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, format, *args):
+        pass  # Pas de journal par requête (des milliers par seconde) ; les erreurs passent par log_error
+
+    def log_error(self, format, *args):
+        BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class ServeurAPI(ThreadingHTTPServer):
+    """
+    Serveur HTTP multithread (un thread par connexion).
+    """
+
+    daemon_threads = True     # Les connexions ouvertes n'empêchent pas l'arrêt du processus
+    request_queue_size = 128  # Connexions en attente d'acceptation lors des pics
+
+
+def demarrer(hote="0.0.0.0", port=PORT):
+    """
+    Crée le serveur (sans le lancer : appeler serve_forever()).
+
+    :return: Instance de ServeurAPI.
+    """
+    demarrer_surveillance()
+    return ServeurAPI((hote, port), GestionnaireAPI)
+
+# --------------------------- POINT D'ENTRÉE DU PROCESSUS ---------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service HTTP des conditions, tendances et alertes de la serre")
+    parser.add_argument("--hote", default="0.0.0.0", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    serveur = demarrer(args.hote, args.port)
+    print(f"Service HTTP sur http://{args.hote}:{args.port}")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
@@ -0,0 +1,119 @@
+# service_donnees.py
+
+import queue  # File thread-safe entre les threads de travail et le thread Tk
+from concurrent.futures import ThreadPoolExecutor
+
+# --------------------------- PRINCIPE DU SERVICE DE DONNÉES ---------------------------
+
+# Les lectures de fichiers et de la base (data.json, alerts.json, capteurs.db) sont exécutées
+# par un petit pool de threads. Les résultats sont déposés dans une file, vidée par le thread
+# Tkinter grâce à after() : les rappels qui modifient les widgets s'exécutent donc toujours
+# sur le thread principal et la fenêtre ne se fige jamais pendant une lecture lente.
+
+NOMBRE_THREADS = 2          # Threads de lecture
+INTERVALLE_VIDAGE = 30      # Délai (ms) entre deux vidages de la file de résultats
+
+
+class ServiceDonnees:
+    """
+    Exécute des lectures en arrière-plan et renvoie leurs résultats au thread Tkinter.
+    """
+
+    def __init__(self, root, nombre_threads=NOMBRE_THREADS):
+        """
+        :param root: Fenêtre Tk principale (sert à planifier le vidage de la file).
+        :param nombre_threads: Nombre de threads de lecture.
+        """
+        self.root = root
+        self._pool = ThreadPoolExecutor(max_workers=nombre_threads, thread_name_prefix="donnees")
+        self._resultats = queue.SimpleQueue()
+        self._generations = {}  # Dernière demande par clé : les réponses plus anciennes sont ignorées
+        self.root.after(INTERVALLE_VIDAGE, self._vider)
+
+    def demander(self, cle, fonction, args=(), rappel=None, erreur=None):
+        """
+        Lance fonction(*args) dans un thread de travail.
+
+        :param cle: Identifiant de la demande (ex. "conditions") ; seule la plus récente
+                    demande d'une même clé voit son rappel exécuté.
+        :param fonction: Fonction de lecture (ne doit pas toucher aux widgets).
+        :param args: Arguments de la fonction.
+        :param rappel: Appelé sur le thread Tk avec le résultat.
+        :param erreur: Appelé sur le thread Tk avec l'exception si la lecture échoue.
+        """
+        generation = self._generations.get(cle, 0) + 1
+        self._generations[cle] = generation
+
+        def travail():
+            try:
+                self._resultats.put((cle, generation, rappel, fonction(*args), None))
+            except Exception as exc:  # Remonté au thread Tk
+                self._resultats.put((cle, generation, erreur, None, exc))
+
+        self._pool.submit(travail)
+
+    def _vider(self):
+        """
+        Exécute, sur le thread Tk, les rappels des lectures terminées.
+        """
+        try:
+            while True:
+                try:
+                    cle, generation, rappel, resultat, exc = self._resultats.get_nowait()
+                except queue.Empty:
+                    break
+                if generation != self._generations.get(cle) or rappel is None:
+                    continue  # Réponse périmée (une demande plus récente existe) ou sans rappel
+                rappel(exc if exc is not None else resultat)
+        finally:
+            self.root.after(INTERVALLE_VIDAGE, self._vider)  # Toujours replanifier, même après une erreur
+
+    def arreter(self):
+        """
+        Arrête les threads de travail (les lectures en cours se terminent).
+        """
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# --------------------------- ACCÈS GLOBAL ---------------------------
+
+_service = None  # Service créé par main_interface
+
+
+def demarrer(root):
+    """
+    Crée le service de données pour la fenêtre principale.
+
+    :param root: Fenêtre Tk principale.
+    :return: Instance de ServiceDonnees.
+    """
+    global _service
+    _service = ServiceDonnees(root)
+    return _service
+
+
+def arreter():
+    """
+    Arrête le service de données démarré par main_interface (s'il existe).
+    """
+    global _service
+    if _service is not None:
+        _service.arreter()
+        _service = None
+
+
+def demander(cle, fonction, args=(), rappel=None, erreur=None):
+    """
+    Lance une lecture en arrière-plan via le service démarré par main_interface.
+    Sans service (module testé seul), la lecture est faite immédiatement sur le thread courant.
+    """
+    if _service is not None:
+        _service.demander(cle, fonction, args, rappel, erreur)
+        return
+    try:
+        resultat = fonction(*args)
+    except Exception as exc:
+        if erreur is not None:
+            erreur(exc)
+        return
+    if rappel is not None:
+        rappel(resultat)
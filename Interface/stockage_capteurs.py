@@ -0,0 +1,621 @@
+# stockage_capteurs.py
+
+import sqlite3    # Moteur de stockage (bibliothèque standard)
+import threading  # Une connexion SQLite par thread
+import calendar   # Conversion date -> secondes (heure murale traitée comme UTC)
+import math       # Écart type des agrégats
+import os         # Dossier des segments archivés
+from datetime import datetime, timedelta, timezone
+import numpy as np  # Lectures brutes décodées des segments
+import segments_capteurs  # Archives compressées des lectures brutes anciennes
+import tableaux_journees  # Journées archivées en tableaux NumPy projetés en mémoire
+
+# --------------------------- PRINCIPE DU STOCKAGE DES LECTURES ---------------------------
+
+# Chaque lecture de capteur est une ligne (capteur, horodatage, valeur) dans une base SQLite
+# en mode WAL. La clé primaire (capteur, horodatage) sert d'index : une requête pour une
+# journée ne lit que les lignes de cette journée, quelle que soit la taille de l'historique.
+#
+# Les horodatages sont des secondes entières depuis 1970 calculées à partir de l'heure
+# murale de la serre (aucune conversion de fuseau horaire). Plusieurs lectures d'un capteur
+# dans la même seconde (source plus rapide que 1 Hz, lignes sans horodatage) sont combinées :
+# la ligne garde leur moyenne et leur nombre (colonne "nombre"), aucune n'est écrasée.
+#
+# La table "agregats" contient, pour chaque capteur, des résumés par minute, par heure et
+# par jour (nombre, somme, somme des carrés, minimum, maximum). Ils sont recalculés pour
+# les seules périodes touchées par chaque lot de lectures : les tendances d'une journée ou
+# d'un mois lisent quelques lignes précalculées au lieu des lectures brutes.
+#
+# Les lectures brutes des journées anciennes peuvent être archivées (archiver()) dans des
+# segments compressés (voir segments_capteurs) : elles quittent la table "lectures", les
+# agrégats restent dans la base. La table "archives" donne, par capteur, la fin de la partie
+# archivée ; les lectures brutes antérieures sont lues dans les segments.
+
+CHEMIN_BASE = "capteurs.db"  # Fichier SQLite par défaut
+
+MINUTE = 60
+HEURE = 3600
+JOUR = 86400
+RESOLUTIONS = (MINUTE, HEURE, JOUR)  # Chaque résolution est calculée à partir de la précédente
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lectures (
+    capteur    TEXT    NOT NULL,
+    horodatage INTEGER NOT NULL,
+    valeur     REAL    NOT NULL,     -- Moyenne des lectures de cette seconde
+    nombre     INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (capteur, horodatage)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS capteurs (
+    nom TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS agregats (
+    capteur      TEXT    NOT NULL,
+    resolution   INTEGER NOT NULL,   -- Durée de la période en secondes (60, 3600 ou 86400)
+    debut        INTEGER NOT NULL,   -- Début de la période (horodatage)
+    nombre       INTEGER NOT NULL,
+    somme        REAL    NOT NULL,
+    somme_carres REAL    NOT NULL,
+    minimum      REAL    NOT NULL,
+    maximum      REAL    NOT NULL,
+    PRIMARY KEY (capteur, resolution, debut)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS archives (
+    capteur TEXT PRIMARY KEY,
+    fin     INTEGER NOT NULL             -- Les lectures antérieures sont dans les segments
+) WITHOUT ROWID;
+"""
+
+_local = threading.local()  # Connexions ouvertes par le thread courant (clé = chemin)
+
+# --------------------------- CONVERSIONS DE DATES ---------------------------
+
+def vers_horodatage(moment):
+    """
+    Convertit un datetime (heure murale) en secondes entières.
+
+    :param moment: Objet datetime sans fuseau horaire.
+    :return: Nombre de secondes depuis le 1er janvier 1970.
+    """
+    return calendar.timegm(moment.timetuple())
+
+
+def depuis_horodatage(horodatage):
+    """
+    Convertit des secondes entières en datetime (heure murale, sans fuseau horaire).
+    """
+    return datetime.fromtimestamp(horodatage, timezone.utc).replace(tzinfo=None)
+
+
+def bornes_journee(date):
+    """
+    Calcule l'intervalle [début, fin[ d'une journée.
+
+    :param date: Date au format "YYYY-MM-DD".
+    :return: Tuple (debut, fin) en secondes.
+    """
+    debut = datetime.strptime(date, "%Y-%m-%d")
+    return vers_horodatage(debut), vers_horodatage(debut + timedelta(days=1))
+
+def date_de(horodatage):
+    """
+    :return: Date "YYYY-MM-DD" contenant l'horodatage.
+    """
+    return depuis_horodatage(horodatage).date().isoformat()
+
+# --------------------------- CONNEXION À LA BASE ---------------------------
+
+def connexion(chemin=CHEMIN_BASE):
+    """
+    Retourne la connexion SQLite du thread courant (créée au premier appel).
+    Le schéma est créé si nécessaire et la base est remplie avec les données
+    simulées de fake_database tant qu'elle est vide.
+
+    :param chemin: Chemin du fichier SQLite (par défaut "capteurs.db").
+    :return: Objet sqlite3.Connection.
+    """
+    connexions = getattr(_local, "connexions", None)
+    if connexions is None:
+        connexions = _local.connexions = {}
+
+    conn = connexions.get(chemin)
+    if conn is None:
+        conn = sqlite3.connect(chemin, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")    # Lecteurs et écrivain en parallèle
+        conn.execute("PRAGMA synchronous=NORMAL")  # fsync au checkpoint seulement (sûr en WAL)
+        conn.executescript(_SCHEMA)
+        if "nombre" not in {colonne[1] for colonne in conn.execute("PRAGMA table_info(lectures)")}:
+            conn.execute("ALTER TABLE lectures ADD COLUMN nombre INTEGER NOT NULL DEFAULT 1")  # Base plus ancienne
+        if conn.execute("SELECT 1 FROM capteurs LIMIT 1").fetchone() is None:
+            importer_donnees_simulees(conn)
+        elif conn.execute("SELECT 1 FROM agregats LIMIT 1").fetchone() is None:
+            reconstruire_agregats(conn)  # Base créée avant l'ajout des agrégats
+        connexions[chemin] = conn
+    return conn
+
+
+def importer_donnees_simulees(conn):
+    """
+    Copie les données détaillées de fake_database dans la base (démonstration).
+    """
+    import fake_database  # Importé ici : seulement nécessaire pour une base vide
+
+    lectures = []
+    for date, heures in fake_database.get_detailed_data().items():
+        for heure, valeurs in heures.items():
+            moment = datetime.strptime(f"{date} {heure}", "%Y-%m-%d %H:%M")
+            for capteur, valeur in valeurs.items():
+                lectures.append((capteur, vers_horodatage(moment), valeur))
+    _inserer(conn, lectures)
+
+# --------------------------- ÉCRITURE DES LECTURES ---------------------------
+
+def ajouter_lectures(lectures, chemin=CHEMIN_BASE):
+    """
+    Ajoute un lot de lectures dans une seule transaction.
+
+    :param lectures: Itérable de tuples (capteur, moment, valeur) où moment est un datetime
+                     ou des secondes entières.
+    :param chemin: Chemin du fichier SQLite.
+    """
+    lignes = [
+        (capteur, moment if isinstance(moment, int) else vers_horodatage(moment), float(valeur))
+        for capteur, moment, valeur in lectures
+    ]
+    _inserer(connexion(chemin), lignes)
+
+
+def _inserer(conn, lignes):
+    """
+    Insère des lignes (capteur, horodatage, valeur), enregistre les nouveaux capteurs et
+    met à jour les agrégats des périodes touchées, dans la même transaction.
+    Une lecture dont la seconde existe déjà (dans le lot ou dans la base) est combinée avec
+    les précédentes : moyenne cumulée pondérée par leur nombre.
+    Les lectures tardives d'une journée déjà archivée sont ajoutées à son segment.
+    """
+    limites = dict(conn.execute("SELECT capteur, fin FROM archives"))
+    if limites:
+        tardives = [ligne for ligne in lignes if ligne[1] < limites.get(ligne[0], ligne[1])]
+        if tardives:
+            lignes = [ligne for ligne in lignes if ligne[1] >= limites.get(ligne[0], ligne[1])]
+            _completer_archives(conn, tardives)
+
+    with conn:  # Une transaction = un seul commit pour tout le lot
+        conn.executemany(
+            """INSERT INTO lectures (capteur, horodatage, valeur) VALUES (?, ?, ?)
+               ON CONFLICT (capteur, horodatage) DO UPDATE
+               SET valeur = (valeur * nombre + excluded.valeur) / (nombre + 1), nombre = nombre + 1""",
+            lignes,
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO capteurs (nom) VALUES (?)", {(ligne[0],) for ligne in lignes}
+        )
+
+        # Plage de temps touchée par le lot, pour chaque capteur
+        plages = {}
+        for capteur, horodatage, _ in lignes:
+            plage = plages.get(capteur)
+            if plage is None:
+                plages[capteur] = [horodatage, horodatage]
+            elif horodatage < plage[0]:
+                plage[0] = horodatage
+            elif horodatage > plage[1]:
+                plage[1] = horodatage
+        for capteur, (premier, dernier) in plages.items():
+            _recalculer_agregats(conn, capteur, premier, dernier)
+
+# --------------------------- AGRÉGATS (1 MIN, 1 H, 1 JOUR) ---------------------------
+
+def _recalculer_agregats(conn, capteur, premier, dernier, minutes=True):
+    """
+    Recalcule les agrégats d'un capteur pour les périodes contenant [premier, dernier].
+    Le recalcul (plutôt qu'un cumul) reste juste quand une lecture existante est combinée.
+    Les agrégats portent sur les secondes mesurées (une valeur moyenne par seconde).
+
+    :param minutes: False si les agrégats par minute sont déjà à jour (journée archivée).
+    """
+    # Minutes : à partir des lectures brutes
+    if minutes:
+        debut, fin = premier - premier % MINUTE, dernier - dernier % MINUTE + MINUTE
+        conn.execute(
+            """INSERT OR REPLACE INTO agregats
+               SELECT capteur, ?, (horodatage / ?) * ?, COUNT(*), SUM(valeur), SUM(valeur * valeur), MIN(valeur), MAX(valeur)
+               FROM lectures WHERE capteur = ? AND horodatage >= ? AND horodatage < ?
+               GROUP BY horodatage / ?""",
+            (MINUTE, MINUTE, MINUTE, capteur, debut, fin, MINUTE),
+        )
+
+    # Heures à partir des minutes, puis jours à partir des heures
+    for fine, grossiere in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+        debut, fin = premier - premier % grossiere, dernier - dernier % grossiere + grossiere
+        conn.execute(
+            """INSERT OR REPLACE INTO agregats
+               SELECT capteur, ?, (debut / ?) * ?, SUM(nombre), SUM(somme), SUM(somme_carres), MIN(minimum), MAX(maximum)
+               FROM agregats WHERE capteur = ? AND resolution = ? AND debut >= ? AND debut < ?
+               GROUP BY debut / ?""",
+            (grossiere, grossiere, grossiere, capteur, fine, debut, fin, grossiere),
+        )
+
+
+def reconstruire_agregats(conn):
+    """
+    Recalcule tous les agrégats à partir des lectures (base existante sans agrégats).
+    """
+    with conn:
+        for (capteur,) in conn.execute("SELECT nom FROM capteurs").fetchall():
+            premier, dernier = conn.execute(
+                "SELECT MIN(horodatage), MAX(horodatage) FROM lectures WHERE capteur = ?", (capteur,)
+            ).fetchone()
+            if premier is not None:
+                _recalculer_agregats(conn, capteur, premier, dernier)
+
+
+def _agregats_minutes(capteur, horodatages, valeurs):
+    """
+    Calcule les agrégats par minute de lectures triées (tableaux NumPy).
+
+    :return: Liste de lignes pour la table agregats.
+    """
+    minutes, premiers, nombres = np.unique(horodatages - horodatages % MINUTE,
+                                           return_index=True, return_counts=True)
+    return list(zip(
+        [capteur] * len(minutes), [MINUTE] * len(minutes), minutes.tolist(), nombres.tolist(),
+        np.add.reduceat(valeurs, premiers).tolist(), np.add.reduceat(valeurs * valeurs, premiers).tolist(),
+        np.minimum.reduceat(valeurs, premiers).tolist(), np.maximum.reduceat(valeurs, premiers).tolist(),
+    ))
+
+def statistiques(capteur, debut, fin, resolution, chemin=CHEMIN_BASE):
+    """
+    Lit les agrégats précalculés d'un capteur.
+
+    :param capteur: Nom du capteur (ex. "Température").
+    :param debut: Horodatage de début inclus.
+    :param fin: Horodatage de fin exclu.
+    :param resolution: MINUTE, HEURE ou JOUR.
+    :param chemin: Chemin du fichier SQLite.
+    :return: Liste de dictionnaires {"debut", "nombre", "moyenne", "minimum", "maximum", "ecart_type"}.
+    """
+    lignes = connexion(chemin).execute(
+        """SELECT debut, nombre, somme, somme_carres, minimum, maximum FROM agregats
+           WHERE capteur = ? AND resolution = ? AND debut >= ? AND debut < ?""",
+        (capteur, resolution, debut, fin),
+    )
+    return [_resume(*ligne) for ligne in lignes]
+
+
+def _resume(debut, nombre, somme, somme_carres, minimum, maximum):
+    moyenne = somme / nombre
+    return {
+        "debut": debut,
+        "nombre": nombre,
+        "moyenne": moyenne,
+        "minimum": minimum,
+        "maximum": maximum,
+        "ecart_type": math.sqrt(max(somme_carres / nombre - moyenne * moyenne, 0.0)),
+    }
+
+
+def _moyennes(debut, fin, chemin):
+    """
+    Moyenne de chaque capteur sur [debut, fin[ à partir des agrégats journaliers.
+    """
+    conn = connexion(chemin)
+    data = {}
+    for capteur in liste_capteurs(chemin):
+        (somme, nombre) = conn.execute(
+            """SELECT SUM(somme), SUM(nombre) FROM agregats
+               WHERE capteur = ? AND resolution = ? AND debut >= ? AND debut < ?""",
+            (capteur, JOUR, debut, fin),
+        ).fetchone()
+        if nombre:
+            data[capteur] = round(somme / nombre, 2)
+    return data
+
+# --------------------------- ARCHIVES COMPRESSÉES ---------------------------
+
+def dossier_archives(chemin=CHEMIN_BASE):
+    """
+    :return: Dossier des segments associé à une base (ex. "capteurs.db" -> "capteurs.segments").
+    """
+    return os.path.splitext(chemin)[0] + ".segments"
+
+
+def archiver(avant, chemin=CHEMIN_BASE):
+    """
+    Déplace les lectures brutes des journées antérieures à 'avant' vers des segments compressés.
+    Chaque journée est déplacée dans sa propre transaction (les écrivains attendent pendant ce
+    temps) : une lecture n'est jamais à la fois absente de la base et des segments.
+
+    :param avant: Date "YYYY-MM-DD" : les journées strictement antérieures sont archivées.
+    :param chemin: Chemin du fichier SQLite.
+    :return: Nombre de lectures archivées.
+    """
+    conn = connexion(chemin)
+    dossier = dossier_archives(chemin)
+    limite = bornes_journee(avant)[0]
+    nombre = 0
+    for capteur in liste_capteurs(chemin):
+        jours = [jour for (jour,) in conn.execute(
+            "SELECT debut FROM agregats WHERE capteur = ? AND resolution = ? AND debut < ? ORDER BY debut",
+            (capteur, JOUR, limite),
+        )]
+        for jour in jours:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")  # Bloque les autres écrivains pendant le déplacement
+                lignes = conn.execute(
+                    "SELECT horodatage, valeur FROM lectures WHERE capteur = ? AND horodatage >= ? AND horodatage < ?",
+                    (capteur, jour, jour + JOUR),
+                ).fetchall()
+                if lignes:
+                    horodatages, valeurs = zip(*lignes)
+                    segments_capteurs.ecrire_journee(dossier, capteur, date_de(jour), horodatages, valeurs)
+                    conn.execute(
+                        "DELETE FROM lectures WHERE capteur = ? AND horodatage >= ? AND horodatage < ?",
+                        (capteur, jour, jour + JOUR),
+                    )
+                conn.execute(
+                    """INSERT INTO archives (capteur, fin) VALUES (?, ?)
+                       ON CONFLICT (capteur) DO UPDATE SET fin = MAX(fin, excluded.fin)""",
+                    (capteur, jour + JOUR),
+                )
+            nombre += len(lignes)
+    return nombre
+
+
+def _completer_archives(conn, lignes):
+    """
+    Ajoute des lectures tardives aux segments de journées déjà archivées et recalcule leurs
+    agrégats à partir des segments complétés.
+    """
+    dossier = dossier_archives(conn.execute("PRAGMA database_list").fetchone()[2])
+    par_journee = {}
+    for capteur, horodatage, valeur in lignes:
+        par_journee.setdefault((capteur, horodatage - horodatage % JOUR), []).append((horodatage, valeur))
+
+    with conn:
+        for (capteur, jour), points in par_journee.items():
+            horodatages, valeurs = zip(*points)
+            remplacees = segments_capteurs.ecrire_journee(dossier, capteur, date_de(jour), horodatages, valeurs)
+            if remplacees:
+                print(f"{remplacees} lectures archivées de {capteur} ({date_de(jour)}) remplacées par des lectures tardives")
+            tableaux_journees.supprimer(os.path.join(dossier, "journees"), date_de(jour))  # Reconstruit à la prochaine lecture
+            horodatages, valeurs = segments_capteurs.lire_journee(dossier, capteur, date_de(jour))
+            conn.executemany("INSERT OR REPLACE INTO agregats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             _agregats_minutes(capteur, horodatages, valeurs))
+            _recalculer_agregats(conn, capteur, jour, jour + JOUR - 1, minutes=False)
+
+
+def lectures_brutes(capteur, debut, fin, chemin=CHEMIN_BASE):
+    """
+    Lectures brutes d'un capteur sur [debut, fin[, segments archivés compris.
+
+    :return: Tuple (horodatages, valeurs) de tableaux NumPy triés par horodatage.
+    """
+    conn = connexion(chemin)
+    morceaux_t, morceaux_v = [], []
+
+    archive = conn.execute("SELECT fin FROM archives WHERE capteur = ?", (capteur,)).fetchone()
+    if archive is not None and debut < archive[0]:
+        dossier = dossier_archives(chemin)
+        jour = debut - debut % JOUR
+        while jour < min(fin, archive[0]):
+            horodatages, valeurs = segments_capteurs.lire_journee(dossier, capteur, date_de(jour))
+            garder = (horodatages >= debut) & (horodatages < fin)
+            morceaux_t.append(horodatages[garder])
+            morceaux_v.append(valeurs[garder])
+            jour += JOUR
+
+    lignes = conn.execute(
+        """SELECT horodatage, valeur FROM lectures
+           WHERE capteur = ? AND horodatage >= ? AND horodatage < ? ORDER BY horodatage""",
+        (capteur, debut, fin),
+    ).fetchall()
+    if lignes:
+        horodatages, valeurs = zip(*lignes)
+        morceaux_t.append(np.array(horodatages, dtype=np.int64))
+        morceaux_v.append(np.array(valeurs, dtype=np.float64))
+
+    if not morceaux_t:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    # Les journées archivées précèdent toujours les lectures de la base : l'ordre est conservé
+    return np.concatenate(morceaux_t), np.concatenate(morceaux_v)
+
+def tableau_journee(date, chemin=CHEMIN_BASE):
+    """
+    Lectures brutes d'une journée en tableau NumPy structuré (voir tableaux_journees.TYPE).
+    Pour une journée archivée par tous les capteurs, le tableau est une vue en lecture seule
+    sur un fichier .npy projeté en mémoire (créé à la première lecture à partir des segments).
+
+    :param date: Date au format "YYYY-MM-DD".
+    :param chemin: Chemin du fichier SQLite.
+    :return: Tableau structuré trié par horodatage (vide si aucune donnée).
+    """
+    debut, fin = bornes_journee(date)
+    capteurs = liste_capteurs(chemin)
+    (archives,) = connexion(chemin).execute("SELECT COUNT(*) FROM archives WHERE fin >= ?", (fin,)).fetchone()
+    archivee = bool(capteurs) and archives == len(capteurs)
+
+    dossier = os.path.join(dossier_archives(chemin), "journees")
+    if archivee:
+        tableau = tableaux_journees.ouvrir(dossier, date)
+        if tableau is not None:
+            return tableau
+
+    tableau = tableaux_journees.construire(
+        {capteur: lectures_brutes(capteur, debut, fin, chemin) for capteur in capteurs}
+    )
+    if archivee and len(tableau) and tableaux_journees.ecrire(dossier, date, tableau):
+        return tableaux_journees.ouvrir(dossier, date)
+    return tableau  # Journée non archivée, ou fichier encore projeté en mémoire (Windows)
+
+# --------------------------- LECTURE : UNE JOURNÉE ---------------------------
+
+def liste_capteurs(chemin=CHEMIN_BASE):
+    """
+    :return: Liste des noms de capteurs connus.
+    """
+    return [nom for (nom,) in connexion(chemin).execute("SELECT nom FROM capteurs")]
+
+
+def derniere_lecture(capteur, chemin=CHEMIN_BASE):
+    """
+    :return: Horodatage de la lecture la plus récente d'un capteur (recherche dans l'index), ou None.
+    """
+    return connexion(chemin).execute(
+        "SELECT MAX(horodatage) FROM lectures WHERE capteur = ?", (capteur,)
+    ).fetchone()[0]
+
+
+def nombre_lectures(debut=None, fin=None, chemin=CHEMIN_BASE):
+    """
+    Nombre de lectures de tous les capteurs, compté dans les agrégats (une recherche dans la
+    clé primaire par capteur, sans parcourir les lectures).
+
+    :param debut: Début inclus (horodatage aligné sur la minute) ; None = toutes les lectures.
+    :param fin: Fin exclue (utilisée avec 'debut').
+    """
+    conn = connexion(chemin)
+    if debut is None:
+        resolution, debut, fin = JOUR, 0, 2**62
+    else:
+        resolution = MINUTE
+    total = 0
+    for capteur in liste_capteurs(chemin):
+        total += conn.execute(
+            "SELECT SUM(nombre) FROM agregats WHERE capteur = ? AND resolution = ? AND debut >= ? AND debut < ?",
+            (capteur, resolution, debut, fin),
+        ).fetchone()[0] or 0
+    return total
+
+
+def moyenne_journee(date, chemin=CHEMIN_BASE):
+    """
+    Moyenne de chaque capteur pour une journée (lue dans les agrégats journaliers).
+
+    :param date: Date au format "YYYY-MM-DD".
+    :param chemin: Chemin du fichier SQLite.
+    :return: Dictionnaire {"Date": date, capteur: moyenne, ...} ou {} si aucune donnée.
+    """
+    data = _moyennes(*bornes_journee(date), chemin)
+    return {"Date": date, **data} if data else {}
+
+
+def moyenne_mois(mois, chemin=CHEMIN_BASE):
+    """
+    Moyenne de chaque capteur pour un mois (au plus 31 agrégats journaliers par capteur).
+
+    :param mois: Mois au format "YYYY-MM".
+    :param chemin: Chemin du fichier SQLite.
+    :return: Dictionnaire {"Date": mois, capteur: moyenne, ...} ou {} si aucune donnée.
+    """
+    premier_jour = datetime.strptime(mois, "%Y-%m")
+    suivant = (premier_jour + timedelta(days=32)).replace(day=1)
+    data = _moyennes(vers_horodatage(premier_jour), vers_horodatage(suivant), chemin)
+    return {"Date": mois, **data} if data else {}
+
+
+def donnees_journee(date, chemin=CHEMIN_BASE):
+    """
+    Récupère toutes les lectures d'une journée, regroupées par heure.
+
+    :param date: Date au format "YYYY-MM-DD".
+    :param chemin: Chemin du fichier SQLite.
+    :return: Dictionnaire {"HH:MM": {capteur: valeur, ...}, ...} trié par heure.
+    """
+    debut, fin = bornes_journee(date)
+    par_horodatage = {}
+    for capteur in liste_capteurs(chemin):
+        horodatages, valeurs = lectures_brutes(capteur, debut, fin, chemin)
+        for horodatage, valeur in zip(horodatages.tolist(), valeurs.tolist()):
+            par_horodatage.setdefault(horodatage, {})[capteur] = valeur
+
+    return {
+        depuis_horodatage(horodatage).strftime("%H:%M"): par_horodatage[horodatage]
+        for horodatage in sorted(par_horodatage)
+    }
+
+# --------------------------- LECTURE : PLAGE DE PLUSIEURS JOURS ---------------------------
+
+BRUT = 0            # "Résolution" des lectures brutes (table lectures)
+POINTS_MAX = 3000   # Nombre de points visé pour une plage : 90 jours -> 2160 agrégats horaires
+
+
+def choisir_resolution(capteur, debut, fin, points_max=POINTS_MAX, chemin=CHEMIN_BASE):
+    """
+    Choisit la résolution la plus fine qui donne au plus 'points_max' points sur [debut, fin[.
+    Le nombre de lectures brutes est estimé à partir des agrégats horaires (sans parcourir
+    les lectures).
+
+    :return: BRUT, MINUTE, HEURE ou JOUR.
+    """
+    (nombre,) = connexion(chemin).execute(
+        """SELECT SUM(nombre) FROM agregats
+           WHERE capteur = ? AND resolution = ? AND debut >= ? AND debut < ?""",
+        (capteur, HEURE, debut - debut % HEURE, fin),
+    ).fetchone()
+    if (nombre or 0) <= points_max:
+        return BRUT
+    for resolution in RESOLUTIONS:
+        if (fin - debut) / resolution <= points_max:
+            return resolution
+    return JOUR
+
+
+def serie(capteur, debut, fin, resolution, chemin=CHEMIN_BASE):
+    """
+    Parcourt les points d'un capteur sur [debut, fin[ dans l'ordre chronologique. Les agrégats
+    sont lus ligne par ligne (curseur SQLite, sans liste intermédiaire).
+
+    :param capteur: Nom du capteur.
+    :param debut: Horodatage de début inclus.
+    :param fin: Horodatage de fin exclu.
+    :param resolution: BRUT, MINUTE, HEURE ou JOUR.
+    :param chemin: Chemin du fichier SQLite.
+    :return: Générateur de tuples (horodatage, moyenne, minimum, maximum). Pour les lectures
+             brutes, les trois valeurs sont égales.
+    """
+    if resolution == BRUT:
+        horodatages, valeurs = lectures_brutes(capteur, debut, fin, chemin)  # Au plus POINTS_MAX lectures
+        for horodatage, valeur in zip(horodatages.tolist(), valeurs.tolist()):
+            yield horodatage, valeur, valeur, valeur
+        return
+
+    for horodatage, nombre, somme, minimum, maximum in connexion(chemin).execute(
+        """SELECT debut, nombre, somme, minimum, maximum FROM agregats
+           WHERE capteur = ? AND resolution = ? AND debut >= ? AND debut < ? ORDER BY debut""",
+        (capteur, resolution, debut, fin),
+    ):
+        yield horodatage, somme / nombre, minimum, maximum
+
+# --------------------------- MÊMES SIGNATURES QUE fake_database ---------------------------
+
+def liste_dates(chemin=CHEMIN_BASE):
+    """
+    :return: Liste triée des dates ("YYYY-MM-DD") pour lesquelles des lectures existent.
+    """
+    conn = connexion(chemin)
+    debuts = set()
+    for capteur in liste_capteurs(chemin):
+        debuts.update(debut for (debut,) in conn.execute(
+            "SELECT debut FROM agregats WHERE capteur = ? AND resolution = ?", (capteur, JOUR)
+        ))
+    return [date_de(debut) for debut in sorted(debuts)]
+
+
+def tendance_moyenne(chemin=CHEMIN_BASE):
+    """
+    Équivalent de fake_database.tendance_moyenne() calculé à partir des lectures.
+    :return: Liste de dictionnaires {"Date": ..., capteur: moyenne, ...}.
+    """
+    return [moyenne_journee(date, chemin) for date in liste_dates(chemin)]
+
+
+def get_detailed_data(chemin=CHEMIN_BASE):
+    """
+    Équivalent de fake_database.get_detailed_data() calculé à partir des lectures.
+    :return: Dictionnaire contenant les données par jour et par heure.
+    """
+    return {date: donnees_journee(date, chemin) for date in liste_dates(chemin)}
@@ -0,0 +1,186 @@
+# surveillance_fichiers.py
+
+import os       # Chemins absolus, stat et lecture du descripteur inotify
+import struct   # Décodage des événements inotify
+import ctypes   # Appels inotify de la libc (Linux)
+import ctypes.util
+import tkinter as tk  # createfilehandler : réveil de la boucle Tk par le noyau
+import planificateur  # Sondage périodique quand inotify n'est pas disponible
+from cache_json import empreinte  # (date de modification, taille, inode) d'un fichier
+
+# --------------------------- PRINCIPE DE LA SURVEILLANCE DES FICHIERS ---------------------------
+
+# Au lieu de relire data.json ou les alertes à intervalle fixe, l'interface est prévenue quand
+# un fichier change réellement :
+#   - sous Linux, inotify surveille les dossiers des fichiers (les écrivains remplacent les
+#     fichiers par renommage : c'est le dossier qui voit l'événement). Le descripteur inotify
+#     est confié à la boucle Tk (createfilehandler) : aucun réveil tant que rien ne change,
+#     et la notification arrive en quelques millisecondes ;
+#   - ailleurs (ou si inotify échoue), un sondage léger compare toutes les 500 ms l'empreinte
+#     (date de modification, taille, inode) de chaque fichier, sans jamais le lire.
+# Les changements rapprochés (ex. fichier temporaire puis renommage) sont regroupés : chaque
+# rappel est exécuté une seule fois par rafale, sur le thread Tkinter.
+
+INTERVALLE_SONDAGE = 500     # ms, mode sans inotify
+DELAI_REGROUPEMENT = 30      # ms entre le premier événement d'une rafale et les rappels
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_MASQUE = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENEMENT = struct.Struct("iIII")  # wd, masque, cookie, longueur du nom
+
+
+class _Inotify:
+    """
+    Accès minimal à inotify par ctypes (surveillance de dossiers).
+    """
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dossiers = {}  # Descripteur de surveillance -> dossier
+
+    def surveiller(self, dossier):
+        if dossier in self.dossiers.values():
+            return
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dossier), _MASQUE)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {dossier}")
+        self.dossiers[wd] = dossier
+
+    def lire(self):
+        """
+        :return: Ensemble des chemins absolus touchés depuis la dernière lecture.
+        """
+        chemins = set()
+        while True:
+            try:
+                tampon = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return chemins
+            position = 0
+            while position < len(tampon):
+                wd, _, _, longueur = _EVENEMENT.unpack_from(tampon, position)
+                position += _EVENEMENT.size
+                nom = tampon[position:position + longueur].rstrip(b"\0")
+                position += longueur
+                if wd in self.dossiers and nom:
+                    chemins.add(os.path.join(self.dossiers[wd], os.fsdecode(nom)))
+
+
+class Surveillance:
+    """
+    Un rappel nommé par groupe de fichiers surveillés, exécuté sur le thread Tkinter.
+    """
+
+    def __init__(self, root):
+        """
+        :param root: Fenêtre Tk principale.
+        """
+        self.root = root
+        self.abonnements = {}   # nom -> (chemins absolus, rappel, propriétaire)
+        self._empreintes = {}   # chemin -> empreinte (mode sondage)
+        self._en_attente = set()
+        self._id_regroupement = None
+
+        try:
+            self._inotify = _Inotify()
+            self.root.tk.createfilehandler(self._inotify.fd, tk.READABLE, self._sur_inotify)
+        except (OSError, AttributeError, tk.TclError):  # Pas de libc inotify, ou Tk sans createfilehandler (Windows)
+            self._inotify = None
+            planificateur.ajouter("surveillance_fichiers", self._sonder, INTERVALLE_SONDAGE,
+                                  proprietaire=root, immediat=False)
+
+    def surveiller(self, nom, chemins, rappel, proprietaire=None):
+        """
+        Enregistre (ou remplace) un rappel exécuté quand l'un des fichiers change.
+
+        :param nom: Nom unique de l'abonnement (ex. "conditions").
+        :param chemins: Chemin ou liste de chemins de fichiers.
+        :param rappel: Fonction sans argument.
+        :param proprietaire: Widget dont la destruction annule l'abonnement.
+        """
+        if isinstance(chemins, str):
+            chemins = [chemins]
+        chemins = {os.path.abspath(chemin) for chemin in chemins}
+        self.abonnements[nom] = (chemins, rappel, proprietaire)
+        for chemin in chemins:
+            if self._inotify is not None:
+                self._inotify.surveiller(os.path.dirname(chemin))
+            else:
+                self._empreintes.setdefault(chemin, empreinte(chemin))
+
+    def oublier(self, nom):
+        """
+        Annule l'abonnement 'nom' s'il existe.
+        """
+        self.abonnements.pop(nom, None)
+
+    def _sur_inotify(self, fd, masque):
+        self._signaler(self._inotify.lire())
+
+    def _sonder(self):
+        modifies = set()
+        for chemin, ancienne in self._empreintes.items():
+            nouvelle = empreinte(chemin)
+            if nouvelle != ancienne:
+                self._empreintes[chemin] = nouvelle
+                modifies.add(chemin)
+        self._signaler(modifies)
+
+    def _signaler(self, chemins):
+        """
+        Mémorise les fichiers modifiés et planifie les rappels (une fois par rafale).
+        """
+        self._en_attente |= chemins
+        if self._en_attente and self._id_regroupement is None:
+            self._id_regroupement = self.root.after(DELAI_REGROUPEMENT, self._notifier)
+
+    def _notifier(self):
+        self._id_regroupement = None
+        modifies, self._en_attente = self._en_attente, set()
+        for nom, (chemins, rappel, proprietaire) in list(self.abonnements.items()):
+            if proprietaire is not None and not proprietaire.winfo_exists():
+                self.oublier(nom)  # L'écran qui s'était abonné a été fermé
+            elif chemins & modifies:
+                rappel()
+
+# --------------------------- ACCÈS GLOBAL ---------------------------
+
+_surveillance = None  # Surveillance créée par main_interface
+
+
+def demarrer(root):
+    """
+    Crée la surveillance des fichiers pour la fenêtre principale.
+
+    :param root: Fenêtre Tk principale.
+    :return: Instance de Surveillance.
+    """
+    global _surveillance
+    _surveillance = Surveillance(root)
+    return _surveillance
+
+
+def surveiller(nom, chemins, rappel, proprietaire=None):
+    """
+    Enregistre un rappel auprès de la surveillance de main_interface. Si aucune n'a été
+    démarrée (module testé seul), elle est créée pour la fenêtre du propriétaire.
+    """
+    global _surveillance
+    if _surveillance is None:
+        _surveillance = Surveillance(proprietaire.winfo_toplevel())
+    _surveillance.surveiller(nom, chemins, rappel, proprietaire)
+
+
+def oublier(nom):
+    """
+    Annule un abonnement (si la surveillance existe).
+    """
+    if _surveillance is not None:
+        _surveillance.oublier(nom)
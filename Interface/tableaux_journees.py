@@ -0,0 +1,120 @@
+# tableaux_journees.py
+
+import os  # Fichiers .npy des journées et remplacement atomique
+import numpy as np  # Tableaux structurés projetés en mémoire
+
+# --------------------------- PRINCIPE DES TABLEAUX DE JOURNÉES ---------------------------
+
+# Les lectures brutes d'une journée archivée sont aussi disponibles sous forme de tableau NumPy
+# structuré à largeur fixe (une ligne par horodatage, une colonne par capteur, NaN quand un
+# capteur n'a pas de lecture à cet instant), enregistré dans un fichier .npy par journée.
+#
+# Le fichier est ouvert avec np.load(mmap_mode="r") : le tableau retourné est une vue sur le
+# cache de pages du système, sans analyse ni copie. Relire une année d'historique ne coûte
+# que la lecture des pages effectivement utilisées.
+#
+# Ces fichiers sont un cache : ils peuvent être supprimés à tout moment et sont reconstruits
+# à partir des segments compressés (voir stockage_capteurs.tableau_journee).
+#
+# Sous Windows, un fichier projeté en mémoire (par ce processus ou un autre) ne peut être ni
+# remplacé ni supprimé. La journée est alors marquée périmée (fichier "<date>.perime") : ouvrir()
+# l'ignore et elle est reconstruite à chaque lecture, jusqu'à ce qu'une écriture réussisse.
+
+COLONNES = ("Température", "Humidité", "CO2", "Lumière")
+TYPE = np.dtype([("horodatage", "<i8")] + [(colonne, "<f8") for colonne in COLONNES])
+
+
+def construire(series):
+    """
+    Assemble les lectures de plusieurs capteurs en un tableau structuré.
+
+    :param series: Dictionnaire {capteur: (horodatages, valeurs)} de tableaux triés ;
+                   les capteurs absents de COLONNES sont ignorés.
+    :return: Tableau structuré de type TYPE, trié par horodatage.
+    """
+    horodatages = np.empty(0, dtype=np.int64)
+    for capteur, (t, _) in series.items():
+        if capteur in COLONNES:
+            horodatages = np.union1d(horodatages, t)
+
+    tableau = np.empty(len(horodatages), dtype=TYPE)
+    tableau["horodatage"] = horodatages
+    for colonne in COLONNES:
+        tableau[colonne] = np.nan
+        if colonne in series:
+            t, valeurs = series[colonne]
+            tableau[colonne][np.searchsorted(horodatages, t)] = valeurs
+    return tableau
+
+
+def chemin_journee(dossier, date):
+    """
+    :return: Chemin du fichier .npy d'une date "YYYY-MM-DD".
+    """
+    return os.path.join(dossier, date + ".npy")
+
+
+def chemin_perime(dossier, date):
+    """
+    :return: Chemin du marqueur d'une journée dont le fichier .npy n'a pas pu être remplacé.
+    """
+    return os.path.join(dossier, date + ".perime")
+
+
+def _marquer_perime(dossier, date):
+    with open(chemin_perime(dossier, date), "wb"):
+        pass
+
+
+def ecrire(dossier, date, tableau):
+    """
+    Enregistre le tableau d'une journée (remplacement atomique).
+
+    :return: True si le fichier a été remplacé, False si la journée a été marquée périmée
+             (fichier projeté en mémoire sous Windows).
+    """
+    os.makedirs(dossier, exist_ok=True)
+    chemin = chemin_journee(dossier, date)
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as f:
+        np.save(f, tableau)
+    try:
+        os.replace(temporaire, chemin)
+    except PermissionError:
+        os.remove(temporaire)
+        _marquer_perime(dossier, date)
+        return False
+    try:
+        os.remove(chemin_perime(dossier, date))
+    except FileNotFoundError:
+        pass
+    return True
+
+
+def ouvrir(dossier, date):
+    """
+    Ouvre le tableau d'une journée sans le lire (projection en mémoire, lecture seule).
+
+    :return: np.memmap de type TYPE, ou None si le fichier n'existe pas, a un autre format ou
+             est périmé.
+    """
+    if os.path.exists(chemin_perime(dossier, date)):
+        return None
+    try:
+        tableau = np.load(chemin_journee(dossier, date), mmap_mode="r")
+    except (FileNotFoundError, ValueError):
+        return None
+    return tableau if tableau.dtype == TYPE else None
+
+
+def supprimer(dossier, date):
+    """
+    Supprime le tableau d'une journée (ses lectures ont changé), ou la marque périmée si le
+    fichier est projeté en mémoire (Windows).
+    """
+    try:
+        os.remove(chemin_journee(dossier, date))
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        _marquer_perime(dossier, date)
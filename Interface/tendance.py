@@ -3,8 +3,15 @@
 import tkinter as tk  
 from tkinter import ttk, messagebox  # Fournit des widgets améliorés et des boîtes de dialogue pour tkinter
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # Permet d'intégrer des graphiques matplotlib dans tkinter
-import matplotlib.pyplot as plt  # Utilisé pour tracer des graphiques
+from matplotlib.figure import Figure  # Figure persistante (hors du registre de pyplot)
+from matplotlib.ticker import FuncFormatter, MaxNLocator  # Affichage des heures sur l'axe X
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num  # Axe X des périodes de plusieurs jours
+from datetime import datetime, timedelta  # Calcul du début d'une période
 import backend_  # Importation des fonctions back end pour gérer les données de tendance
+import service_donnees  # Lectures hors du thread Tkinter
+import reduction_series  # Réduction des séries à la largeur du graphique
+import numpy as np  # Colonnes des données détaillées
+import instrumentation  # Comptage et durées des tracés (optionnel)
 
 # --------------------------- PARTIE 2 : RÉCUPÉRATION DES DONNÉES DE TENDANCE ---------------------------
 
@@ -15,8 +22,32 @@ def update_moyenne(date, trend_labels):
     :param date: Date au format "YYYY-MM-DD" pour laquelle les tendances sont affichées.
     :param trend_labels: Dictionnaire contenant les widgets Label pour afficher les informations.
     """
-    data = backend_.get_trend_data(date)  # Récupère les données de tendance pour la date donnée
-    trend_labels["date"].config(text=f"Date : {date}")
+    trend_labels["date"].config(text=f"Date : {date}")  # Immédiat : lu par on_parameter_selected
+    if lire_date(date) is None:
+        afficher_moyenne(date, {}, trend_labels)  # "N/A" ; l'avertissement est affiché par tracer_graphique
+        return
+    service_donnees.demander("moyenne", backend_.get_trend_data, (date,),
+                             rappel=lambda data: afficher_moyenne(date, data, trend_labels),
+                             erreur=lambda exc: messagebox.showwarning("Erreur", f"Lecture des moyennes impossible : {exc}"))
+
+
+def lire_date(date):
+    """
+    :param date: Date au format "YYYY-MM-DD" choisie dans le sélecteur (le jour 31 est proposé
+                 pour tous les mois).
+    :return: datetime correspondant, ou None si la date est vide ou n'existe pas (ex. 2024-02-31).
+    """
+    try:
+        return datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+def afficher_moyenne(date, data, trend_labels):
+    """
+    Affiche les données de tendance lues en arrière-plan (thread Tkinter).
+    """
+    if not trend_labels["date"].winfo_exists():
+        return  # L'écran des tendances a été fermé pendant la lecture
     trend_labels["temp"].config(text=f"Température : {data.get('Température', 'N/A')}°C")
     trend_labels["humidity"].config(text=f"Humidité : {data.get('Humidité', 'N/A')}%")
     trend_labels["co2"].config(text=f"CO2 : {data.get('CO2', 'N/A')} ppm")
@@ -86,8 +117,8 @@ def ajouter_widgets_interactifs(trend_frame, trend_info_frame):
         :param selected_date: Date sélectionnée au format "YYYY-MM-DD".
         """
         selected_parameter = liste_parametres.get()
-        backend_.update_moyenne(selected_date, trend_labels)  # Met à jour les labels avec les données de tendance
-        tracer_graphique(selected_parameter, bottom_frame, selected_date)  # Trace le graphique correspondant
+        update_moyenne(selected_date, trend_labels)  # Met à jour les labels avec les données de tendance
+        tracer_graphique(selected_parameter, bottom_frame, selected_date, PERIODES[liste_periodes.get()])  # Trace le graphique correspondant
 
     # Création du sélecteur de date
     date_selector = creer_selecteur_date(trend_info_frame, on_date_selected)
@@ -100,12 +131,15 @@ def ajouter_widgets_interactifs(trend_frame, trend_info_frame):
         :param selected_parameter: Paramètre sélectionné (Température, Humidité, CO2).
         """
         selected_date = trend_labels["date"].cget("text").split(": ")[1]
-        tracer_graphique(selected_parameter, bottom_frame, selected_date)
+        tracer_graphique(selected_parameter, bottom_frame, selected_date, PERIODES[liste_periodes.get()])
 
     # Création du sélecteur de paramètre
     parameter_frame, liste_parametres = creer_selecteur_parametre(trend_frame, on_parameter_selected)
     parameter_frame.pack(pady=5)
 
+    # Sélecteur de la période affichée (se termine à la date choisie), dans la même ligne
+    liste_periodes = creer_selecteur_periode(parameter_frame, lambda periode: on_parameter_selected(liste_parametres.get()))
+
     # Cadre pour afficher les graphiques
     bottom_frame = tk.Frame(trend_frame, bg="white", height=400)
     bottom_frame.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -188,64 +222,242 @@ def creer_cadre_conditions(parent):
 
 # --------------------------- PARTIE 8 : GRAPHIQUES DYNAMIQUES ---------------------------
 
-def tracer_graphique(parameter, frame, date):
+# Définition des plages critiques, optimales et acceptables pour chaque paramètre
+RANGES = {
+    "Température": (15, 20, 25, 32),
+    "Humidité": (30, 50, 70, 90),
+    "CO2": (200, 350, 450, 1800),
+}
+
+# Zones colorées : (indice de la borne basse, indice de la borne haute, couleur, transparence)
+# dans le tuple (critical_low, optimal_min, optimal_max, critical_high)
+ZONES = [
+    (0, 1, "red", 0.2),     # Zone critique basse
+    (1, 2, "green", 0.2),   # Zone optimale
+    (2, 3, "red", 0.2),     # Zone critique haute
+    (2, 3, "white", 1),     # Nettoyage de la zone critique haute
+    (0, 1, "white", 1),     # Nettoyage de la zone critique basse
+]
+
+
+def heures_de(horodatages):
+    """
+    Convertit des horodatages en nombre d'heures depuis minuit (ex. 08:30 -> 8.5) pour l'axe X.
+    """
+    return (horodatages % 86400) / 3600
+
+
+def format_heure(x, pos=None):
+    """
+    Formateur de l'axe X : 8.5 -> "08:30".
+    """
+    minutes = int(round(x * 60))
+    return f"{minutes // 60:02}:{minutes % 60:02}"
+
+
+def duree_point(resolution):
+    """
+    Décrit la résolution d'une série pour le titre (ex. 3600 -> "moyennes par heure").
     """
-    Trace un graphique de l'évolution d'un paramètre environnemental sur une journée.
+    return {60: "moyennes par minute", 3600: "moyennes par heure", 86400: "moyennes par jour"}.get(resolution, "lectures")
+
+
+MODE_REDUCTION = "lttb"  # "lttb" (forme de la courbe) ou "min_max" (tous les pics)
+POINTS_MARQUEURS = 100   # Au-delà, la courbe est tracée sans marqueurs
+
+
+class GraphiqueTendance:
+    """
+    Graphique d'évolution d'un paramètre, construit une seule fois.
+    Un changement de date ou de paramètre ne fait que remplacer les données de la courbe,
+    déplacer les zones colorées et ajuster les limites, puis redessiner le canvas existant.
+    Deux modes : une journée (axe X en heures) ou une période de plusieurs jours (axe X en
+    dates, avec l'enveloppe minimum / maximum de chaque point).
+    """
+
+    def __init__(self):
+        # Figure créée sans pyplot : elle n'est pas gardée dans le registre global
+        self.fig = Figure(figsize=(8, 4))
+        self.ax = self.fig.add_subplot()
+        self.canvas = None
+
+        # Coloration des plages critiques et optimales (positions ajustées dans afficher())
+        self.zones = [self.ax.axhspan(0, 0, color=couleur, alpha=alpha) for _, _, couleur, alpha in ZONES]
+
+        # Courbe des valeurs du paramètre
+        self.line, = self.ax.plot([], [], marker='o', color='blue')
+        self.enveloppe = None  # Zone minimum / maximum (mode période)
+        self.ax.grid(True)  # Affichage de la grille
+        self.legende = self.ax.legend([self.line], [""])  # Affichage de la légende
+
+    def attacher(self, frame):
+        """
+        Place le graphique dans 'frame' : le canvas Tk n'est recréé que si le cadre a changé
+        (l'écran des tendances a été reconstruit).
+        """
+        if self.canvas is not None:
+            widget = self.canvas.get_tk_widget()
+            if widget.winfo_exists() and widget.master is frame:
+                return
+        self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def afficher(self, parameter, hours, values, date):
+        """
+        Remplace les données affichées par celles d'une journée.
+
+        :param parameter: Paramètre environnemental tracé.
+        :param hours: Tableau des heures depuis minuit (ex. 8.5 pour 08:30).
+        :param values: Tableau des valeurs correspondantes.
+        :param date: Date au format "YYYY-MM-DD" (pour le titre).
+        """
+        x, values = reduction_series.reduire(hours, values, self.largeur_pixels(), MODE_REDUCTION)
+        self._retirer_enveloppe()
+        self.line.set_marker('o' if len(x) <= POINTS_MARQUEURS else '')
+        self.ax.set_xlabel("Heures")  # Label de l'axe X
+        self.ax.xaxis.set_major_locator(MaxNLocator(steps=[1, 2, 3, 4, 6, 10], integer=True))  # Heures entières
+        self.ax.xaxis.set_major_formatter(FuncFormatter(format_heure))
+        self._afficher_serie(parameter, x, values, values.min(), values.max(), f"Évolution de {parameter} - {date}")
+
+    def afficher_periode(self, parameter, serie, debut, fin):
+        """
+        Remplace les données affichées par celles d'une période de plusieurs jours.
+
+        :param parameter: Paramètre environnemental tracé.
+        :param serie: Dictionnaire retourné par backend_.get_trend_range().
+        :param debut: Date de début "YYYY-MM-DD" (pour le titre).
+        :param fin: Date de fin "YYYY-MM-DD" (pour le titre).
+        """
+        x = date2num(serie["moments"])
+        largeur = self.largeur_pixels()
+        x_courbe, valeurs = reduction_series.reduire(x, serie["valeurs"], largeur, MODE_REDUCTION)
+        x_enveloppe, minimums, maximums = reduction_series.reduire_enveloppe(
+            x, serie["minimums"], serie["maximums"], largeur)
+        self._retirer_enveloppe()
+        self.enveloppe = self.ax.fill_between(x_enveloppe, minimums, maximums,
+                                              color='blue', alpha=0.15, linewidth=0)
+        self.line.set_marker('o' if len(x_courbe) <= POINTS_MARQUEURS else '')
+        self.ax.set_xlabel("Date")
+        localisateur = AutoDateLocator()
+        self.ax.xaxis.set_major_locator(localisateur)
+        self.ax.xaxis.set_major_formatter(ConciseDateFormatter(localisateur))
+        titre = f"Évolution de {parameter} - du {debut} au {fin} ({duree_point(serie['resolution'])})"
+        self._afficher_serie(parameter, x_courbe, valeurs, minimums.min(), maximums.max(), titre)
+
+    def largeur_pixels(self):
+        """
+        :return: Largeur de la zone de tracé en pixels (nombre de points utiles d'une série).
+        """
+        return max(int(self.ax.bbox.width), 100)
+
+    def _retirer_enveloppe(self):
+        if self.enveloppe is not None:
+            self.enveloppe.remove()
+            self.enveloppe = None
+
+    def _afficher_serie(self, parameter, x, values, v_min, v_max, titre):
+        self.line.set_data(x, values)
+        self.legende.get_texts()[0].set_text(parameter)
+        self.ax.set_title(titre, fontsize=14)  # Titre du graphique
+        self.ax.set_ylabel(parameter)  # Label de l'axe Y
+
+        # Récupère les limites bas et haut en fonction du paramètre
+        bornes = RANGES.get(parameter, (v_min, v_min, v_max, v_max))
+        critical_low, optimal_min, optimal_max, critical_high = bornes
+        for zone, (bas, haut, _, _) in zip(self.zones, ZONES):
+            zone.set_y(bornes[bas])
+            zone.set_height(bornes[haut] - bornes[bas])
+
+        # Définition des marges pour l'axe Y
+        margin = 2
+        y_min = max(critical_low - margin, v_min - margin)
+        y_max = min(critical_high + margin, v_max + margin)
+        self.ax.set_ylim(y_min, y_max)  # Ajustement des limites de l'axe Y
+
+        # Axe X ajusté aux points disponibles
+        marge_x = max((x[-1] - x[0]) * 0.05, 0.5)
+        self.ax.set_xlim(x[0] - marge_x, x[-1] + marge_x)
+
+        if self.canvas is not None:
+            self.canvas.draw_idle()  # Un seul rendu, regroupé avec les éventuelles autres modifications
+
+
+_graphique = None  # Graphique des tendances réutilisé d'un affichage à l'autre
+
+# Périodes proposées : nombre de jours se terminant à la date choisie
+PERIODES = {"Jour": 1, "Semaine": 7, "Mois": 30, "3 mois": 90}
+
+
+@instrumentation.mesure
+def tracer_graphique(parameter, frame, date, jours=1):
+    """
+    Trace un graphique de l'évolution d'un paramètre environnemental sur une journée ou une période.
 
     :param parameter: Paramètre environnemental à tracer (Température, Humidité, CO2).
     :param frame: Cadre dans lequel le graphique sera affiché.
-    :param date: Date au format "YYYY-MM-DD" pour laquelle le graphique est tracé.
+    :param date: Date au format "YYYY-MM-DD" pour laquelle le graphique est tracé (dernier jour de la période).
+    :param jours: Nombre de jours affichés (1 = la journée heure par heure).
+    """
+    moment = lire_date(date)
+    if moment is None:
+        messagebox.showwarning("Erreur", "Veuillez d'abord choisir une date valide.")
+        return
+
+    def echec(exc):
+        messagebox.showwarning("Erreur", f"Lecture des données impossible : {exc}")
+
+    if jours == 1:
+        service_donnees.demander("graphique", backend_.get_detailed_trend_data, (date,),
+                                 rappel=lambda detailed_data: afficher_graphique(parameter, frame, date, detailed_data),
+                                 erreur=echec)
+        return
+
+    debut = (moment - timedelta(days=jours - 1)).strftime("%Y-%m-%d")
+    # Même clé que la journée : seule la demande la plus récente est affichée
+    service_donnees.demander("graphique", backend_.get_trend_range, (debut, date, parameter),
+                             rappel=lambda serie: afficher_graphique_periode(parameter, frame, debut, date, serie),
+                             erreur=echec)
+
+
+@instrumentation.mesure
+def afficher_graphique(parameter, frame, date, detailed_data):
+    """
+    Affiche les données détaillées lues en arrière-plan (thread Tkinter).
     """
-    detailed_data = backend_.get_detailed_trend_data(date)  # Récupère les données détaillées pour la date
-    if not detailed_data:
+    global _graphique
+    if not frame.winfo_exists():
+        return  # L'écran des tendances a été fermé pendant la lecture
+    # Colonnes du tableau structuré (vues, sans copie) ; instants sans lecture du paramètre exclus
+    values = detailed_data[parameter]
+    presentes = ~np.isnan(values)
+    if not presentes.any():
         messagebox.showwarning("Erreur", f"Aucune donnée disponible pour la date {date}.")
         return
+    hours = heures_de(detailed_data["horodatage"][presentes])
+    values = values[presentes]
 
-    hourly_data = detailed_data
-    hours = list(hourly_data.keys())
-    values = [hourly_data[hour][parameter] for hour in hours]
+    if _graphique is None:
+        _graphique = GraphiqueTendance()
+    _graphique.attacher(frame)
+    _graphique.afficher(parameter, hours, values, date)
 
-    # Nettoyage des widgets existants dans le cadre du graphique
-    for widget in frame.winfo_children():
-        widget.destroy()
 
-    # Définition des plages critiques, optimales et acceptables pour chaque paramètre
-    ranges = {
-        "Température": (15, 20, 25, 32),
-        "Humidité": (30, 50, 70, 90),
-        "CO2": (200, 350, 450, 1800),
-    }
+@instrumentation.mesure
+def afficher_graphique_periode(parameter, frame, debut, fin, serie):
+    """
+    Affiche la série d'une période lue en arrière-plan (thread Tkinter).
+    """
+    global _graphique
+    if not frame.winfo_exists():
+        return  # L'écran des tendances a été fermé pendant la lecture
+    if not serie["moments"]:
+        messagebox.showwarning("Erreur", f"Aucune donnée disponible du {debut} au {fin}.")
+        return
 
-    # Récupère les limites bas et haut en fonction du paramètre
-    critical_low, optimal_min, optimal_max, critical_high = ranges.get(parameter, (min(values), min(values), max(values), max(values)))
-
-    # Création de la figure et de l'axe pour le graphique
-    fig, ax = plt.subplots(figsize=(8, 4))
-
-    # Coloration des plages critiques et optimales
-    ax.axhspan(critical_low, optimal_min, color="red", alpha=0.2)     # Zone critique basse
-    ax.axhspan(optimal_min, optimal_max, color="green", alpha=0.2)    # Zone optimale
-    ax.axhspan(optimal_max, critical_high, color="red", alpha=0.2)    # Zone critique haute
-    ax.axhspan(optimal_max, critical_high, color="white", alpha=1)    # Nettoyage de la zone critique haute
-    ax.axhspan(critical_low, optimal_min, color="white", alpha=1)     # Nettoyage de la zone critique basse
-
-    # Tracé des valeurs du paramètre
-    ax.plot(hours, values, marker='o', color='blue', label=parameter)
-    ax.set_title(f"Évolution de {parameter} - {date}", fontsize=14)  # Titre du graphique
-    ax.set_xlabel("Heures")  # Label de l'axe X
-    ax.set_ylabel(parameter)  # Label de l'axe Y
-    ax.grid(True)  # Affichage de la grille
-    ax.legend()  # Affichage de la légende
-
-    # Définition des marges pour l'axe Y
-    margin = 2
-    y_min = max(critical_low - margin, min(values) - margin)
-    y_max = min(critical_high + margin, max(values) + margin)
-    ax.set_ylim(y_min, y_max)  # Ajustement des limites de l'axe Y
-
-    # Intégration du graphique dans le cadre Tkinter
-    canvas = FigureCanvasTkAgg(fig, master=frame)
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    if _graphique is None:
+        _graphique = GraphiqueTendance()
+    _graphique.attacher(frame)
+    _graphique.afficher_periode(parameter, serie, debut, fin)
 
 # --------------------------- PARTIE 9 : SÉLECTION DU PARAMÈTRE POUR LE GRAPHIQUE ---------------------------
 
@@ -278,6 +490,22 @@ def creer_selecteur_parametre(parent, on_parameter_selected_callback):
     parameter_cb.bind("<<ComboboxSelected>>", on_parameter_change)
     return frame, parameter_cb
 
+def creer_selecteur_periode(parent, on_period_selected_callback):
+    """
+    Crée un sélecteur de période (Jour, Semaine, Mois, 3 mois) dans le cadre 'parent'.
+
+    :param parent: Cadre parent (ex. le cadre du sélecteur de paramètre).
+    :param on_period_selected_callback: Fonction de rappel appelée avec la période sélectionnée.
+    :return: Widget Combobox de la période.
+    """
+    tk.Label(parent, text="Période :", font=("Arial", 12), bg="lightyellow").pack(side=tk.LEFT, padx=5)
+
+    period_cb = ttk.Combobox(parent, values=list(PERIODES), width=8, state="readonly")
+    period_cb.set("Jour")  # Sélection par défaut
+    period_cb.pack(side=tk.LEFT, padx=5)
+    period_cb.bind("<<ComboboxSelected>>", lambda event: on_period_selected_callback(period_cb.get()))
+    return period_cb
+
 # --------------------------- MAIN (Point d'entrée du programme) ---------------------------
 
 if __name__ == "__main__":
@@ -0,0 +1,39 @@
+# test_sauvegarde_alertes.py
+
+import os
+import sys
+import subprocess
+
+DOSSIER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOSSIER)
+
+import backend_
+import journal_alertes
+
+ALERTE = {"Parameter": "CO2", "Value": 900.0, "Message": "CO2 trop élevé", "read": False}
+
+# Écritures d'un deuxième processus (ingestion) pendant que le premier garde l'ancien état en mémoire
+AUTRE_PROCESSUS = """
+import sys
+import backend_
+fichier = sys.argv[1]
+backend_.add_fired_alerts([{"hour": "10:00", "Parameter": "CO2", "Value": 950.0}], filename=fichier)
+backend_.delete_alert("10:00", filename=fichier)
+"""
+
+
+def test_sauvegarde_conserve_les_ecritures_d_un_autre_processus(tmp_path):
+    fichier = str(tmp_path / "alerts.json")
+    journal_alertes.ecrire_instantane(fichier, {"active_alerts": [], "read_alerts": [],
+                                                "alerts_by_time": {"10:00": dict(ALERTE)}})
+    backend_.load_alerts_from_file(fichier)  # Processus A : 10:00 en mémoire
+
+    subprocess.run([sys.executable, "-c", AUTRE_PROCESSUS, fichier], check=True,
+                   env=dict(os.environ, PYTHONPATH=DOSSIER))
+
+    backend_.save_alerts_to_file(fichier)  # Processus A, sans relecture préalable
+
+    data = journal_alertes.charger(fichier)
+    assert data["active_alerts"] == [{"hour": "10:00", "Parameter": "CO2", "Value": 950.0}]
+    assert "10:00" not in data["alerts_by_time"]
+    assert backend_.get_alerts_by_time(fichier) == {}  # La mémoire reprend l'état sur disque